@@ -3,7 +3,200 @@
 import numpy as np
 import pandas as pd
 from scipy import signal
+from scipy.fft import irfft, next_fast_len, rfft
 from scipy.stats import pearsonr
+from spectral import spectrogram, welch_psd
+
+# Approximate number of float64 values held in temporary arrays by the blockwise computations
+CORRELATION_BUDGET = 1 << 24
+
+def lagged_cross_correlation(x, y, lag_max=None):
+    """Cross-correlation c[l] = sum_n x[n + l] * y[n] for lags -lag_max..lag_max, computed by FFT.
+
+    The signals are zero-padded only enough for the requested lags to be free of circular wrap-around,
+    so the cost is O(T log T) whatever lag_max is. Without lag_max, the result equals
+    np.correlate(x, y, mode='full').
+
+    Parameters:
+    - x, y: Signals of shape (..., T_x) and (..., T_y); leading dimensions are broadcast.
+    - lag_max: Largest lag, in samples; all lags when None.
+
+    Returns:
+    - correlation: Array of shape (..., 2 * lag_max + 1) for lags -lag_max..lag_max, or (..., T_x + T_y - 1)
+      for all lags.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n_x, n_y = x.shape[-1], y.shape[-1]
+    lag_negative, lag_positive = (n_y - 1, n_x - 1) if lag_max is None else (lag_max, lag_max)
+    n_fft = next_fast_len(max(n_x + lag_negative, n_y + lag_positive))
+    circular = irfft(rfft(x, n_fft) * np.conj(rfft(y, n_fft)), n_fft)
+    # Negative lags wrap around to the end of the circular correlation
+    return np.concatenate((circular[..., n_fft - lag_negative:], circular[..., :lag_positive + 1]), axis=-1)
+
+def _channel_moments(signals, block):
+    """Mean and standard deviation of each row of signals, reading block samples at a time."""
+    n_channels, n_samples = signals.shape
+    total = np.zeros(n_channels)
+    for start in range(0, n_samples, block):
+        total += np.asarray(signals[:, start:start + block], dtype=np.float64).sum(axis=1)
+    mean = total / n_samples
+    squares = np.zeros(n_channels)
+    for start in range(0, n_samples, block):
+        squares += ((np.asarray(signals[:, start:start + block], dtype=np.float64) - mean[:, None]) ** 2).sum(axis=1)
+    return mean, np.sqrt(squares / n_samples)
+
+def _segment_spectra(padded, lag_max, n_fft):
+    """Spectra of the overlapping segments used by all_pairs_cross_correlation.
+
+    The signals, given with lag_max samples of context on both sides, are cut into segments of
+    n_fft - 2 * lag_max samples. For every segment the spectrum of the segment extended by lag_max samples
+    on both sides (shifted signal) and the spectrum of the segment alone (reference signal) are returned,
+    each of shape (n_freq, B, n_segments).
+    """
+    segment = n_fft - 2 * lag_max
+    windows = np.lib.stride_tricks.sliding_window_view(padded, segment + 2 * lag_max, axis=1)[:, ::segment]
+    shifted = rfft(windows, n_fft, axis=-1)
+    reference = rfft(windows[..., lag_max:lag_max + segment], n_fft, axis=-1)
+    return np.moveaxis(shifted, -1, 0), np.moveaxis(reference, -1, 0)
+
+def all_pairs_cross_correlation(signals, lag_max, peak=False, normalize=True, block_size=None):
+    """Cross-correlation of every pair of channels of a population for lags -lag_max..lag_max.
+
+    The signals are cut into short overlapping segments whose length depends only on lag_max. For each
+    frequency, the cross-spectra of all channel pairs summed over the segments form one matrix product,
+    and a single short inverse FFT per pair yields exactly the requested lags, so the cost grows like
+    N^2 * T independently of lag_max. The recording is read in time chunks sized from CORRELATION_BUDGET,
+    and since c_ji[l] = c_ij[-l], only blocks of channel pairs on and above the diagonal are computed.
+    For all lags, the spectra of every channel are computed once per chunk and shared by all the pairs
+    of that channel, and the cross-spectra of every block pair are summed over the chunks, about
+    N^2 * (lag_max + 32) complex values, the size of the full result. With peak=True, the block pairs
+    are instead summed over the whole recording one at a time and reduced to their peaks, so besides
+    the (N, N) results memory stays within CORRELATION_BUDGET whatever N and lag_max are, at the cost
+    of computing the spectra of each block once per pair.
+
+    Parameters:
+    - signals: Array or memmap of shape (N, T), one channel per row.
+    - lag_max: Largest lag, in samples.
+    - peak: Return the largest correlation of each pair over the lags, and its lag, instead of all lags.
+    - normalize: Remove the mean of each channel and divide by T * std_i * std_j, so that the values
+      are correlation coefficients; raw sums of products otherwise.
+    - block_size: Number of channels per block; chosen from CORRELATION_BUDGET when None.
+
+    Returns:
+    - correlation: Array of shape (N, N, 2 * lag_max + 1), where correlation[i, j, lag_max + l] is the
+      correlation of channel i shifted by l with channel j; or, with peak=True, arrays peak_value and
+      peak_lag of shape (N, N).
+    """
+    n_channels, n_samples = signals.shape
+    n_fft = next_fast_len(4 * lag_max + 64)
+    segment = n_fft - 2 * lag_max
+    if block_size is None:
+        block_size = int(max(1, min(n_channels, np.sqrt(CORRELATION_BUDGET / n_fft))))
+    # Segments per time chunk, so that the spectra of all channels for one chunk fit in the budget
+    chunk_segments = max(1, CORRELATION_BUDGET // (4 * n_channels * n_fft))
+    if normalize:
+        mean, std = _channel_moments(signals, max(1, CORRELATION_BUDGET // n_channels))
+        scale = 1.0 / (np.sqrt(n_samples) * np.where(std > 0, std, np.inf))
+    lags = np.arange(-lag_max, lag_max + 1)
+    starts = range(0, n_channels, block_size)
+
+    def spectra(start, t0, n_segments):
+        # Samples t0 - lag_max .. t0 + n_segments * segment + lag_max, zero outside the recording
+        rows = slice(start, start + block_size)
+        lo, hi = max(t0 - lag_max, 0), min(t0 + n_segments * segment + lag_max, n_samples)
+        block = np.asarray(signals[rows, lo:hi], dtype=np.float64)
+        if normalize:
+            block = (block - mean[rows, None]) * scale[rows, None]
+        padded = np.zeros((block.shape[0], n_segments * segment + 2 * lag_max))
+        padded[:, lo - t0 + lag_max:hi - t0 + lag_max] = block
+        return _segment_spectra(padded, lag_max, n_fft)
+
+    def chunks(n_per_chunk):
+        # Start and number of segments of each time chunk
+        for t0 in range(0, n_samples, n_per_chunk * segment):
+            yield t0, min(n_per_chunk, -(-(n_samples - t0) // segment))
+
+    def lag_window(cross_ij):
+        # Correlations of a block pair for lags -lag_max..lag_max, shape (B_i, B_j, 2 * lag_max + 1)
+        return np.moveaxis(irfft(cross_ij, n_fft, axis=0)[:2 * lag_max + 1], 0, -1)
+
+    if peak:
+        # Each block pair is summed over the whole recording and reduced to its peaks before the next
+        # one, so only one pair's cross-spectra are held at a time, within CORRELATION_BUDGET; the
+        # spectra of both blocks are recomputed for every pair
+        peak_value = np.empty((n_channels, n_channels))
+        peak_lag = np.empty((n_channels, n_channels), dtype=np.int64)
+        pair_segments = max(1, CORRELATION_BUDGET // (8 * block_size * n_fft))
+        for a, i in enumerate(starts):
+            for j in starts[a:]:
+                cross_ij = None
+                for t0, n_segments in chunks(pair_segments):
+                    shifted_i, reference_i = spectra(i, t0, n_segments)
+                    reference_j = reference_i if j == i else spectra(j, t0, n_segments)[1]
+                    product = np.matmul(shifted_i, np.conj(reference_j).transpose(0, 2, 1))
+                    if cross_ij is None:
+                        cross_ij = product
+                    else:
+                        cross_ij += product
+                window = lag_window(cross_ij)
+                rows, cols = slice(i, i + window.shape[0]), slice(j, j + window.shape[1])
+                best = np.argmax(window, axis=-1)
+                value = np.take_along_axis(window, best[..., None], axis=-1)[..., 0]
+                peak_value[rows, cols], peak_lag[rows, cols] = value, lags[best]
+                peak_value[cols, rows], peak_lag[cols, rows] = value.T, -lags[best].T
+        return peak_value, peak_lag
+
+    cross = {}
+    for t0, n_segments in chunks(chunk_segments):
+        chunk = [spectra(start, t0, n_segments) for start in starts]
+        for a, i in enumerate(starts):
+            shifted_i = chunk[a][0]
+            for b in range(a, len(starts)):
+                product = np.matmul(shifted_i, np.conj(chunk[b][1]).transpose(0, 2, 1))
+                key = (i, starts[b])
+                if key in cross:
+                    cross[key] += product
+                else:
+                    cross[key] = product
+
+    correlation = np.empty((n_channels, n_channels, 2 * lag_max + 1))
+    for (i, j), cross_ij in cross.items():
+        window = lag_window(cross_ij)
+        rows, cols = slice(i, i + window.shape[0]), slice(j, j + window.shape[1])
+        correlation[rows, cols] = window
+        correlation[cols, rows] = window[..., ::-1].transpose(1, 0, 2)
+    return correlation
+
+def pearson_correlation_matrix(signals, others=None, block=None):
+    """Pearson correlation coefficients between all rows of one or two populations of signals.
+
+    The data is read in blocks of samples (first for the means, then for the centered products), so
+    memmapped recordings longer than memory can be used.
+
+    Parameters:
+    - signals: Array or memmap of shape (N, T).
+    - others: Optional array of shape (M, T); the rows of signals are correlated with each other when None.
+    - block: Number of samples read at a time; chosen from CORRELATION_BUDGET when None.
+
+    Returns:
+    - r: Array of shape (N, N), or (N, M) with others.
+    """
+    n_samples = signals.shape[1]
+    rows = signals.shape[0] + (0 if others is None else others.shape[0])
+    block = block or max(1, CORRELATION_BUDGET // rows)
+    mean, std = _channel_moments(signals, block)
+    if others is None:
+        other_mean, other_std = mean, std
+    else:
+        other_mean, other_std = _channel_moments(others, block)
+    products = np.zeros((len(mean), len(other_mean)))
+    for start in range(0, n_samples, block):
+        a = np.asarray(signals[:, start:start + block], dtype=np.float64) - mean[:, None]
+        b = a if others is None else np.asarray(others[:, start:start + block], dtype=np.float64) - other_mean[:, None]
+        products += a @ b.T
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return products / (n_samples * np.outer(std, other_std))
 
 class DataAnalyzer:
     """Advanced tools for analyzing neural simulation data."""
@@ -27,6 +220,48 @@ class DataAnalyzer:
         """
         f, Pxx_den = signal.periodogram(self.data['V_m'], sampling_rate)
         return f, Pxx_den
+
+    def welch_spectrum(self, sampling_rate, signals=None, nperseg=256, axis=-1, n_workers=4):
+        """Estimate power spectral densities with Welch's method, streaming the data in chunks.
+        
+        Unlike spectral_analysis, the signals may be memory-mapped recordings longer than memory.
+        
+        Parameters:
+        - sampling_rate: Sampling rate of the data in Hz.
+        - signals: Array or memmap of shape (T,), (N, T), or (T, N) with axis=0; by default the 'V_m'
+          column of the data.
+        - nperseg: Length of each Welch segment.
+        - axis: Time axis of signals.
+        - n_workers: Number of worker threads sharing the channels.
+        
+        Returns:
+        - frequencies: Array of frequencies.
+        - power: Power spectral density, of shape (n_freq,) or (N, n_freq).
+        """
+        if signals is None:
+            signals = self.data['V_m'].to_numpy()
+        return welch_psd(signals, sampling_rate, nperseg=nperseg, axis=axis, n_workers=n_workers)
+
+    def spectrogram(self, sampling_rate, signals=None, nperseg=256, average=1, axis=-1, n_workers=4):
+        """Compute spectrograms, streaming the data in chunks.
+        
+        Parameters:
+        - sampling_rate: Sampling rate of the data in Hz.
+        - signals: Array or memmap of shape (T,), (N, T), or (T, N) with axis=0; by default the 'V_m'
+          column of the data.
+        - nperseg: Length of each segment.
+        - average: Number of consecutive segments averaged into each column.
+        - axis: Time axis of signals.
+        - n_workers: Number of worker threads sharing the channels.
+        
+        Returns:
+        - frequencies: Array of frequencies.
+        - times: Center times of the columns in seconds.
+        - power: Spectrogram of shape (n_freq, n_columns) or (N, n_freq, n_columns).
+        """
+        if signals is None:
+            signals = self.data['V_m'].to_numpy()
+        return spectrogram(signals, sampling_rate, nperseg=nperseg, average=average, axis=axis, n_workers=n_workers)
     
     def cross_correlation(self, other_data, lag_max=None):
         """Calculate cross-correlation with another dataset to find relationships in activity.
@@ -36,13 +271,35 @@ class DataAnalyzer:
         - lag_max: Maximum lag to compute correlation for, in data points.
         
         Returns:
-        - correlation: Cross-correlation values for different lags.
+        - correlation: Cross-correlation values for lags -lag_max..lag_max, or for all lags without lag_max.
         """
-        correlation = np.correlate(self.data['V_m'], other_data, mode='full', method='auto')
-        if lag_max:
-            mid = len(correlation) // 2
-            correlation = correlation[mid - lag_max: mid + lag_max + 1]
+        correlation = lagged_cross_correlation(self.data['V_m'], other_data, lag_max)
         return correlation
+
+    def _population(self, signals):
+        """Return signals, or the per-neuron V_m[i] columns of the data as an (N, T) array when None."""
+        if signals is not None:
+            return signals
+        columns = [column for column in self.data.columns if str(column).startswith('V_m[')]
+        if not columns:
+            raise ValueError("The data holds no per-neuron 'V_m[i]' columns.")
+        return self.data[columns].to_numpy().T
+
+    def population_cross_correlation(self, lag_max, signals=None, peak=False, normalize=True):
+        """Calculate the cross-correlation of every pair of neurons of a population.
+        
+        Parameters:
+        - lag_max: Maximum lag to compute correlation for, in data points.
+        - signals: Array or memmap of shape (N, T); by default the 'V_m[i]' columns of the data, as written
+          by a DataRecorder recording a population.
+        - peak: Return the peak correlation of each pair and its lag instead of all lags.
+        - normalize: Return correlation coefficients instead of raw sums of products.
+        
+        Returns:
+        - correlation: Array of shape (N, N, 2 * lag_max + 1), or peak values and lags of shape (N, N);
+          see all_pairs_cross_correlation.
+        """
+        return all_pairs_cross_correlation(self._population(signals), lag_max, peak, normalize)
     
     def pearson_correlation_coefficient(self, other_data):
         """Calculate the Pearson correlation coefficient with another dataset.
@@ -55,6 +312,18 @@ class DataAnalyzer:
         """
         r, _ = pearsonr(self.data['V_m'], other_data)
         return r
+
+    def pearson_correlation_matrix(self, signals=None, others=None):
+        """Calculate the Pearson correlation coefficients between all neurons of a population.
+        
+        Parameters:
+        - signals: Array or memmap of shape (N, T); by default the 'V_m[i]' columns of the data.
+        - others: Optional second population of shape (M, T) to correlate with.
+        
+        Returns:
+        - r: Correlation matrix of shape (N, N), or (N, M) with others.
+        """
+        return pearson_correlation_matrix(self._population(signals), others)
     
     def identify_network_activity_patterns(self, threshold=-55):
         """Identify patterns of network activity based on threshold crossings.
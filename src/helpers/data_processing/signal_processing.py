@@ -1,7 +1,85 @@
 # src/helpers/data_processing/signal_processing.py
 
+from functools import lru_cache
+
 import numpy as np
-from scipy.signal import butter, lfilter, detrend, hilbert
+from scipy.signal import butter, detrend, hilbert, sosfilt, sosfiltfilt
+
+@lru_cache(maxsize=128)
+def _butter_sos(btype, cutoff, fs, order):
+    return butter(order, cutoff, btype=btype, fs=fs, output='sos')
+
+def design_filter(btype, cutoff, fs, order=5):
+    """Return a Butterworth filter in second-order-section (SOS) form, designed once per parameter set.
+
+    Parameters:
+    - btype: 'low', 'high', 'band' or 'bandstop'.
+    - cutoff: Cutoff frequency in Hz, or (low, high) pair for band filters.
+    - fs: The sampling rate of the signal in Hz.
+    - order: The order of the filter.
+
+    Returns:
+    - sos: Array of shape (n_sections, 6), a copy of the cached design.
+    """
+    cutoff = tuple(float(c) for c in np.atleast_1d(cutoff))
+    return _butter_sos(btype, cutoff if len(cutoff) > 1 else cutoff[0], float(fs), int(order)).copy()
+
+def filter_signal(data, sos, zero_phase=False, axis=-1):
+    """Filter one or more signals along the time axis.
+
+    Parameters:
+    - data: Array of shape (T,) or (N, T), or any array with time along axis.
+    - sos: Filter in second-order-section form, e.g. from design_filter.
+    - zero_phase: Filter forward and backward (sosfiltfilt), which cancels the phase delay and squares the
+      magnitude response; this needs the whole signal and is meant for offline analysis.
+    - axis: Time axis of data.
+
+    Returns:
+    - y: The filtered signal, of the same shape as data.
+    """
+    data = np.asarray(data)
+    if zero_phase:
+        return sosfiltfilt(sos, data, axis=axis)
+    return sosfilt(sos, data, axis=axis)
+
+class StreamingFilter:
+    """Causal filter applied to successive chunks of one or more signals.
+
+    The final state of the filter sections after each chunk is the initial state of the next one, so
+    filtering a signal chunk by chunk gives the same result as filtering it in one call, with memory
+    bounded by the chunk size.
+    """
+
+    def __init__(self, btype, cutoff, fs, order=5):
+        """
+        Parameters:
+        - btype: 'low', 'high', 'band' or 'bandstop'.
+        - cutoff: Cutoff frequency in Hz, or (low, high) pair for band filters.
+        - fs: The sampling rate of the signal in Hz.
+        - order: The order of the filter.
+        """
+        self.sos = design_filter(btype, cutoff, fs, order)
+        self.zi = None
+
+    def process(self, chunk):
+        """
+        Filter the next chunk.
+
+        Parameters:
+        - chunk: Array of shape (C,) for one signal or (N, C) for N signals, time along the last axis.
+
+        Returns:
+        - y: The filtered chunk.
+        """
+        chunk = np.asarray(chunk)
+        if self.zi is None:
+            self.zi = np.zeros((len(self.sos),) + chunk.shape[:-1] + (2,))
+        y, self.zi = sosfilt(self.sos, chunk, axis=-1, zi=self.zi)
+        return y
+
+    def reset(self):
+        """Forget the filter state, to start on a new signal."""
+        self.zi = None
 
 class SignalProcessing:
     """Signal processing tools for neural simulation data."""
@@ -9,25 +87,24 @@ class SignalProcessing:
     def __init__(self, data):
         """
         Parameters:
-        - data: A numpy array or a pandas Series containing the signal to be processed.
+        - data: A numpy array or a pandas Series containing the signal to be processed, or an array of shape
+          (N, T) with one signal per row.
         """
         self.data = data
         
-    def butter_lowpass_filter(self, cutoff, fs, order=5):
+    def butter_lowpass_filter(self, cutoff, fs, order=5, zero_phase=False):
         """Apply a low-pass Butterworth filter to the signal.
         
         Parameters:
         - cutoff: The cutoff frequency of the filter in Hz.
         - fs: The sampling rate of the signal in Hz.
         - order: The order of the filter.
+        - zero_phase: Filter forward and backward to cancel the phase delay.
         
         Returns:
-        - y: The filtered signal.
+        - y: The filtered signal; (N, T) data is filtered along the time axis.
         """
-        nyq = 0.5 * fs
-        normal_cutoff = cutoff / nyq
-        b, a = butter(order, normal_cutoff, btype='low', analog=False)
-        y = lfilter(b, a, self.data)
+        y = filter_signal(self.data, design_filter('low', cutoff, fs, order), zero_phase)
         return y
     
     def remove_trend(self):
@@ -53,7 +130,7 @@ class SignalProcessing:
         instantaneous_frequency = np.diff(instantaneous_phase) / (2.0*np.pi)
         return amplitude_envelope, instantaneous_phase[:-1], instantaneous_frequency
     
-    def bandpass_filter(self, lowcut, highcut, fs, order=5):
+    def bandpass_filter(self, lowcut, highcut, fs, order=5, zero_phase=False):
         """Apply a bandpass filter to the signal.
         
         Parameters:
@@ -61,13 +138,10 @@ class SignalProcessing:
         - highcut: The upper boundary of the filter in Hz.
         - fs: The sampling rate of the signal in Hz.
         - order: The order of the filter.
+        - zero_phase: Filter forward and backward to cancel the phase delay.
         
         Returns:
-        - y: The filtered signal.
+        - y: The filtered signal; (N, T) data is filtered along the time axis.
         """
-        nyq = 0.5 * fs
-        low = lowcut / nyq
-        high = highcut / nyq
-        b, a = butter(order, [low, high], btype='band')
-        y = lfilter(b, a, self.data)
+        y = filter_signal(self.data, design_filter('band', (lowcut, highcut), fs, order), zero_phase)
         return y
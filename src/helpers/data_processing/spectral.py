@@ -0,0 +1,245 @@
+# src/helpers/data_processing/spectral.py
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from scipy.fft import rfft, rfftfreq
+from scipy.signal import get_window
+
+# Approximate number of samples (over all channels of a group) read at a time
+SPECTRAL_CHUNK = 1 << 20
+
+class SegmentStream:
+    """Cuts successive chunks of N signals into overlapping windowed segments and returns their power.
+
+    Samples that do not complete a segment are kept until the next chunk, so the segments are exactly
+    those of the concatenated signal: they start every nperseg - noverlap samples and only complete
+    segments are used, as in scipy.signal.welch and scipy.signal.spectrogram.
+    """
+
+    def __init__(self, fs, window='hann', nperseg=256, noverlap=None, detrend='constant', scaling='density'):
+        """
+        Parameters:
+        - fs: Sampling rate of the signals in Hz.
+        - window: Window specification accepted by scipy.signal.get_window.
+        - nperseg: Length of each segment.
+        - noverlap: Number of samples shared by consecutive segments; nperseg // 2 by default.
+        - detrend: 'constant' to remove the mean of each segment, or False.
+        - scaling: 'density' (V**2/Hz) or 'spectrum' (V**2).
+        """
+        if scaling not in ('density', 'spectrum'):
+            raise ValueError("Unsupported scaling specified.")
+        self.fs = fs
+        self.nperseg = nperseg
+        self.noverlap = nperseg // 2 if noverlap is None else noverlap
+        self.step = nperseg - self.noverlap
+        self.detrend = detrend
+        self.window = get_window(window, nperseg)
+        self.scale = 1.0 / (fs * np.sum(self.window ** 2)) if scaling == 'density' else 1.0 / np.sum(self.window) ** 2
+        self.frequencies = rfftfreq(nperseg, 1.0 / fs)
+        # One-sided spectrum: every bin except DC (and Nyquist for even lengths) counts twice
+        self.weights = np.full(len(self.frequencies), 2.0)
+        self.weights[0] = 1.0
+        if nperseg % 2 == 0:
+            self.weights[-1] = 1.0
+        self._tail = None
+        self.n_segments = 0
+
+    def process(self, chunk):
+        """
+        Return the power of the segments completed by the next chunk.
+
+        Parameters:
+        - chunk: Array of shape (N, C), time along the last axis.
+
+        Returns:
+        - power: Array of shape (N, n_freq, k) for the k segments completed.
+        """
+        chunk = np.asarray(chunk, dtype=np.float64)
+        data = chunk if self._tail is None else np.concatenate((self._tail, chunk), axis=-1)
+        n_complete = 0 if data.shape[-1] < self.nperseg else (data.shape[-1] - self.nperseg) // self.step + 1
+        self._tail = data[:, n_complete * self.step:]
+        if n_complete == 0:
+            return np.empty((data.shape[0], len(self.frequencies), 0))
+        segments = np.lib.stride_tricks.sliding_window_view(data, self.nperseg, axis=-1)[:, :n_complete * self.step:self.step]
+        if self.detrend == 'constant':
+            segments = segments - segments.mean(axis=-1, keepdims=True)
+        spectra = rfft(segments * self.window, axis=-1)
+        power = (spectra.real ** 2 + spectra.imag ** 2) * (self.scale * self.weights)
+        self.n_segments += n_complete
+        return np.moveaxis(power, -1, 1)
+
+class WelchAccumulator:
+    """Welch power spectral density of N signals accumulated chunk by chunk.
+
+    The running sum of the segment powers is the only state besides the incomplete last segment, so
+    memory does not depend on the length of the recording. The result equals scipy.signal.welch with
+    the same parameters and average='mean' on the concatenated signals.
+    """
+
+    def __init__(self, fs, window='hann', nperseg=256, noverlap=None, detrend='constant', scaling='density'):
+        """
+        Parameters:
+        - fs, window, nperseg, noverlap, detrend, scaling: As for SegmentStream.
+        """
+        self.stream = SegmentStream(fs, window, nperseg, noverlap, detrend, scaling)
+        self._sum = None
+
+    def update(self, chunk):
+        """Add the next chunk of samples, an array of shape (N, C)."""
+        power = self.stream.process(chunk)
+        total = power.sum(axis=-1)
+        self._sum = total if self._sum is None else self._sum + total
+
+    def result(self):
+        """
+        Returns:
+        - frequencies: Array of sample frequencies.
+        - psd: Array of shape (N, n_freq), the mean power of all segments so far.
+        """
+        if not self.stream.n_segments:
+            raise ValueError("No complete segment has been accumulated.")
+        return self.stream.frequencies, self._sum / self.stream.n_segments
+
+class SpectrogramAccumulator:
+    """Spectrogram of N signals computed chunk by chunk.
+
+    Each update returns the columns of the segments it completed, so a long recording can be turned into
+    a spectrogram (written elsewhere, or averaged over average consecutive segments to shrink it) without
+    holding the signal in memory. With average=1, the columns equal those of scipy.signal.spectrogram.
+    """
+
+    def __init__(self, fs, window=('tukey', 0.25), nperseg=256, noverlap=None, detrend='constant',
+                 scaling='density', average=1):
+        """
+        Parameters:
+        - fs, window, nperseg, detrend, scaling: As for SegmentStream.
+        - noverlap: Number of samples shared by consecutive segments; nperseg // 8 by default.
+        - average: Number of consecutive segments averaged into each returned column.
+        """
+        self.stream = SegmentStream(fs, window, nperseg, nperseg // 8 if noverlap is None else noverlap,
+                                    detrend, scaling)
+        self.average = int(average)
+        self._pending = None
+        self._columns = []
+        self._n_columns = 0
+
+    def update(self, chunk):
+        """
+        Add the next chunk of samples, an array of shape (N, C).
+
+        Returns:
+        - times: Center times of the new columns (s).
+        - columns: Array of shape (N, n_freq, k) with the new columns.
+        """
+        power = self.stream.process(chunk)
+        if self._pending is not None:
+            power = np.concatenate((self._pending, power), axis=-1)
+        n_new = power.shape[-1] // self.average
+        self._pending = power[..., n_new * self.average:]
+        columns = power[..., :n_new * self.average].reshape(power.shape[:2] + (n_new, self.average)).mean(axis=-1)
+        first = self._n_columns
+        self._n_columns += n_new
+        self._columns.append(columns)
+        # The center of a column is the mean of the centers of its segments
+        column_start = (first + np.arange(n_new)) * self.average * self.stream.step
+        times = (column_start + ((self.average - 1) * self.stream.step + self.stream.nperseg) / 2) / self.stream.fs
+        return times, columns
+
+    def result(self):
+        """
+        Returns:
+        - frequencies: Array of sample frequencies.
+        - times: Center times of all columns so far (s).
+        - spectrogram: Array of shape (N, n_freq, n_columns).
+        """
+        spectrogram = np.concatenate(self._columns, axis=-1) if self._columns \
+            else np.empty((0, len(self.stream.frequencies), 0))
+        column_start = np.arange(self._n_columns) * self.average * self.stream.step
+        times = (column_start + ((self.average - 1) * self.stream.step + self.stream.nperseg) / 2) / self.stream.fs
+        return self.stream.frequencies, times, spectrogram
+
+def _chunks(data, axis, channels, block):
+    """Yield successive time chunks of the given channels as (n_channels, C) arrays."""
+    n_samples = data.shape[axis]
+    for start in range(0, n_samples, block):
+        if axis == 0:
+            yield np.asarray(data[start:start + block, channels], dtype=np.float64).T
+        else:
+            yield np.asarray(data[channels, start:start + block], dtype=np.float64)
+
+def _run_channel_groups(make, data, axis, n_workers, chunk_size):
+    """Feed every group of channels to its own accumulator from make(), on a pool of worker threads."""
+    data_2d = data if np.ndim(data) == 2 else data[:, None]
+    n_channels = data_2d.shape[1 - axis]
+    n_workers = max(1, min(n_workers, n_channels))
+    groups = np.array_split(np.arange(n_channels), n_workers)
+
+    def run(channels):
+        accumulator = make()
+        block = max(accumulator.stream.nperseg, chunk_size // len(channels))
+        channels = slice(channels[0], channels[-1] + 1)
+        for chunk in _chunks(data_2d, axis, channels, block):
+            accumulator.update(chunk)
+        return accumulator.result()
+
+    with ThreadPoolExecutor(max_workers=n_workers) as pool:
+        return list(pool.map(run, groups))
+
+def welch_psd(data, fs, window='hann', nperseg=256, noverlap=None, detrend='constant', scaling='density',
+              axis=-1, n_workers=4, chunk_size=SPECTRAL_CHUNK):
+    """Welch power spectral density of one or many signals, streamed in chunks.
+
+    The data is read chunk by chunk, so arrays memory-mapped from disk (e.g. by open_recording) of any
+    length are processed in constant memory. Channels are split into n_workers groups processed by
+    parallel threads; the FFTs release the GIL.
+
+    Parameters:
+    - data: Array or memmap of shape (T,) or (N, T), or (T, N) with axis=0.
+    - fs: Sampling rate of the signals in Hz.
+    - window, nperseg, noverlap, detrend, scaling: As for scipy.signal.welch.
+    - axis: Time axis of data, -1 (or 1) or 0.
+    - n_workers: Number of worker threads.
+    - chunk_size: Approximate number of samples read at a time by each worker.
+
+    Returns:
+    - frequencies: Array of sample frequencies.
+    - psd: Array of shape (n_freq,) for a single signal, or (N, n_freq).
+    """
+    if np.ndim(data) == 1:
+        axis = 0
+    else:
+        axis = 0 if axis == 0 else 1
+    results = _run_channel_groups(lambda: WelchAccumulator(fs, window, nperseg, noverlap, detrend, scaling),
+                                  data, axis, n_workers, chunk_size)
+    psd = np.concatenate([psd for _, psd in results])
+    return results[0][0], psd[0] if np.ndim(data) == 1 else psd
+
+def spectrogram(data, fs, window=('tukey', 0.25), nperseg=256, noverlap=None, detrend='constant',
+                scaling='density', average=1, axis=-1, n_workers=4, chunk_size=SPECTRAL_CHUNK):
+    """Spectrogram of one or many signals, streamed in chunks.
+
+    Parameters:
+    - data: Array or memmap of shape (T,) or (N, T), or (T, N) with axis=0.
+    - fs: Sampling rate of the signals in Hz.
+    - window, nperseg, noverlap, detrend, scaling: As for scipy.signal.spectrogram.
+    - average: Number of consecutive segments averaged into each column.
+    - axis: Time axis of data, -1 (or 1) or 0.
+    - n_workers: Number of worker threads.
+    - chunk_size: Approximate number of samples read at a time by each worker.
+
+    Returns:
+    - frequencies: Array of sample frequencies.
+    - times: Center times of the columns (s).
+    - spectrogram: Array of shape (n_freq, n_columns) for a single signal, or (N, n_freq, n_columns).
+    """
+    if np.ndim(data) == 1:
+        axis = 0
+    else:
+        axis = 0 if axis == 0 else 1
+    results = _run_channel_groups(
+        lambda: SpectrogramAccumulator(fs, window, nperseg, noverlap, detrend, scaling, average),
+        data, axis, n_workers, chunk_size)
+    columns = np.concatenate([s for _, _, s in results])
+    frequencies, times, _ = results[0]
+    return frequencies, times, columns[0] if np.ndim(data) == 1 else columns
@@ -1,66 +1,459 @@
 # src/helpers/data_processing/spike_analysis.py
 
 import numpy as np
-from scipy.signal import find_peaks
+
+# Number of samples processed at once by the batched detector
+DETECTION_BLOCK = 1 << 22
+
+class SpikeTrains:
+    """Ragged per-channel arrays, such as spike indices, spike times or intervals, in CSR form.
+
+    The values of channel i are data[indptr[i]:indptr[i + 1]].
+    """
+
+    def __init__(self, indptr, data):
+        """
+        Parameters:
+        - indptr: Array of shape (n_channels + 1,) with the start of each channel's values in data.
+        - data: Values of all channels, concatenated in channel order.
+        """
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.data = np.asarray(data)
+
+    @classmethod
+    def from_pairs(cls, channels, values, n_channels):
+        """Build the trains from (channel, value) pairs in any order; values are sorted within each channel."""
+        channels = np.asarray(channels, dtype=np.int64)
+        values = np.asarray(values)
+        order = np.lexsort((values, channels))
+        indptr = np.searchsorted(channels[order], np.arange(n_channels + 1))
+        return cls(indptr, values[order])
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    def __getitem__(self, channel):
+        return self.data[self.indptr[channel]:self.indptr[channel + 1]]
+
+    def __iter__(self):
+        for channel in range(len(self)):
+            yield self[channel]
+
+    @property
+    def counts(self):
+        """Number of values of each channel."""
+        return np.diff(self.indptr)
+
+    @property
+    def channels(self):
+        """Channel of every value in data."""
+        return np.repeat(np.arange(len(self)), self.counts)
+
+    def lookup(self, values):
+        """Return new trains holding values[x] for every entry x, e.g. the spike times of spike indices."""
+        return SpikeTrains(self.indptr, np.asarray(values)[self.data])
+
+    def diff(self):
+        """Return the differences between consecutive values of each channel, e.g. inter-spike intervals."""
+        channels = self.channels
+        same = channels[:-1] == channels[1:]
+        counts = np.maximum(self.counts - 1, 0)
+        return SpikeTrains(np.concatenate(([0], np.cumsum(counts))), np.diff(self.data)[same])
+
+    def to_list(self):
+        """Return the trains as a list of arrays, one per channel."""
+        return list(self)
+
+
+class _CrossingState:
+    """State of upward threshold-crossing detection over successive chunks of N channels.
+
+    For every channel it keeps the last sample seen, the index of the last accepted crossing (for the
+    refractory period) and, when aligning to peaks, the largest sample of the suprathreshold excursion
+    still in progress. A spike is reported once its position is final: at the crossing, or at the peak
+    once the signal falls back below threshold.
+    """
+
+    def __init__(self, n_channels, threshold, refractory=0, align='crossing'):
+        if align not in ('crossing', 'peak'):
+            raise ValueError("Unsupported spike alignment specified.")
+        self.n_channels = n_channels
+        self.threshold = np.broadcast_to(np.asarray(threshold, dtype=np.float64), (n_channels,))[:, None]
+        self.refractory = int(refractory)
+        self.align = align
+        self.offset = 0  # Global index of the first sample of the next chunk
+        self.last_sample = np.full(n_channels, np.nan)
+        self.last_kept = np.full(n_channels, np.iinfo(np.int64).min // 2)
+        self.pending_index = np.full(n_channels, -1, dtype=np.int64)
+        self.pending_value = np.full(n_channels, -np.inf)
+
+    def _refractory_filter(self, channel, index):
+        """Mask of the crossings kept by the refractory period, processing each channel in order."""
+        previous = np.empty_like(index)
+        previous[1:] = index[:-1]
+        first = np.ones(len(index), dtype=bool)
+        first[1:] = channel[1:] != channel[:-1]
+        previous[first] = self.last_kept[channel[first]]
+        allowed = index - previous >= self.refractory
+        keep = np.ones(len(index), dtype=bool)
+        if allowed.all():
+            return keep
+        # A crossing dropped by the refractory period does not restart it, so violating channels are resolved in order
+        starts = np.flatnonzero(first)
+        ends = np.append(starts[1:], len(index))
+        for start, end in zip(starts, ends):
+            if allowed[start:end].all():
+                continue
+            last = self.last_kept[channel[start]]
+            for p in range(start, end):
+                if index[p] - last >= self.refractory:
+                    last = index[p]
+                else:
+                    keep[p] = False
+        return keep
+
+    def process(self, chunk):
+        """
+        Detect the spikes of the next chunk of samples.
+
+        Parameters:
+        - chunk: Array of shape (n_channels, C) following the previous chunk.
+
+        Returns:
+        - channels, indices: Channel and global sample index of each spike whose position became final.
+        """
+        chunk = np.ascontiguousarray(chunk, dtype=np.float64)
+        n_samples = chunk.shape[1]
+        if n_samples == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        with np.errstate(invalid='ignore'):
+            below = chunk < self.threshold
+            previous_below = np.empty_like(below)
+            previous_below[:, 0] = self.last_sample < self.threshold[:, 0]
+            previous_below[:, 1:] = below[:, :-1]
+            up = previous_below & (chunk >= self.threshold)
+        channel, position = np.nonzero(up)
+        index = position + self.offset
+        if self.refractory > 0 and len(index):
+            keep = self._refractory_filter(channel, index)
+            channel, position, index = channel[keep], position[keep], index[keep]
+        if len(index):
+            last = np.append(channel[1:] != channel[:-1], True)
+            self.last_kept[channel[last]] = index[last]
+
+        if self.align == 'crossing':
+            spikes = (channel, index)
+        else:
+            spikes = self._peaks(chunk, below, channel, position)
+        self.last_sample = chunk[:, -1].copy()
+        self.offset += n_samples
+        return spikes
+
+    def _peaks(self, chunk, below, channel, position):
+        """Track the suprathreshold excursions of a chunk and return the peaks of those that ended."""
+        n_samples = chunk.shape[1]
+        carried = np.flatnonzero(self.pending_index >= 0)
+        seg_channel = np.concatenate((carried, channel))
+        seg_start = np.concatenate((np.zeros(len(carried), dtype=np.int64), position))
+        is_carried = np.arange(len(seg_channel)) < len(carried)
+
+        # Every excursion runs up to the first sample below threshold, or past the end of the chunk
+        row_start = seg_channel * n_samples
+        below_flat = np.flatnonzero(below)
+        k = np.searchsorted(below_flat, row_start + seg_start)
+        k_valid = k < len(below_flat)
+        end = np.full(len(seg_channel), -1, dtype=np.int64)
+        end[k_valid] = below_flat[k[k_valid]]
+        closed = (end >= 0) & (end < row_start + n_samples)
+        end = np.where(closed, end - row_start, n_samples)
+
+        lengths = end - seg_start
+        peak_value = np.full(len(seg_channel), -np.inf)
+        peak_index = np.full(len(seg_channel), -1, dtype=np.int64)
+        nonempty = lengths > 0
+        if nonempty.any():
+            seg_lengths = lengths[nonempty]
+            offsets = np.cumsum(seg_lengths) - seg_lengths
+            flat = np.repeat(row_start[nonempty] + seg_start[nonempty] - offsets, seg_lengths) \
+                + np.arange(seg_lengths.sum())
+            values = chunk.ravel()[flat]
+            seg_max = np.maximum.reduceat(values, offsets)
+            # First sample reaching the maximum of each excursion
+            first = np.minimum.reduceat(np.where(values == np.repeat(seg_max, seg_lengths),
+                                                 np.arange(len(values)), len(values)), offsets)
+            peak_value[nonempty] = seg_max
+            peak_index[nonempty] = flat[first] - row_start[nonempty] + self.offset
+        # An excursion carried over from earlier chunks keeps its earlier peak on ties
+        earlier = is_carried & (self.pending_value[seg_channel] >= peak_value)
+        peak_value[earlier] = self.pending_value[seg_channel[earlier]]
+        peak_index[earlier] = self.pending_index[seg_channel[earlier]]
+
+        self.pending_index[carried] = -1
+        self.pending_value[carried] = -np.inf
+        still_open = ~closed
+        self.pending_index[seg_channel[still_open]] = peak_index[still_open]
+        self.pending_value[seg_channel[still_open]] = peak_value[still_open]
+        return seg_channel[closed], peak_index[closed]
+
+    def finish(self):
+        """Report the peaks of the excursions still in progress at the end of the signal."""
+        channel = np.flatnonzero(self.pending_index >= 0)
+        index = self.pending_index[channel].copy()
+        self.pending_index[channel] = -1
+        self.pending_value[channel] = -np.inf
+        return channel, index
+
+
+def detect_threshold_crossings(data, threshold, refractory=0, align='crossing', block_size=DETECTION_BLOCK):
+    """Detect upward threshold crossings in every channel of a (N, T) array in one vectorized pass.
+
+    The array is read in blocks of consecutive samples, so memory-mapped recordings larger than memory
+    can be processed.
+
+    Parameters:
+    - data: Array or memmap of shape (N, T), one channel per row.
+    - threshold: Detection threshold, a scalar or one value per channel.
+    - refractory: Minimum number of samples between two detected spikes of a channel.
+    - align: 'crossing' to report the first sample at or above threshold, 'peak' to report the largest
+      sample of the excursion above threshold.
+    - block_size: Approximate number of samples (over all channels) read at a time.
+
+    Returns:
+    - spikes: SpikeTrains of the sample indices of the spikes of each channel.
+    """
+    n_channels, n_samples = data.shape
+    state = _CrossingState(n_channels, threshold, refractory, align)
+    step = max(1, block_size // max(n_channels, 1))
+    channels, indices = [], []
+    for start in range(0, n_samples, step):
+        channel, index = state.process(data[:, start:start + step])
+        channels.append(channel)
+        indices.append(index)
+    channel, index = state.finish()
+    channels.append(channel)
+    indices.append(index)
+    return SpikeTrains.from_pairs(np.concatenate(channels), np.concatenate(indices), n_channels)
+
+
+class StreamingSpikeDetector:
+    """Online counterpart of detect_threshold_crossings for signals arriving in chunks.
+
+    Successive (N, C) chunks are fed to process(), which returns the spikes whose position became final.
+    Across chunk boundaries only the last sample, the index of the last accepted crossing (which enforces
+    the refractory period) and the peak of the excursion in progress are kept per channel, and the
+    detection is the same as detect_threshold_crossings, which runs on the same state, so the spikes
+    are identical to those of the batch detector on the concatenated signal once finish() is called.
+
+    Spike counts and inter-spike interval sums are updated with the new spikes only, so the running
+    statistics cost O(new spikes) per chunk.
+    """
+
+    def __init__(self, n_channels, threshold, refractory=0, align='crossing', dt=1.0, keep_spikes=True):
+        """
+        Parameters:
+        - n_channels: Number of channels N.
+        - threshold: Detection threshold, a scalar or one value per channel.
+        - refractory: Minimum number of samples between two detected spikes of a channel.
+        - align: 'crossing' or 'peak'; see detect_threshold_crossings.
+        - dt: Sampling interval (ms), used to convert sample indices to times.
+        - keep_spikes: Whether to keep all detected spikes for spike_trains().
+        """
+        self._state = _CrossingState(n_channels, threshold, refractory, align)
+        self.n_channels = n_channels
+        self.dt = dt
+        self.keep_spikes = keep_spikes
+        self.reset_statistics()
+        self._channels = []
+        self._indices = []
+
+    def reset_statistics(self):
+        """Restart the running spike counts and interval statistics."""
+        self.counts = np.zeros(self.n_channels, dtype=np.int64)
+        self.last_spike = np.full(self.n_channels, -1, dtype=np.int64)
+        self._isi_count = np.zeros(self.n_channels, dtype=np.int64)
+        self._isi_sum = np.zeros(self.n_channels)
+        self._isi_sum_squares = np.zeros(self.n_channels)
+        self._start = self._state.offset
+
+    def _update(self, channel, index):
+        if len(index) == 0:
+            return channel, index
+        order = np.lexsort((index, channel))
+        channel, index = channel[order], index[order]
+        previous = np.empty_like(index)
+        previous[1:] = index[:-1]
+        first = np.ones(len(index), dtype=bool)
+        first[1:] = channel[1:] != channel[:-1]
+        previous[first] = self.last_spike[channel[first]]
+        valid = previous >= 0
+        isi = (index[valid] - previous[valid]).astype(np.float64)
+        np.add.at(self.counts, channel, 1)
+        np.add.at(self._isi_count, channel[valid], 1)
+        np.add.at(self._isi_sum, channel[valid], isi)
+        np.add.at(self._isi_sum_squares, channel[valid], isi * isi)
+        last = np.append(first[1:], True)
+        self.last_spike[channel[last]] = index[last]
+        if self.keep_spikes:
+            self._channels.append(channel)
+            self._indices.append(index)
+        return channel, index
+
+    def process(self, chunk):
+        """
+        Detect the spikes of the next chunk of samples.
+
+        Parameters:
+        - chunk: Array of shape (N, C) following the previous chunk.
+
+        Returns:
+        - channels: Channel of each new spike.
+        - indices: Global sample index of each new spike, sorted by channel and index.
+        """
+        return self._update(*self._state.process(chunk))
+
+    def finish(self):
+        """Report the spikes still pending at the end of the signal, as returned by process."""
+        return self._update(*self._state.finish())
+
+    @property
+    def n_samples(self):
+        """Number of samples processed per channel."""
+        return self._state.offset
+
+    def spike_trains(self):
+        """Return the sample indices of all spikes detected so far as SpikeTrains."""
+        if not self.keep_spikes:
+            raise ValueError("Spikes are not kept; create the detector with keep_spikes=True.")
+        channels = np.concatenate(self._channels) if self._channels else np.zeros(0, dtype=np.int64)
+        indices = np.concatenate(self._indices) if self._indices else np.zeros(0, dtype=np.int64)
+        return SpikeTrains.from_pairs(channels, indices, self.n_channels)
+
+    def spike_rate(self):
+        """Average spike rate of each channel (Hz) since the statistics were last reset."""
+        duration = (self._state.offset - self._start) * self.dt
+        return self.counts / (duration / 1000.0) if duration > 0 else np.zeros(self.n_channels)
+
+    def mean_isi(self):
+        """Mean inter-spike interval of each channel (ms); NaN for channels with fewer than two spikes."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self._isi_sum / self._isi_count * self.dt
+
+    def isi_cv(self):
+        """Coefficient of variation of the inter-spike intervals of each channel."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = self._isi_sum / self._isi_count
+            variance = np.maximum(self._isi_sum_squares / self._isi_count - mean * mean, 0.0)
+            return np.sqrt(variance) / mean
+
 
 class SpikeAnalysis:
-    """Tools for analyzing spikes in neural simulation data."""
-    
-    def __init__(self, data, threshold=-55):
+    """Tools for analyzing spikes in neural simulation data.
+
+    Spikes are detected by detect_threshold_crossings. A (N, T) array, or memmap, of N channels is
+    analyzed in batch and results are returned per channel; a single trace is analyzed as a batch of
+    one channel, so it gives the same spikes as its own row of a (N, T) array. Detection runs once and
+    is cached; setting data or threshold discards the cached spikes.
+    """
+
+    def __init__(self, data, threshold=-55, refractory=0, align='crossing'):
         """
         Parameters:
-        - data: A numpy array or a pandas Series containing the membrane potential of a neuron.
-        - threshold: The voltage threshold for spike detection.
+        - data: A numpy array or a pandas Series containing the membrane potential of a neuron, or an array
+          or memmap of shape (N, T) with one channel per row.
+        - threshold: The voltage threshold for spike detection; for (N, T) data, a scalar or one value per channel.
+        - refractory: Minimum number of samples between two spikes of a channel.
+        - align: Spike position, 'crossing' or 'peak'; see detect_threshold_crossings.
         """
         self.data = data
         self.threshold = threshold
-    
+        self.refractory = refractory
+        self.align = align
+
+    @property
+    def data(self):
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self._data = data
+        self._spikes = None
+
+    @property
+    def threshold(self):
+        return self._threshold
+
+    @threshold.setter
+    def threshold(self, threshold):
+        self._threshold = threshold
+        self._spikes = None
+
+    @property
+    def batched(self):
+        """Whether the data holds several channels."""
+        return np.ndim(self._data) == 2
+
     def detect_spikes(self):
         """Detect spikes based on the membrane potential exceeding the threshold.
-        
+
         Returns:
-        - spikes: Indices of the time points where spikes occur.
+        - spikes: Indices of the time points where spikes occur; for (N, T) data, SpikeTrains of the
+          indices of each channel.
         """
-        spikes, _ = find_peaks(self.data, height=self.threshold)
-        return spikes
-    
+        settings = (self.refractory, self.align)
+        if self._spikes is None or self._spikes[0] != settings:
+            if self.batched:
+                spikes = detect_threshold_crossings(self._data, self._threshold, self.refractory, self.align)
+            else:
+                trace = np.asarray(self._data)[np.newaxis, :]
+                spikes = detect_threshold_crossings(trace, self._threshold, self.refractory, self.align)[0]
+            self._spikes = (settings, spikes)
+        return self._spikes[1]
+
     def calculate_isis(self, time):
         """Calculate inter-spike intervals (ISIs) from detected spikes.
-        
+
         Parameters:
         - time: A numpy array or a pandas Series containing the corresponding time points for the data.
-        
+
         Returns:
-        - isis: Inter-spike intervals in milliseconds.
+        - isis: Inter-spike intervals in milliseconds; for (N, T) data, SpikeTrains of the intervals of each channel.
         """
         spikes = self.detect_spikes()
+        if self.batched:
+            return spikes.lookup(np.asarray(time)).diff()
         spike_times = time[spikes]
         isis = np.diff(spike_times)
         return isis
-    
+
     def spike_rate(self, total_time):
         """Calculate the average spike rate over the simulation duration.
-        
+
         Parameters:
         - total_time: Total duration of the simulation in milliseconds.
-        
+
         Returns:
-        - rate: Average spike rate in Hz.
+        - rate: Average spike rate in Hz; for (N, T) data, an array with the rate of each channel.
         """
-        num_spikes = len(self.detect_spikes())
+        spikes = self.detect_spikes()
+        num_spikes = spikes.counts if self.batched else len(spikes)
         rate = num_spikes / (total_time / 1000.0)  # Convert ms to seconds for Hz
         return rate
-    
+
     def isi_histogram(self, bins=50):
         """Generate a histogram of inter-spike intervals.
-        
+
+        For (N, T) data, the intervals of all channels are pooled.
+
         Parameters:
         - bins: Number of bins for the histogram.
-        
+
         Returns:
         - hist: The values of the histogram.
         - bin_edges: The edges of the bins.
         """
-        isis = self.calculate_isis(np.arange(len(self.data)))
+        if self.batched:
+            isis = self.detect_spikes().diff().data
+        else:
+            isis = self.calculate_isis(np.arange(len(self.data)))
         hist, bin_edges = np.histogram(isis, bins=bins)
         return hist, bin_edges
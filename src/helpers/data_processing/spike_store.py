@@ -0,0 +1,261 @@
+# src/helpers/data_processing/spike_store.py
+
+import json
+import math
+import os
+
+import numpy as np
+
+HEADER_NAME = 'header.json'
+DATA_NAME = 'spikes.bin'
+INDEX_NAME = 'index.bin'
+
+# Candidate storage types of the encoded columns, smallest first
+UINT_DTYPES = (np.dtype('<u1'), np.dtype('<u2'), np.dtype('<u4'), np.dtype('<u8'))
+
+# One record per block: tick and neuron ranges, byte offset, event count and storage type codes
+INDEX_DTYPE = np.dtype([('t_min', '<i8'), ('t_max', '<i8'), ('n_min', '<i8'), ('n_max', '<i8'),
+                        ('offset', '<u8'), ('count', '<u4'), ('time_code', 'u1'), ('neuron_code', 'u1')])
+
+
+def _smallest_uint(max_value):
+    """Code of the smallest unsigned type in UINT_DTYPES able to hold max_value."""
+    for code, dtype in enumerate(UINT_DTYPES):
+        if max_value <= np.iinfo(dtype).max:
+            return code
+    raise ValueError("Value too large to encode.")
+
+
+class SpikeStore:
+    """On-disk store of (neuron, time) spike events, split into time-ordered, indexed blocks.
+
+    Times are stored as integer ticks of the given resolution. Events are cut in time order into blocks
+    of up to block_size events; inside a block they are sorted by neuron and then time, and stored as two
+    columns: the tick offsets from the block's first tick and the neuron ids relative to the block's
+    smallest id, each in the smallest unsigned type that fits. The block index holds the time and neuron
+    range of every block. A query only reads the blocks whose ranges meet the requested window and
+    neurons, finds the requested neurons inside each block by binary search on the stored id column, and
+    filters the times of that slice only.
+
+    A store is a directory holding the block data, the block index and a JSON header. Events are
+    appended in time order while a simulation runs and written one full block at a time; the header is
+    replaced atomically after each block, so the store can be read while it is being written.
+    """
+
+    def __init__(self, path, mode='r', resolution=1e-3, block_size=65536):
+        """
+        Parameters:
+        - path: Directory of the store.
+        - mode: 'r' to read an existing store, 'a' to append to it, 'w' to create a new one (replacing any
+          existing store at path).
+        - resolution: Time resolution of the stored spike times (ms); used by mode 'w' only.
+        - block_size: Maximum number of events per block; used by mode 'w' only.
+        """
+        if mode not in ('r', 'a', 'w'):
+            raise ValueError("Unsupported mode specified.")
+        self.path = path
+        self.mode = mode
+        if mode == 'w':
+            os.makedirs(path, exist_ok=True)
+            for name in (DATA_NAME, INDEX_NAME):
+                open(os.path.join(path, name), 'wb').close()
+            self.resolution = float(resolution)
+            self.block_size = int(block_size)
+            self._n_events = 0
+            self._n_blocks = 0
+            self._write_header()
+        else:
+            with open(os.path.join(path, HEADER_NAME)) as f:
+                header = json.load(f)
+            self.resolution = header['resolution']
+            self.block_size = header['block_size']
+            self._n_events = header['n_events']
+            self._n_blocks = header['n_blocks']
+
+        self._index = np.fromfile(os.path.join(path, INDEX_NAME), dtype=INDEX_DTYPE, count=self._n_blocks)
+        self._data = None
+        self._data_file = self._index_file = None
+        if mode != 'r':
+            self._data_file = open(os.path.join(path, DATA_NAME), 'r+b')
+            self._index_file = open(os.path.join(path, INDEX_NAME), 'r+b')
+            # Drop anything written after the last complete block
+            end = int(self._index['offset'][-1]) + self._block_nbytes(self._index[-1]) if self._n_blocks else 0
+            self._data_file.truncate(end)
+            self._data_file.seek(end)
+            self._index_file.truncate(self._n_blocks * INDEX_DTYPE.itemsize)
+            self._index_file.seek(0, os.SEEK_END)
+        self._pending_ticks = []
+        self._pending_neurons = []
+        self._n_pending = 0
+
+    @staticmethod
+    def _block_nbytes(record):
+        return int(record['count']) * (UINT_DTYPES[record['time_code']].itemsize
+                                       + UINT_DTYPES[record['neuron_code']].itemsize)
+
+    def _write_header(self):
+        header = {'resolution': self.resolution, 'block_size': self.block_size,
+                  'n_events': self._n_events, 'n_blocks': self._n_blocks}
+        temporary = os.path.join(self.path, HEADER_NAME + '.tmp')
+        with open(temporary, 'w') as f:
+            json.dump(header, f)
+        os.replace(temporary, os.path.join(self.path, HEADER_NAME))
+
+    def __len__(self):
+        """Number of stored events, including those not yet written to a block."""
+        return self._n_events + self._n_pending
+
+    def append(self, neurons, times):
+        """
+        Add spike events.
+
+        Events may arrive in any order within a call and across calls, as long as none is earlier than
+        the events already written to disk; in practice, the spikes of each simulation step in turn.
+
+        Parameters:
+        - neurons: Neuron ids of the events (non-negative integers).
+        - times: Spike times of the events (ms).
+        """
+        if self.mode == 'r':
+            raise ValueError("The store is open for reading only.")
+        neurons = np.asarray(neurons, dtype=np.int64).ravel()
+        ticks = np.rint(np.asarray(times, dtype=np.float64).ravel() / self.resolution).astype(np.int64)
+        if len(ticks) == 0:
+            return
+        if self._n_blocks and ticks.min() < self._index['t_max'][-1]:
+            raise ValueError("Spike times must not precede the events already stored.")
+        self._pending_ticks.append(ticks)
+        self._pending_neurons.append(neurons)
+        self._n_pending += len(ticks)
+        if self._n_pending >= self.block_size:
+            self._write_blocks(final=False)
+
+    def _pending(self):
+        """Pending events sorted by tick and neuron."""
+        if not self._n_pending:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        ticks = np.concatenate(self._pending_ticks)
+        neurons = np.concatenate(self._pending_neurons)
+        order = np.lexsort((neurons, ticks))
+        ticks, neurons = ticks[order], neurons[order]
+        self._pending_ticks = [ticks]
+        self._pending_neurons = [neurons]
+        return ticks, neurons
+
+    def _write_blocks(self, final):
+        """Encode and write full blocks of pending events, and the remainder as well if final."""
+        ticks, neurons = self._pending()
+        n_blocks = len(ticks) // self.block_size
+        if final and len(ticks) % self.block_size:
+            n_blocks += 1
+        if n_blocks == 0:
+            return
+        records = np.zeros(n_blocks, dtype=INDEX_DTYPE)
+        offset = self._data_file.tell()
+        for b in range(n_blocks):
+            block_ticks = ticks[b * self.block_size:(b + 1) * self.block_size]
+            block_neurons = neurons[b * self.block_size:(b + 1) * self.block_size]
+            order = np.lexsort((block_ticks, block_neurons))
+            record = records[b]
+            record['t_min'], record['t_max'] = block_ticks[0], block_ticks[-1]
+            record['n_min'], record['n_max'] = block_neurons.min(), block_neurons.max()
+            record['offset'], record['count'] = offset, len(block_ticks)
+            offsets = block_ticks[order] - record['t_min']
+            relative = block_neurons[order] - record['n_min']
+            record['time_code'] = _smallest_uint(record['t_max'] - record['t_min'])
+            record['neuron_code'] = _smallest_uint(record['n_max'] - record['n_min'])
+            self._data_file.write(offsets.astype(UINT_DTYPES[record['time_code']]).tobytes())
+            self._data_file.write(relative.astype(UINT_DTYPES[record['neuron_code']]).tobytes())
+            offset += self._block_nbytes(record)
+        self._data_file.flush()
+        self._index_file.write(records.tobytes())
+        self._index_file.flush()
+
+        written = len(ticks) if final else n_blocks * self.block_size
+        self._pending_ticks = [ticks[written:]]
+        self._pending_neurons = [neurons[written:]]
+        self._n_pending = len(ticks) - written
+        self._index = np.concatenate((self._index, records))
+        self._n_blocks += n_blocks
+        self._n_events += written
+        self._write_header()
+
+    def flush(self):
+        """Write all pending events to disk, the last block possibly smaller than block_size."""
+        if self.mode != 'r':
+            self._write_blocks(final=True)
+
+    def close(self):
+        """Flush pending events and close the store files."""
+        if self._data_file is not None:
+            self.flush()
+            self._data_file.close()
+            self._index_file.close()
+            self._data_file = self._index_file = None
+        self._data = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _block_columns(self, record):
+        """Views of the tick offsets and relative neuron ids of a block, in the stored types."""
+        end = int(record['offset']) + self._block_nbytes(record)
+        if self._data is None or len(self._data) < end:
+            self._data = np.memmap(os.path.join(self.path, DATA_NAME), dtype=np.uint8, mode='r')
+        count = int(record['count'])
+        time_dtype = UINT_DTYPES[record['time_code']]
+        start = int(record['offset'])
+        offsets = np.frombuffer(self._data, dtype=time_dtype, count=count, offset=start)
+        neurons = np.frombuffer(self._data, dtype=UINT_DTYPES[record['neuron_code']], count=count,
+                                offset=start + count * time_dtype.itemsize)
+        return offsets, neurons
+
+    def query(self, neurons=None, t0=None, t1=None):
+        """
+        Return the spikes of a range of neurons in a time window, sorted by time.
+
+        Parameters:
+        - neurons: Optional (first, stop) pair selecting neuron ids first <= id < stop; all neurons by default.
+        - t0, t1: Optional bounds of the window t0 <= t < t1 (ms); unbounded by default.
+
+        Returns:
+        - neuron_ids: Neuron ids of the selected events.
+        - times: Spike times of the selected events (ms), on the store's time resolution.
+        """
+        lo = -np.inf if t0 is None else math.ceil(t0 / self.resolution - 1e-9)
+        hi = np.inf if t1 is None else math.ceil(t1 / self.resolution - 1e-9)
+        n0, n1 = (-np.inf, np.inf) if neurons is None else neurons
+
+        index = self._index
+        # Blocks are in time order, so the candidates are a contiguous run of the index
+        first = np.searchsorted(index['t_max'], lo, side='left')
+        last = np.searchsorted(index['t_min'], hi, side='left')
+        candidates = first + np.flatnonzero((index['n_max'][first:last] >= n0) & (index['n_min'][first:last] < n1))
+
+        selected_ticks, selected_neurons = [], []
+        for record in index[candidates]:
+            offsets, relative = self._block_columns(record)
+            if neurons is not None:
+                a, b = np.searchsorted(relative, [max(n0 - record['n_min'], 0),
+                                                  min(n1 - record['n_min'], record['n_max'] - record['n_min'] + 1)])
+                offsets, relative = offsets[a:b], relative[a:b]
+            ticks = offsets + record['t_min']
+            if lo > record['t_min'] or hi <= record['t_max']:
+                keep = (ticks >= lo) & (ticks < hi)
+                ticks, relative = ticks[keep], relative[keep]
+            selected_ticks.append(ticks)
+            selected_neurons.append(relative + record['n_min'])
+        if self._n_pending:
+            ticks, ids = self._pending()
+            keep = (ticks >= lo) & (ticks < hi) & (ids >= n0) & (ids < n1)
+            selected_ticks.append(ticks[keep])
+            selected_neurons.append(ids[keep])
+        if not selected_ticks:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        ticks = np.concatenate(selected_ticks)
+        ids = np.concatenate(selected_neurons)
+        order = np.lexsort((ids, ticks))
+        return ids[order], ticks[order] * self.resolution
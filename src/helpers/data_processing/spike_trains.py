@@ -0,0 +1,176 @@
+# src/helpers/data_processing/spike_trains.py
+
+import numpy as np
+from spike_analysis import SpikeTrains
+
+# Approximate number of spikes or spike pairs processed at a time
+SPIKE_BATCH = 1 << 22
+
+def as_spike_trains(trains):
+    """Return trains as SpikeTrains; a list of arrays becomes one train per entry."""
+    if isinstance(trains, SpikeTrains):
+        return trains
+    trains = [np.asarray(train, dtype=np.float64).ravel() for train in trains]
+    indptr = np.concatenate(([0], np.cumsum([len(train) for train in trains])))
+    return SpikeTrains(indptr, np.concatenate(trains) if trains else np.zeros(0))
+
+def _ranges(starts, counts):
+    """Concatenated ranges starts[i]:starts[i] + counts[i], and the range each entry comes from."""
+    total = counts.sum()
+    owner = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.cumsum(counts) - counts
+    return np.repeat(starts - offsets, counts) + np.arange(total), owner
+
+def _batches(counts, size):
+    """Split range(len(counts)) into consecutive slices whose counts sum to about size each."""
+    bounds = np.searchsorted(np.cumsum(counts), np.arange(size, counts.sum(), size), side='left') + 1
+    edges = np.unique(np.concatenate(([0], bounds, [len(counts)])))
+    return [slice(a, b) for a, b in zip(edges[:-1], edges[1:])]
+
+def cross_correlograms(trains, pairs, window, bin_width):
+    """Cross-correlograms of many pairs of spike trains.
+
+    The trains are laid end to end on a single sorted axis, train j shifted by j times a span longer
+    than any train, so the target spikes within the window of every reference spike of every pair are
+    found at once by two binary searches (a sorted merge), in O(n log n) plus the number of spike pairs
+    falling inside the window. Counts are binned with np.bincount.
+
+    Parameters:
+    - trains: SpikeTrains or list of arrays of sorted spike times (ms).
+    - pairs: Array of shape (P, 2) of (reference, target) train indices; (i, i) gives the autocorrelogram,
+      from which the zero-lag pairing of each spike with itself is excluded.
+    - window: Largest lag (ms); lags in [-window, window) are counted.
+    - bin_width: Width of the lag bins (ms).
+
+    Returns:
+    - bin_edges: Array of n_bins + 1 lag bin edges (ms).
+    - counts: Array of shape (P, n_bins) with the number of target spikes at each lag from a reference spike.
+    """
+    trains = as_spike_trains(trains)
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    n_bins = int(round(2 * window / bin_width))
+    bin_edges = -window + bin_width * np.arange(n_bins + 1)
+    counts = np.zeros((len(pairs), n_bins), dtype=np.int64)
+    if len(trains.data) == 0:
+        return bin_edges, counts
+
+    times = trains.data.astype(np.float64)
+    origin = times.min()
+    span = times.max() - origin + 2 * window + 1.0
+    keys = times - origin + trains.channels * span
+
+    reference_counts = trains.counts[pairs[:, 0]]
+    for batch in _batches(reference_counts, SPIKE_BATCH):
+        batch_pairs = pairs[batch]
+        reference, pair = _ranges(trains.indptr[batch_pairs[:, 0]], reference_counts[batch])
+        query = times[reference] - origin + batch_pairs[pair, 1] * span
+        # Search one bin wider than the window, so that rounding in the shifted keys loses no pair;
+        # the exact lags are binned below
+        lo = np.searchsorted(keys, query - window - bin_width, side='left')
+        hi = np.searchsorted(keys, query + window + bin_width, side='left')
+        matched = hi - lo
+        for sub in _batches(matched, SPIKE_BATCH):
+            target, owner = _ranges(lo[sub], matched[sub])
+            owner += sub.start
+            lag = times[target] - times[reference[owner]]
+            bins = np.floor((lag + window) / bin_width).astype(np.int64)
+            valid = (bins >= 0) & (bins < n_bins) & (target != reference[owner])
+            counts[batch] += np.bincount(pair[owner[valid]] * n_bins + bins[valid],
+                                         minlength=len(batch_pairs) * n_bins).reshape(len(batch_pairs), n_bins)
+    return bin_edges, counts
+
+def cross_correlogram(reference, target, window, bin_width):
+    """Cross-correlogram of two sorted spike trains; see cross_correlograms.
+
+    Returns:
+    - bin_edges: Array of n_bins + 1 lag bin edges (ms).
+    - counts: Array of shape (n_bins,).
+    """
+    bin_edges, counts = cross_correlograms([reference, target], [(0, 1)], window, bin_width)
+    return bin_edges, counts[0]
+
+def psth(trains, events, t_before, t_after, bin_width):
+    """Peri-stimulus time histograms of many neurons over many trials.
+
+    For every spike, the events (trial onsets) less than t_after before it and at most t_before after it
+    are found by binary search in the sorted events, and the spike times relative to those events are
+    binned with np.bincount, for all neurons at once.
+
+    Parameters:
+    - trains: SpikeTrains or list of arrays of spike times (ms), one per neuron.
+    - events: Times of the events the responses are aligned to (ms), one per trial.
+    - t_before, t_after: Extent of the histogram before and after each event (ms).
+    - bin_width: Width of the time bins (ms).
+
+    Returns:
+    - bin_edges: Array of n_bins + 1 bin edges relative to the events (ms).
+    - rates: Array of shape (N, n_bins) with the firing rate of each neuron in each bin (Hz), averaged over events.
+    """
+    trains = as_spike_trains(trains)
+    events = np.sort(np.asarray(events, dtype=np.float64).ravel())
+    n_bins = int(round((t_before + t_after) / bin_width))
+    bin_edges = -t_before + bin_width * np.arange(n_bins + 1)
+    counts = np.zeros(len(trains) * n_bins, dtype=np.int64)
+    times = trains.data.astype(np.float64)
+    channels = trains.channels
+
+    for start in range(0, len(times), SPIKE_BATCH):
+        spikes = times[start:start + SPIKE_BATCH]
+        lo = np.searchsorted(events, spikes - t_after, side='right')
+        hi = np.searchsorted(events, spikes + t_before, side='right')
+        event, spike = _ranges(lo, hi - lo)
+        bins = np.floor((spikes[spike] - events[event] + t_before) / bin_width).astype(np.int64)
+        valid = (bins >= 0) & (bins < n_bins)
+        counts += np.bincount(channels[start + spike[valid]] * n_bins + bins[valid], minlength=len(counts))
+    rates = counts.reshape(len(trains), n_bins) / (max(len(events), 1) * bin_width / 1000.0)
+    return bin_edges, rates
+
+def spike_triggered_average(signal, triggers, n_before, n_after):
+    """Average of a signal in windows around trigger spikes, gathered from a strided window view.
+
+    Three layouts are supported:
+    - signal (T,) and triggers an array of sample indices: one average of shape (L,).
+    - signal (M, T) and triggers an array of sample indices: the same triggers for every row, shape (M, L).
+    - signal (N, T) and triggers SpikeTrains (or a list) of N index arrays: row i averaged around the
+      triggers of train i, shape (N, L).
+    Triggers whose window extends beyond the signal are skipped.
+
+    Parameters:
+    - signal: Array or memmap, e.g. V_m traces.
+    - triggers: Sample indices of the trigger spikes, as detected by SpikeAnalysis.
+    - n_before, n_after: Number of samples before and after (excluding) each trigger; L = n_before + n_after.
+
+    Returns:
+    - offsets: Sample offsets of the window relative to the trigger.
+    - sta: The averaged windows; NaN for rows without triggers.
+    """
+    length = n_before + n_after
+    windows = np.lib.stride_tricks.sliding_window_view(signal, length, axis=-1)
+    n_windows = windows.shape[-2]
+    offsets = np.arange(-n_before, n_after)
+
+    if isinstance(triggers, SpikeTrains) or (len(triggers) and np.ndim(triggers[0]) == 1):
+        trains = as_spike_trains(triggers)
+        start = trains.data.astype(np.int64) - n_before
+        channels = trains.channels
+        valid = (start >= 0) & (start < n_windows)
+        start, channels = start[valid], channels[valid]
+        sums = np.zeros((len(trains), length))
+        step = max(1, SPIKE_BATCH // length)
+        for b in range(0, len(start), step):
+            batch_channels = channels[b:b + step]
+            gathered = windows[batch_channels, start[b:b + step]]
+            # Triggers are ordered by channel, so each channel is one contiguous run
+            first = np.flatnonzero(np.r_[True, batch_channels[1:] != batch_channels[:-1]])
+            sums[batch_channels[first]] += np.add.reduceat(gathered, first, axis=0)
+        counts = np.bincount(channels, minlength=len(trains))
+    else:
+        start = np.asarray(triggers, dtype=np.int64).ravel() - n_before
+        start = start[(start >= 0) & (start < n_windows)]
+        sums = np.zeros(windows.shape[:-2] + (length,))
+        step = max(1, SPIKE_BATCH // (length * max(1, int(np.prod(windows.shape[:-2])))))
+        for b in range(0, len(start), step):
+            sums += windows[..., start[b:b + step], :].sum(axis=-2)
+        counts = np.full(windows.shape[:-2], len(start))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return offsets, sums / np.asarray(counts)[..., None]
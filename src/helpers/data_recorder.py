@@ -1,38 +1,352 @@
 # src/helpers/data_recorder.py
 
+import json
+import os
+import queue
+import threading
+
 import numpy as np
 import pandas as pd
 
+MANIFEST_NAME = 'manifest.json'
+
+class _Column:
+    """Samples of one recorded variable, stored in fixed-size chunks.
+
+    A new chunk is allocated when the current one is full, so appending never copies earlier samples.
+    """
+
+    def __init__(self, shape, dtype, chunk_size):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.chunk_size = chunk_size
+        self._chunks = []
+        self._current = None
+        self._fill = 0  # Number of samples in the current chunk
+        self.count = 0
+
+    def append(self, value):
+        """Write one sample into the next row of the current chunk."""
+        if self._current is None or self._fill == len(self._current):
+            if self._current is not None:
+                self._seal(self._current)
+            self._current = np.empty((self.chunk_size,) + self.shape, dtype=self.dtype)
+            self._fill = 0
+        self._current[self._fill] = value
+        self._fill += 1
+        self.count += 1
+
+    def _seal(self, chunk):
+        """Store a full chunk."""
+        self._chunks.append(chunk)
+
+    def values(self):
+        """Return all samples as one array of shape (count,) + shape."""
+        if self._current is None:
+            return np.empty((0,) + self.shape, dtype=self.dtype)
+        if not self._chunks:
+            return self._current[:self._fill]
+        # Merge the chunks once; later calls return views until the next chunk is allocated
+        merged = np.concatenate(self._chunks + [self._current[:self._fill]])
+        self._chunks = []
+        self._current = merged
+        self._fill = len(merged)
+        return merged
+
+
 class DataRecorder:
-    """Class for recording and exporting simulation data."""
-    def __init__(self):
-        self.data = {
-            'time': [],
-            'V_m': [],
-            'gating_variables': {}
-        }
-    
+    """Class for recording and exporting simulation data.
+
+    Each variable is stored in its own column of NumPy chunks, so recording a step costs one row
+    assignment per variable and the memory used is the size of the samples themselves. A variable may
+    be a scalar (single neuron) or an (N,) vector (population); for vectors, the neurons argument
+    selects which entries are kept.
+    """
+
+    def __init__(self, variables=None, neurons=None, decimation=1, chunk_size=4096, dtype=np.float64):
+        """
+        Parameters:
+        - variables: Names of the variables to record, e.g. ('V_m', 'm'); None records everything passed to record.
+        - neurons: Optional indices of the neurons to keep from vector-valued samples.
+        - decimation: Keep one call to record out of every decimation calls.
+        - chunk_size: Number of samples allocated at a time for each variable.
+        - dtype: Data type of the recorded values.
+        """
+        if decimation < 1:
+            raise ValueError("decimation must be a positive integer.")
+        self.variables = None if variables is None else set(variables)
+        self.neurons = None if neurons is None else np.asarray(neurons, dtype=np.intp)
+        self.decimation = int(decimation)
+        self.chunk_size = int(chunk_size)
+        self.dtype = dtype
+        self.reset()
+
+    def _new_column(self, name, shape):
+        """Create the storage of a variable recorded for the first time."""
+        return _Column(shape, np.float64 if name == 'time' else self.dtype, self.chunk_size)
+
+    def _append(self, name, value):
+        if self.neurons is not None and np.ndim(value) > 0:
+            value = np.asarray(value)[self.neurons]
+        column = self._columns.get(name)
+        if column is None:
+            column = self._columns[name] = self._new_column(name, np.shape(value))
+        column.append(value)
+
     def record(self, time, V_m, gating_vars=None):
-        """Record the neuron's membrane potential and optionally gating variables at a given time."""
-        self.data['time'].append(time)
-        self.data['V_m'].append(V_m)
+        """Record the membrane potential and optionally gating variables at a given time.
+
+        Parameters:
+        - time: Current simulation time.
+        - V_m: Membrane potential, a scalar or an (N,) array for a population.
+        - gating_vars: Optional dictionary of further variables (scalars or (N,) arrays) by name.
+        """
+        self._n_calls += 1
+        if (self._n_calls - 1) % self.decimation:
+            return
+        self._append('time', time)
+        if self.variables is None or 'V_m' in self.variables:
+            self._append('V_m', V_m)
         if gating_vars:
             for var_name, var_value in gating_vars.items():
-                if var_name not in self.data['gating_variables']:
-                    self.data['gating_variables'][var_name] = []
-                self.data['gating_variables'][var_name].append(var_value)
-    
+                if self.variables is None or var_name in self.variables:
+                    self._append(var_name, var_value)
+
+    def __len__(self):
+        """Number of recorded samples."""
+        column = self._columns.get('time')
+        return 0 if column is None else column.count
+
+    @property
+    def names(self):
+        """Names of the recorded variables, in the order they were first recorded."""
+        return list(self._columns)
+
+    def get(self, name):
+        """Return the samples of a variable as an array of shape (n_samples,) or (n_samples, n_neurons)."""
+        if name not in self._columns:
+            raise KeyError(f"Variable '{name}' has not been recorded.")
+        return self._columns[name].values()
+
+    def __getitem__(self, name):
+        return self.get(name)
+
+    @property
+    def data(self):
+        """Recorded data in the dictionary layout of earlier versions: time, V_m and gating_variables."""
+        data = {'time': self.get('time') if 'time' in self._columns else np.empty(0),
+                'V_m': self.get('V_m') if 'V_m' in self._columns else np.empty(0),
+                'gating_variables': {}}
+        for name in self._columns:
+            if name not in ('time', 'V_m'):
+                data['gating_variables'][name] = self.get(name)
+        return data
+
+    def to_dataframe(self):
+        """Return the recorded data as a DataFrame, with one column per variable and recorded neuron."""
+        frames = []
+        for name in self._columns:
+            values = self.get(name)
+            if values.ndim == 1:
+                frames.append(pd.DataFrame({name: values}))
+            else:
+                neurons = self.neurons if self.neurons is not None else np.arange(values.shape[1])
+                frames.append(pd.DataFrame(values.reshape(len(values), -1),
+                                           columns=[f'{name}[{i}]' for i in neurons]))
+        return pd.concat(frames, axis=1) if frames else pd.DataFrame()
+
     def export_to_csv(self, filename):
         """Export recorded data to a CSV file."""
-        df = pd.DataFrame(self.data)
-        gating_vars_df = pd.DataFrame(self.data['gating_variables'])
-        full_df = pd.concat([df[['time', 'V_m']], gating_vars_df], axis=1)
-        full_df.to_csv(filename, index=False)
-    
+        self.to_dataframe().to_csv(filename, index=False)
+
     def reset(self):
         """Reset the recorder to record a new simulation."""
-        self.data = {
-            'time': [],
-            'V_m': [],
-            'gating_variables': {}
-        }
+        self._columns = {}
+        self._n_calls = 0
+
+
+class _StreamingColumn(_Column):
+    """Column whose full chunks are handed to the writer thread of a StreamingDataRecorder."""
+
+    def __init__(self, name, shape, dtype, chunk_size, recorder):
+        super().__init__(shape, dtype, chunk_size)
+        self.name = name
+        self.recorder = recorder
+        self._flushed = 0  # Rows of the current chunk already handed to the writer
+
+    def _seal(self, chunk):
+        self.recorder._submit(self.name, chunk[self._flushed:])
+        self._flushed = 0
+
+    def flush(self):
+        """Hand the rows of the partially filled current chunk to the writer."""
+        if self._current is not None and self._fill > self._flushed:
+            self.recorder._submit(self.name, self._current[self._flushed:self._fill].copy())
+            self._flushed = self._fill
+
+    def values(self):
+        return self.recorder._read(self.name)
+
+
+class StreamingDataRecorder(DataRecorder):
+    """DataRecorder that streams its samples to disk instead of keeping them in memory.
+
+    Every variable is written to a raw binary file <name>.dat in the recording directory, one row per
+    sample, next to a JSON manifest with the dtype, sample shape and number of rows written of each
+    variable, dt, the recorded neurons and whether the recording is complete. Full chunks are queued
+    to a background thread that writes them and then replaces the manifest atomically, so recording
+    does not wait for the disk and the manifest never refers to rows that are not yet in the files.
+    The queue holds at most max_pending chunks: when the disk falls behind, recording blocks until the
+    writer catches up instead of buffering without limit. Variables enter the manifest, with zero rows,
+    when they are first recorded. Recordings, finished or in progress, are opened without copying by
+    open_recording.
+    """
+
+    def __init__(self, path, dt=None, variables=None, neurons=None, decimation=1, chunk_size=4096,
+                 dtype=np.float64, max_pending=16):
+        """
+        Parameters:
+        - path: Directory of the recording; created if needed, and existing recording files are replaced.
+        - dt: Time step of the simulation, stored in the manifest.
+        - variables, neurons, decimation, chunk_size, dtype: As for DataRecorder.
+        - max_pending: Number of chunks queued to the writer before recording blocks.
+        """
+        if max_pending < 1:
+            raise ValueError("max_pending must be a positive integer.")
+        self.path = path
+        self.dt = dt
+        self.max_pending = int(max_pending)
+        self._writer = None
+        super().__init__(variables, neurons, decimation, chunk_size, dtype)
+
+    def _new_column(self, name, shape):
+        column = _StreamingColumn(name, shape, np.float64 if name == 'time' else self.dtype, self.chunk_size, self)
+        with self._lock:
+            self._manifest['variables'][name] = {'file': f'{name}.dat', 'dtype': column.dtype.str,
+                                                 'shape': list(column.shape), 'rows': 0}
+            self._write_manifest()
+        return column
+
+    def _submit(self, name, rows):
+        if self._error is not None:
+            raise RuntimeError("The recording writer failed.") from self._error
+        self._queue.put((name, rows))
+
+    def _write_manifest(self):
+        temporary = os.path.join(self.path, MANIFEST_NAME + '.tmp')
+        with open(temporary, 'w') as f:
+            json.dump(self._manifest, f, indent=2)
+        os.replace(temporary, os.path.join(self.path, MANIFEST_NAME))
+
+    def _write_loop(self):
+        files = {}
+        try:
+            while True:
+                item = self._queue.get()
+                try:
+                    if item is None:
+                        break
+                    name, rows = item
+                    f = files.get(name)
+                    if f is None:
+                        f = files[name] = open(os.path.join(self.path, f'{name}.dat'), 'wb')
+                    f.write(np.ascontiguousarray(rows).data)
+                    f.flush()
+                    with self._lock:
+                        self._manifest['variables'][name]['rows'] += len(rows)
+                        self._write_manifest()
+                finally:
+                    self._queue.task_done()
+        except BaseException as error:
+            self._error = error
+            # Keep draining so that flush() and close() do not wait forever
+            while self._queue.get() is not None:
+                self._queue.task_done()
+            self._queue.task_done()
+        finally:
+            for f in files.values():
+                f.close()
+
+    def _read(self, name):
+        self.flush()
+        return open_recording(self.path)[name]
+
+    def flush(self):
+        """Hand all recorded samples to the writer and wait until they are on disk."""
+        if self._writer is None:
+            return
+        for column in self._columns.values():
+            column.flush()
+        self._queue.join()
+        if self._error is not None:
+            raise RuntimeError("The recording writer failed.") from self._error
+
+    def close(self):
+        """Write the remaining samples, mark the recording as complete and stop the writer thread."""
+        if self._writer is None:
+            return
+        try:
+            self.flush()
+        finally:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+        self._manifest['complete'] = True
+        self._write_manifest()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def reset(self):
+        """Stop the current recording and start a new, empty one in the same directory."""
+        if self._writer is not None:
+            self.close()
+        os.makedirs(self.path, exist_ok=True)
+        if os.path.exists(os.path.join(self.path, MANIFEST_NAME)):
+            # Remove the files of the recording being replaced
+            for info in read_manifest(self.path)['variables'].values():
+                if os.path.exists(os.path.join(self.path, info['file'])):
+                    os.remove(os.path.join(self.path, info['file']))
+        super().reset()
+        self._manifest = {'dt': self.dt, 'decimation': self.decimation,
+                          'neurons': None if self.neurons is None else self.neurons.tolist(),
+                          'complete': False, 'variables': {}}
+        self._write_manifest()
+        self._error = None
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=self.max_pending)
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+
+def read_manifest(path):
+    """Return the manifest of a recording written by StreamingDataRecorder."""
+    with open(os.path.join(path, MANIFEST_NAME)) as f:
+        return json.load(f)
+
+
+def open_recording(path, mode='r'):
+    """Open the variables of a recording written by StreamingDataRecorder as memory-mapped arrays.
+
+    Only the rows listed in the manifest are mapped, so a recording can be opened while it is still
+    being written; reopen it to see the rows written since.
+
+    Parameters:
+    - path: Directory of the recording.
+    - mode: Memory-map mode, 'r' (read-only) or 'r+'.
+
+    Returns:
+    - arrays: Dictionary mapping each variable name to an array of shape (rows,) + sample shape.
+    """
+    manifest = read_manifest(path)
+    arrays = {}
+    for name, info in manifest['variables'].items():
+        shape = (info['rows'],) + tuple(info['shape'])
+        if info['rows'] == 0:
+            arrays[name] = np.empty(shape, dtype=info['dtype'])
+        else:
+            arrays[name] = np.memmap(os.path.join(path, info['file']), dtype=info['dtype'], mode=mode, shape=shape)
+    return arrays
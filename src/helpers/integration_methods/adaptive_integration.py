@@ -67,3 +67,184 @@ def adaptive_runge_kutta_4(f, y0, t, tol=1e-3):
         y.append(y_est)
         current_t = next_t
     return np.array(y)
+
+# Dormand-Prince 5(4) Butcher tableau
+DP_C = np.array([0, 1/5, 3/10, 4/5, 8/9, 1, 1])
+DP_A = np.array([
+    [0, 0, 0, 0, 0, 0],
+    [1/5, 0, 0, 0, 0, 0],
+    [3/40, 9/40, 0, 0, 0, 0],
+    [44/45, -56/15, 32/9, 0, 0, 0],
+    [19372/6561, -25360/2187, 64448/6561, -212/729, 0, 0],
+    [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656, 0],
+    [35/384, 0, 500/1113, 125/192, -2187/6784, 11/84],
+])
+DP_B = DP_A[6]
+# Difference between the fifth- and fourth-order weights, applied to all seven stages
+DP_E = np.array([-71/57600, 0, 71/16695, -71/1920, 17253/339200, -22/525, 1/40])
+# Coefficients of the fourth-order continuous extension in powers of theta
+DP_P = np.array([
+    [1, -8048581381/2820520608, 8663915743/2820520608, -12715105075/11282082432],
+    [0, 0, 0, 0],
+    [0, 131558114200/32700410799, -68118460800/10900136933, 87487479700/32700410799],
+    [0, -1754552775/470086768, 14199869525/1410260304, -10690763975/1880347072],
+    [0, 127303824393/49829197408, -318862633887/49829197408, 701980252875/199316789632],
+    [0, -282668133/205662961, 2019193451/616988883, -1453857185/822651844],
+    [0, 40617522/29380423, -110615467/29380423, 69997945/29380423],
+])
+
+def step_boundaries(tstops, t0, t1):
+    """Sorted distinct times strictly between t0 and t1 at which a solver must end a step.
+
+    Parameters:
+    - tstops: None, an array of times, or an object with a breakpoints_between(t0, t1) method such as a
+      PiecewiseConstantStimulus.
+
+    Returns:
+    - stops: Sorted array of the distinct times in (t0, t1).
+    """
+    if tstops is None:
+        return np.empty(0)
+    if hasattr(tstops, 'breakpoints_between'):
+        tstops = tstops.breakpoints_between(t0, t1)
+    stops = np.unique(np.asarray(tstops, dtype=np.float64))
+    return stops[(stops > t0) & (stops < t1)]
+
+def _rms_norm(x):
+    """Root-mean-square norm used for scaled error estimates."""
+    return np.sqrt(np.mean(x * x)) if x.size else 0.0
+
+def _initial_step(fun, t0, y0, f0, rtol, atol):
+    """Estimate a first step size from the scale of y0 and its derivatives (Hairer, Norsett & Wanner)."""
+    scale = atol + np.abs(y0) * rtol
+    d0 = _rms_norm(y0 / scale)
+    d1 = _rms_norm(f0 / scale)
+    h0 = 1e-6 if d0 < 1e-5 or d1 < 1e-5 else 0.01 * d0 / d1
+    f1 = fun(t0 + h0, y0 + h0 * f0)
+    d2 = _rms_norm((f1 - f0) / scale) / h0
+    if max(d1, d2) <= 1e-15:
+        h1 = max(1e-6, h0 * 1e-3)
+    else:
+        h1 = (0.01 / max(d1, d2)) ** (1 / 5)
+    return min(100 * h0, h1)
+
+def dormand_prince(f, y0, t, rtol=1e-6, atol=1e-9, first_step=None, max_step=np.inf,
+                   safety=0.9, min_factor=0.2, max_factor=10.0, tstops=None):
+    """Adaptive Dormand-Prince 5(4) integration with PI step-size control and dense output.
+    
+    The solver chooses its own steps, independent of the spacing of t: the embedded fourth-order
+    solution gives the local error of every step, rejected steps are retried with a smaller step, and
+    accepted steps grow again when the error allows it. Results on the requested grid are obtained from
+    the fourth-order continuous extension of each accepted step, so quiet intervals can be covered by a
+    few large steps.
+    
+    A RuntimeError is raised when f is not finite at an accepted point or when the step size falls below
+    ten times the spacing of floating-point numbers at the current time, as when the solution blows up.
+    
+    Parameters:
+    - f: The derivative function of y, f(t, y), returning an array of the same shape as y.
+    - y0: Initial value of y at t[0]: a scalar, a vector (D,) or a batch (B, D). A batch shares one step size.
+    - t: Increasing array of time points at which to report y.
+    - rtol, atol: Relative and absolute tolerances of the local error.
+    - first_step: Initial step size; estimated automatically if None.
+    - max_step: Upper bound on the step size.
+    - safety: Safety factor applied to the optimal step size.
+    - min_factor, max_factor: Bounds on the change of step size between two steps.
+    - tstops: Optional times at which f may jump, e.g. the breakpoints of a stimulus (see step_boundaries).
+      Steps end exactly at each of them, the stages of such a step see f just before the jump, and the
+      next step starts from a new evaluation of f instead of reusing the last stage.
+    
+    Returns:
+    - y: Values of y at the time points t, of shape (len(t),) + y0.shape.
+    - stats: Dictionary with 'nfev' (function evaluations), 'n_accepted' and 'n_rejected' (steps).
+    """
+    y0 = np.asarray(y0, dtype=np.float64)
+    shape = y0.shape
+    t = np.asarray(t, dtype=np.float64)
+    stats = {'nfev': 0, 'n_accepted': 0, 'n_rejected': 0}
+    stops = step_boundaries(tstops, t[0], t[-1])
+    stop_index = 0
+    left_limit_at = None  # End time of a step ending at a stop, where f is taken just before the jump
+
+    def fun(time, y):
+        stats['nfev'] += 1
+        if time == left_limit_at:
+            time = np.nextafter(time, -np.inf)
+        return np.asarray(f(time, y.reshape(shape)), dtype=np.float64).ravel()
+
+    out = np.empty((len(t),) + shape)
+    out[0] = y0
+    t_end = t[-1]
+    y = y0.ravel().copy()
+    current_t = t[0]
+    K = np.empty((7, y.size))
+    K[0] = fun(current_t, y)
+    h = first_step if first_step is not None else _initial_step(fun, current_t, y, K[0], rtol, atol)
+    h = min(h, max_step)
+    # PI controller exponents (Gustafsson) for a fifth-order method with fourth-order error estimate
+    alpha, beta = 0.7 / 5, 0.4 / 5
+    previous_error = 1e-4
+    next_index = 1
+
+    while next_index < len(t):
+        h = min(h, max_step, t_end - current_t)
+        next_stop = stops[stop_index] if stop_index < len(stops) else np.inf
+        h = min(h, next_stop - current_t)
+        rejected = False
+        if not np.all(np.isfinite(K[0])):
+            raise RuntimeError(f"The derivative is not finite at t={current_t}.")
+        while True:
+            if h < 10 * np.spacing(current_t):
+                raise RuntimeError(f"Step size became too small at t={current_t}.")
+            at_stop = h >= next_stop - current_t
+            left_limit_at = current_t + h if at_stop else None
+            for s in range(1, 7):
+                K[s] = fun(current_t + DP_C[s] * h, y + h * (DP_A[s, :s] @ K[:s]))
+            y_new = y + h * (DP_B @ K[:6])
+            K[6] = fun(current_t + h, y_new)
+            scale = atol + rtol * np.maximum(np.abs(y), np.abs(y_new))
+            error = _rms_norm(h * (DP_E @ K) / scale)
+            if error <= 1.0:
+                break
+            stats['n_rejected'] += 1
+            rejected = True
+            # A non-finite error (overflow in a stage) only tells that the step was too large
+            h *= max(min_factor, safety * error ** -(1 / 5)) if np.isfinite(error) else min_factor
+        left_limit_at = None
+
+        t_new = current_t + h
+        if at_stop:
+            t_new = next_stop
+            stop_index += 1
+        if t_new >= t_end or t_end - t_new <= 1e-12 * max(1.0, abs(t_end)):
+            t_new = t_end
+        stats['n_accepted'] += 1
+
+        # Dense output for the requested points covered by this step
+        stop = np.searchsorted(t, t_new, side='right')
+        if stop > next_index:
+            theta = (t[next_index:stop] - current_t) / h
+            powers = np.cumprod(np.repeat(theta[:, None], 4, axis=1), axis=1)
+            Q = K.T @ DP_P
+            out[next_index:stop] = (y + h * powers @ Q.T).reshape((-1,) + shape)
+            if t[stop - 1] == t_new:
+                out[stop - 1] = y_new.reshape(shape)
+            next_index = stop
+
+        # PI step-size update; no growth directly after a rejection
+        if error == 0.0:
+            factor = max_factor
+        else:
+            factor = safety * error ** -alpha * previous_error ** beta
+        factor = min(max_factor, max(min_factor, factor))
+        if rejected:
+            factor = min(1.0, factor)
+        h *= factor
+        previous_error = max(error, 1e-4)
+
+        current_t = t_new
+        y = y_new
+        # f may jump at a stop, so the last stage (taken before it) cannot start the next step
+        K[0] = fun(current_t, y) if at_stop else K[6]
+
+    return out, stats
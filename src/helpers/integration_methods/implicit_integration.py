@@ -0,0 +1,273 @@
+# src/helpers/integration_methods/implicit_integration.py
+
+import numpy as np
+from adaptive_integration import step_boundaries
+
+def _rms_rows(x):
+    """Root-mean-square norm of every row of a (B, D) array."""
+    return np.sqrt(np.mean(x * x, axis=1))
+
+def finite_difference_jacobian(fun, t, y, f0):
+    """Forward-difference Jacobian of a batch of independent systems.
+
+    Each system only depends on its own row of y, so the full Jacobian is block diagonal and one
+    perturbed evaluation per state component yields that column for every system at once.
+
+    Parameters:
+    - fun: Derivative function fun(t, y) of a (B, D) state.
+    - t: Time at which to evaluate the Jacobian.
+    - y: State of shape (B, D).
+    - f0: fun(t, y), already evaluated.
+
+    Returns:
+    - J: Jacobian blocks of shape (B, D, D).
+    """
+    B, D = y.shape
+    J = np.empty((B, D, D))
+    step = np.sqrt(np.finfo(np.float64).eps) * np.maximum(np.abs(y), 1.0)
+    for j in range(D):
+        y_perturbed = y.copy()
+        y_perturbed[:, j] += step[:, j]
+        J[:, :, j] = (fun(t, y_perturbed) - f0) / step[:, j, None]
+    return J
+
+def _bdf_coefficients(times):
+    """Coefficients a_j of the variable-step BDF formula sum_j a_j * y(times[j]) = y'(times[0]).
+
+    They are the derivatives at times[0] of the Lagrange basis polynomials through all the given times.
+    times may be a (R, k) array holding the times of R rows, which gives a (R, k) array of coefficients.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    k = times.shape[-1]
+    a = np.empty(times.shape)
+    a[..., 0] = np.sum(1.0 / (times[..., :1] - times[..., 1:]), axis=-1)
+    for j in range(1, k):
+        others = np.delete(np.arange(k), j)
+        numerator = np.prod(times[..., :1] - times[..., others[others != 0]], axis=-1)
+        a[..., j] = numerator / np.prod(times[..., j:j + 1] - times[..., others], axis=-1)
+    return a
+
+def _extrapolate(times, values, t_new):
+    """Evaluate at t_new the polynomial interpolating values (R, k, D) at times (R, k), row by row."""
+    k = times.shape[1]
+    result = np.zeros_like(values[:, 0])
+    for j in range(k):
+        weight = np.ones(len(times))
+        for m in range(k):
+            if m != j:
+                weight *= (t_new - times[:, m]) / (times[:, j] - times[:, m])
+        result += weight[:, None] * values[:, j]
+    return result
+
+def bdf(f, y0, t, max_order=5, jac=None, rtol=1e-6, atol=1e-9, max_newton=8, max_substeps=16, tstops=None):
+    """Variable-order backward differentiation formula (BDF) integration for stiff systems.
+
+    Each step solves sum_j a_j * y_{n+1-j} = f(t_{n+1}, y_{n+1}) by a simplified Newton iteration with
+    the Jacobian evaluated once per step. The coefficients a_j are computed from the actual step history,
+    so the grid t may be non-uniform. The order starts at one, rises by one per step while the predictor
+    error estimates keep improving, and drops when the lower order predicts better or when Newton fails
+    to converge; at order one a failing step is split into substeps.
+
+    A batch of B independent systems of dimension D has a block-diagonal Jacobian, which is stored and
+    inverted as B blocks of shape (D, D). Every system keeps its own order, step history, Newton
+    convergence and substeps, so its result does not depend on the other systems of the batch; f is
+    still called with the whole batch, the rows not being solved holding their last values.
+
+    Parameters:
+    - f: The derivative function of y, f(t, y), returning an array of the same shape as y.
+    - y0: Initial value of y at t[0]: a scalar, a vector (D,) or a batch (B, D).
+    - t: Increasing array of time points; the solver steps from point to point.
+    - max_order: Highest BDF order used (1 to 5); max_order=1 is backward Euler.
+    - jac: Optional analytic Jacobian jac(t, y) returning (B, D, D) for a batch, (D, D) for a vector or a
+      scalar for a scalar state. A forward-difference Jacobian is used when None.
+    - rtol, atol: Tolerances of the Newton convergence test.
+    - max_newton: Maximum number of Newton iterations per step.
+    - max_substeps: Maximum number of halvings of a step whose Newton iteration fails at order one.
+    - tstops: Optional times at which f may jump, e.g. the breakpoints of a stimulus (see step_boundaries).
+      A step ends at each of them, evaluating f just before the jump, and the solver restarts there at
+      order one, so no step or history spans a jump. This removes the error of stepping across a jump,
+      but the steps still follow t: on a coarse grid the error is set by the grid spacing, and the stops
+      improve it little.
+
+    Returns:
+    - y: Values of y at the time points t, of shape (len(t),) + y0.shape.
+    - stats: Dictionary with 'nfev', 'njev' (Jacobian evaluations), 'ninv' (inversions of the blocks of
+      the iteration matrix), 'n_newton' (Newton iterations) and 'n_steps' (steps, including substeps).
+    """
+    if not 1 <= max_order <= 5:
+        raise ValueError("max_order must be between 1 and 5.")
+    y0 = np.asarray(y0, dtype=np.float64)
+    shape = y0.shape
+    batch_shape = (1, 1) if y0.ndim == 0 else ((1, y0.size) if y0.ndim == 1 else y0.shape)
+    n_rows, dimension = batch_shape
+    t = np.asarray(t, dtype=np.float64)
+    stats = {'nfev': 0, 'njev': 0, 'ninv': 0, 'n_newton': 0, 'n_steps': 0}
+    stops = step_boundaries(tstops, t[0], t[-1])
+    left_limit_at = None  # End time of a step ending at a stop, where f is taken just before the jump
+    # Whole batch passed to f; the rows not being solved hold their last values
+    y_work = y0.reshape(batch_shape).copy()
+
+    def fun(time, rows, y):
+        """f at time for the given rows."""
+        stats['nfev'] += 1
+        if time == left_limit_at:
+            time = np.nextafter(time, -np.inf)
+        y_work[rows] = y
+        return np.asarray(f(time, y_work.reshape(shape)), dtype=np.float64).reshape(batch_shape)[rows]
+
+    def jacobian(time, rows, y, f0):
+        stats['njev'] += 1
+        if jac is None:
+            return finite_difference_jacobian(lambda time, y: fun(time, rows, y), time, y, f0)
+        if time == left_limit_at:
+            time = np.nextafter(time, -np.inf)
+        y_work[rows] = y
+        J = np.asarray(jac(time, y_work.reshape(shape)), dtype=np.float64)
+        return J.reshape(batch_shape + (dimension,))[rows]
+
+    identity = np.eye(dimension)
+
+    # Step history of every row, newest last; only the last count[row] entries of a row are valid
+    history_length = max_order + 1
+    history_times = np.full((n_rows, history_length), t[0])
+    history_values = np.repeat(y_work[:, None], history_length, axis=1)
+    count = np.ones(n_rows, dtype=np.int64)
+    order = np.ones(n_rows, dtype=np.int64)
+
+    def push(rows, time, y):
+        history_times[rows, :-1] = history_times[rows, 1:]
+        history_values[rows, :-1] = history_values[rows, 1:]
+        history_times[rows, -1] = time
+        history_values[rows, -1] = y
+        count[rows] = np.minimum(count[rows] + 1, history_length)
+
+    def newton(rows, t_new, q):
+        """Solve the implicit step of order q for the given rows; returns their new states and which converged."""
+        times = np.concatenate((np.full((len(rows), 1), t_new), history_times[rows, -q:][:, ::-1]), axis=1)
+        a = _bdf_coefficients(times)
+        values = history_values[rows, -q:][:, ::-1]
+        past = a[:, 1, None] * values[:, 0]
+        for j in range(2, q + 1):
+            past += a[:, j, None] * values[:, j - 1]
+        # The predictor extrapolates the last q + 1 points of the rows that have them
+        y = history_values[rows, -1].copy()
+        predicted = count[rows] > q
+        if predicted.any():
+            y[predicted] = _extrapolate(history_times[rows[predicted], -q - 1:],
+                                        history_values[rows[predicted], -q - 1:], t_new)
+        f_y = fun(t_new, rows, y)
+        # Invert every (D, D) block once per step and reuse it in all iterations
+        iteration_matrix = np.linalg.inv(a[:, 0, None, None] * identity - jacobian(t_new, rows, y, f_y))
+        stats['ninv'] += 1
+        active = np.ones(len(rows), dtype=bool)
+        converged = np.zeros(len(rows), dtype=bool)
+        for _ in range(max_newton):
+            stats['n_newton'] += 1
+            indices = np.flatnonzero(active)
+            residual = f_y[indices] - a[indices, 0, None] * y[indices] - past[indices]
+            dy = np.einsum('bij,bj->bi', iteration_matrix[indices], residual)
+            y[indices] += dy
+            finite = np.all(np.isfinite(dy), axis=1)
+            with np.errstate(invalid='ignore'):
+                done = finite & (_rms_rows(dy / (atol + rtol * np.abs(y[indices]))) <= 1.0)
+            converged[indices[done]] = True
+            # Rows that converged or diverged stop iterating
+            active[indices[done | ~finite]] = False
+            if not active.any():
+                break
+            indices = np.flatnonzero(active)
+            f_y[indices] = fun(t_new, rows[indices], y[indices])
+        return y, converged
+
+    def advance(rows, t_new, orders, depth=0):
+        """Advance rows, which share their last history time, to t_new; returns their states and orders used."""
+        y_new = np.empty((len(rows), dimension))
+        used = orders.copy()
+        pending = np.arange(len(rows))
+        while len(pending):
+            failed = []
+            for q in np.unique(used[pending]):
+                group = pending[used[pending] == q]
+                y, converged = newton(rows[group], t_new, q)
+                y_new[group[converged]] = y[converged]
+                failed.append(group[~converged])
+            pending = np.concatenate(failed)
+            if not len(pending):
+                break
+            y_work[rows[pending]] = history_values[rows[pending], -1]
+            # Failing rows retry at a lower order; at order one the step is split at its midpoint
+            split = pending[used[pending] == 1]
+            used[pending[used[pending] > 1]] -= 1
+            if len(split):
+                if depth >= max_substeps:
+                    raise RuntimeError(f"Newton iteration failed to converge at t={t_new}.")
+                t_mid = 0.5 * (history_times[rows[split[0]], -1] + t_new)
+                y_mid, _ = advance(rows[split], t_mid, np.ones(len(split), dtype=np.int64), depth + 1)
+                push(rows[split], t_mid, y_mid)
+                stats['n_steps'] += 1
+        y_work[rows] = y_new
+        return y_new, used
+
+    out = np.empty((len(t),) + shape)
+    out[0] = y0
+    all_rows = np.arange(n_rows)
+    stop_index = 0
+    for i in range(1, len(t)):
+        # Step to every stop before t[i] first, then to t[i]
+        last_stop = np.searchsorted(stops, t[i], side='right')
+        targets = [(stop, True) for stop in stops[stop_index:last_stop]]
+        if not targets or targets[-1][0] != t[i]:
+            targets.append((t[i], False))
+        stop_index = last_stop
+        for target, at_stop in targets:
+            left_limit_at = target if at_stop else None
+            y_new, used = advance(all_rows, target, order)
+            left_limit_at = None
+            stats['n_steps'] += 1
+            if at_stop:
+                # f may jump here: restart from this point at order one
+                push(all_rows, target, y_new)
+                count[:] = 1
+                order[:] = 1
+                continue
+
+            # Order selection of every row from the predictor errors of the used order and the next lower one
+            order = used.copy()
+            scale = atol + rtol * np.abs(y_new)
+            for q in np.unique(used):
+                rows = np.flatnonzero((used == q) & (count > q))
+                if not len(rows):
+                    continue
+                error = _rms_rows((y_new[rows] - _extrapolate(history_times[rows, -q - 1:],
+                                                              history_values[rows, -q - 1:], target))
+                                  / scale[rows]) / (q + 1)
+                lower_error = np.inf if q == 1 else _rms_rows(
+                    (y_new[rows] - _extrapolate(history_times[rows, -q:], history_values[rows, -q:], target))
+                    / scale[rows]) / q
+                order[rows] = np.where(lower_error < error, q - 1, min(q + 1, max_order))
+            push(all_rows, target, y_new)
+        out[i] = y_new.reshape(shape)
+
+    return out, stats
+
+def backward_euler(f, y0, t, jac=None, rtol=1e-6, atol=1e-9, max_newton=8, max_substeps=16, tstops=None):
+    """Backward (implicit) Euler integration for stiff systems.
+
+    Equivalent to bdf with max_order=1; see bdf for the batching and Jacobian conventions.
+
+    Parameters:
+    - f: The derivative function of y, f(t, y).
+    - y0: Initial value of y at t[0]: a scalar, a vector (D,) or a batch (B, D).
+    - t: Increasing array of time points.
+    - jac: Optional analytic Jacobian jac(t, y).
+    - rtol, atol: Tolerances of the Newton convergence test.
+    - max_newton: Maximum number of Newton iterations per step.
+    - max_substeps: Maximum number of halvings of a step whose Newton iteration fails.
+    - tstops: Optional times at which f may jump, as for bdf.
+
+    Returns:
+    - y: Values of y at the time points t, of shape (len(t),) + y0.shape.
+    - stats: Solver statistics, as returned by bdf.
+    """
+    return bdf(f, y0, t, max_order=1, jac=jac, rtol=rtol, atol=atol,
+               max_newton=max_newton, max_substeps=max_substeps, tstops=tstops)
@@ -1,43 +1,107 @@
-# src/helpers/integration_methods.py
-
-import numpy as np
-
-def euler_method(f, y0, t):
-    """Euler's method for numerical integration.
-    
-    Parameters:
-    - f: The derivative function of y, f(t, y).
-    - y0: Initial value of y at t0.
-    - t: Array of time points for which to solve for y.
-    
-    Returns:
-    - y: Integrated values of y over time t.
-    """
-    y = np.zeros(len(t))
-    y[0] = y0
-    for i in range(1, len(t)):
-        dt = t[i] - t[i-1]
-        y[i] = y[i-1] + f(t[i-1], y[i-1]) * dt
-    return y
-
-def runge_kutta_4(f, y0, t):
-    """Fourth-order Runge-Kutta method for numerical integration.
-    
-    Parameters:
-    - f: The derivative function of y, f(t, y).
-    - y0: Initial value of y at t0.
-    - t: Array of time points for which to solve for y.
-    
-    Returns:
-    - y: Integrated values of y over time t.
-    """
-    y = np.zeros(len(t))
-    y[0] = y0
-    for i in range(1, len(t)):
-        dt = t[i] - t[i-1]
-        k1 = f(t[i-1], y[i-1])
-        k2 = f(t[i-1] + dt/2, y[i-1] + dt/2 * k1)
-        k3 = f(t[i-1] + dt/2, y[i-1] + dt/2 * k2)
-        k4 = f(t[i], y[i-1] + dt * k3)
-        y[i] = y[i-1] + (dt/6) * (k1 + 2*k2 + 2*k3 + k4)
-    return y
+# src/helpers/integration_methods.py
+
+import numpy as np
+
+def _output_buffer(y0, t, save_every=1, final_only=False, out=None):
+    """Allocate or validate the array that receives the saved states.
+    
+    Parameters:
+    - y0: Initial state as an array of shape S (scalar, (D,) or (B, D)).
+    - t: Array of time points.
+    - save_every: Save every save_every-th step, starting with the initial state.
+    - final_only: Save only the final state.
+    - out: Optional preallocated buffer.
+    
+    Returns:
+    - out: Array of shape S if final_only, otherwise of shape (n_saved,) + S.
+    """
+    if save_every < 1:
+        raise ValueError("save_every must be a positive integer.")
+    shape = y0.shape if final_only else ((len(t) - 1) // save_every + 1,) + y0.shape
+    if out is None:
+        return np.empty(shape)
+    if out.shape != shape:
+        raise ValueError(f"out has shape {out.shape}, expected {shape}.")
+    return out
+
+def euler_method(f, y0, t, save_every=1, final_only=False, out=None):
+    """Euler's method for numerical integration.
+    
+    The state may be a scalar, a vector of shape (D,) or a batch of shape (B, D); f is called once per
+    step with the whole state, so a batch of independent systems is advanced by a single call.
+    
+    Parameters:
+    - f: The derivative function of y, f(t, y), returning an array of the same shape as y.
+    - y0: Initial value of y at t0.
+    - t: Array of time points for which to solve for y.
+    - save_every: Store every save_every-th step (starting with y0) instead of every step.
+    - final_only: Store only the final state.
+    - out: Optional preallocated output buffer of the shape described below.
+    
+    Returns:
+    - y: Integrated values of y over time t, of shape (len(t),) + y0.shape, ((len(t) - 1) // save_every + 1,)
+      + y0.shape when decimated, or y0.shape when final_only is set.
+    """
+    y = np.array(y0, dtype=np.float64)
+    out = _output_buffer(y, t, save_every, final_only, out)
+    increment = np.empty_like(y)
+    if not final_only:
+        out[0] = y
+    for i in range(1, len(t)):
+        dt = t[i] - t[i-1]
+        np.multiply(f(t[i-1], y), dt, out=increment)
+        y += increment
+        if not final_only and i % save_every == 0:
+            out[i // save_every] = y
+    if final_only:
+        out[...] = y
+    return out
+
+def runge_kutta_4(f, y0, t, save_every=1, final_only=False, out=None):
+    """Fourth-order Runge-Kutta method for numerical integration.
+    
+    The state may be a scalar, a vector of shape (D,) or a batch of shape (B, D); f is called once per
+    stage with the whole state, and the stages reuse preallocated work arrays.
+    
+    Parameters:
+    - f: The derivative function of y, f(t, y), returning an array of the same shape as y.
+    - y0: Initial value of y at t0.
+    - t: Array of time points for which to solve for y.
+    - save_every: Store every save_every-th step (starting with y0) instead of every step.
+    - final_only: Store only the final state.
+    - out: Optional preallocated output buffer of the shape described below.
+    
+    Returns:
+    - y: Integrated values of y over time t, of shape (len(t),) + y0.shape, ((len(t) - 1) // save_every + 1,)
+      + y0.shape when decimated, or y0.shape when final_only is set.
+    """
+    y = np.array(y0, dtype=np.float64)
+    out = _output_buffer(y, t, save_every, final_only, out)
+    k1, k2, k3, k4, stage = (np.empty_like(y) for _ in range(5))
+    if not final_only:
+        out[0] = y
+    for i in range(1, len(t)):
+        dt = t[i] - t[i-1]
+        k1[...] = f(t[i-1], y)
+        np.multiply(k1, dt/2, out=stage)
+        stage += y
+        k2[...] = f(t[i-1] + dt/2, stage)
+        np.multiply(k2, dt/2, out=stage)
+        stage += y
+        k3[...] = f(t[i-1] + dt/2, stage)
+        np.multiply(k3, dt, out=stage)
+        stage += y
+        k4[...] = f(t[i], stage)
+        # y += (dt/6) * (k1 + 2*k2 + 2*k3 + k4), accumulated in place
+        k2 *= 2
+        k3 *= 2
+        k1 += k2
+        k1 += k3
+        k1 += k4
+        np.multiply(k1, dt/6, out=stage)
+        y += stage
+        if not final_only and i % save_every == 0:
+            out[i // save_every] = y
+    if final_only:
+        out[...] = y
+    return out
@@ -0,0 +1,188 @@
+# src/helpers/visualization/export.py
+
+import hashlib
+import inspect
+import os
+import pickle
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+EXPORT_FORMATS = ('png', 'svg', 'pdf')
+
+# Number of bytes of an array hashed at a time
+HASH_CHUNK = 1 << 24
+
+# Template figures of this process, by plotting function
+_templates = {}
+
+class PlotJob:
+    """A figure to export: function(*args, **kwargs) from visualization.py, written to path."""
+
+    def __init__(self, path, function, *args, **kwargs):
+        """
+        Parameters:
+        - path: File to write; the extension (.png, .svg or .pdf) selects the format.
+        - function: Plotting function accepting show=False and ax or fig, e.g. plot_membrane_potential.
+        - args, kwargs: Arguments of the plotting function.
+        """
+        self.format = os.path.splitext(path)[1][1:].lower()
+        if self.format not in EXPORT_FORMATS:
+            raise ValueError("Unsupported export format specified.")
+        self.path = path
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+
+    def content_hash(self, dpi):
+        """Hash of the plotting function, its arguments, the format and dpi; equal for identical files."""
+        h = hashlib.blake2b(digest_size=20)
+        _feed(h, (self.function.__module__, self.function.__qualname__, self.format, dpi))
+        _feed(h, self.args)
+        _feed(h, self.kwargs)
+        return h.hexdigest()
+
+def _feed(h, value):
+    """Add a value to a hash: arrays by dtype, shape and contents, containers element by element."""
+    if isinstance(value, np.ndarray) and value.dtype != object:
+        h.update(f'array {value.dtype.str} {value.shape}'.encode())
+        flat = np.ascontiguousarray(value).reshape(-1)
+        step = max(1, HASH_CHUNK // max(flat.itemsize, 1))
+        for start in range(0, len(flat), step):
+            h.update(flat[start:start + step].data)
+    elif isinstance(value, (list, tuple)):
+        h.update(f'{type(value).__name__} {len(value)}'.encode())
+        for item in value:
+            _feed(h, item)
+    elif isinstance(value, dict):
+        h.update(f'dict {len(value)}'.encode())
+        for key in sorted(value, key=repr):
+            _feed(h, key)
+            _feed(h, value[key])
+    elif value is None or isinstance(value, (bool, int, float, complex, str, bytes, np.generic)):
+        h.update(repr(value).encode())
+    elif hasattr(value, '__dict__') and not callable(value):
+        # Objects such as SpikeTrains, by type and attributes
+        h.update(f'object {type(value).__module__}.{type(value).__qualname__}'.encode())
+        _feed(h, vars(value))
+    else:
+        h.update(pickle.dumps(value))
+
+def _figure_parameter(function):
+    """Name of the parameter through which function draws on a given figure or axes, if any."""
+    parameters = inspect.signature(function).parameters
+    return 'ax' if 'ax' in parameters else 'fig' if 'fig' in parameters else None
+
+def plot_figure(function, *args, **kwargs):
+    """
+    Draw a plot into a new figure without showing it.
+
+    The figure is detached from pyplot, so it can be kept, edited or saved without ever being displayed.
+
+    Returns:
+    - fig: The figure.
+    """
+    fig = function(*args, show=False, **kwargs)
+    plt.close(fig)
+    return fig
+
+def _render(function, args, kwargs):
+    """Draw a plot, into this process's template figure of the function if it has one.
+
+    The first plot of a function is drawn into a new figure, whose size is then used for an Agg figure
+    kept as the template: later plots clear its axes (removing colorbars) and draw into them, instead of
+    building a figure, canvas and axes each time.
+    """
+    parameter = _figure_parameter(function)
+    template = _templates.get(function)
+    if template is None:
+        fig = plot_figure(function, *args, **kwargs)
+        if parameter is not None:
+            layout = fig.get_layout_engine()
+            canvas = FigureCanvasAgg(Figure(figsize=fig.get_size_inches(), dpi=fig.dpi,
+                                            layout='constrained' if layout is not None else None))
+            ax = canvas.figure.add_subplot() if parameter == 'ax' else None
+            _templates[function] = (canvas.figure, ax, None if ax is None else ax.get_subplotspec())
+        return fig
+    fig, ax, spec = template
+    if parameter == 'fig':
+        return function(*args, fig=fig, show=False, **kwargs)
+    for other in fig.axes:
+        if other is not ax:
+            other.remove()
+    ax.cla()
+    ax.set_subplotspec(spec)
+    return function(*args, ax=ax, show=False, **kwargs)
+
+def save_figure(path, function, *args, dpi=100, **kwargs):
+    """
+    Draw a plot without a display and write it to a PNG, SVG or PDF file.
+
+    Parameters:
+    - path: File to write; the extension selects the format.
+    - function: Plotting function of visualization.py, e.g. plot_raster.
+    - args, kwargs: Arguments of the plotting function.
+    - dpi: Resolution of raster output.
+    """
+    job = PlotJob(path, function, *args, **kwargs)
+    _render(function, args, kwargs).savefig(path, dpi=dpi, format=job.format)
+
+def _save_job(job, dpi):
+    _render(job.function, job.args, job.kwargs).savefig(job.path, dpi=dpi, format=job.format)
+    return job.path
+
+def _start_worker():
+    plt.switch_backend('Agg')
+
+def export_figures(jobs, n_workers=None, dpi=100, cache_dir=None):
+    """
+    Write many figures without a display, in parallel over a pool of processes.
+
+    Jobs are identified by a hash of their function, arguments, format and dpi: each distinct figure is
+    rendered once, and jobs repeating it get a copy of the file. With cache_dir, rendered files are also
+    kept there under their hash, so figures already rendered by an earlier export are copied instead.
+    Each worker uses the Agg backend and reuses one template figure per plotting function.
+
+    Parameters:
+    - jobs: List of PlotJob.
+    - n_workers: Number of worker processes; os.cpu_count() by default, 0 to render in this process.
+    - dpi: Resolution of raster output.
+    - cache_dir: Optional directory of rendered files shared between exports.
+
+    Returns:
+    - hashes: Content hash of every job, in order.
+    """
+    hashes = [job.content_hash(dpi) for job in jobs]
+    first = {}
+    for job, key in zip(jobs, hashes):
+        first.setdefault(key, job)
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+    cached = {key: os.path.join(cache_dir, f'{key}.{job.format}') for key, job in first.items()} \
+        if cache_dir is not None else {}
+    pending = [job for key, job in first.items() if not os.path.exists(cached.get(key, ''))]
+
+    n_workers = os.cpu_count() if n_workers is None else n_workers
+    if n_workers and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=min(n_workers, len(pending)), initializer=_start_worker) as pool:
+            list(pool.map(_save_job, pending, [dpi] * len(pending),
+                          chunksize=max(1, len(pending) // (4 * n_workers))))
+    else:
+        for job in pending:
+            _save_job(job, dpi)
+
+    rendered = {id(job) for job in pending}
+    for key, job in first.items():
+        if key in cached:
+            if id(job) in rendered:
+                shutil.copyfile(job.path, cached[key])
+            else:
+                shutil.copyfile(cached[key], job.path)
+    for job, key in zip(jobs, hashes):
+        if job is not first[key] and os.path.abspath(job.path) != os.path.abspath(first[key].path):
+            shutil.copyfile(first[key].path, job.path)
+    return hashes
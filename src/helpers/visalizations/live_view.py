@@ -0,0 +1,198 @@
+# src/helpers/visualization/live_view.py
+
+import multiprocessing
+from multiprocessing import shared_memory
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.animation import FuncAnimation
+from trace_rendering import m4_indices
+
+# Header of a ring buffer: samples written, capacity, channels, dtype character code and samples reserved
+HEADER_FIELDS = 5
+
+class SharedRingBuffer:
+    """Ring buffer of the latest samples of a running simulation, shared with viewers without locks.
+
+    One writer (the simulation) appends samples; any number of readers copy the newest window at their
+    own pace. Before storing samples the writer advances a reserved counter past them, and only after
+    storing them the sample counter. A reader reads the sample counter before copying and the reserved
+    counter after: rows that the writer may have overwritten meanwhile are dropped from the copy, as in a
+    seqlock. Writing a sample is two row assignments and two counter stores, and never waits for a reader.
+
+    The buffer lives in process memory, or in a multiprocessing.shared_memory block when shared=True, so
+    a viewer in another process (see start_live_view) can attach to it by name.
+    """
+
+    def __init__(self, n_channels, capacity=100_000, dtype=np.float64, shared=False, name=None):
+        """
+        Parameters:
+        - n_channels: Number of values per sample, e.g. the number of recorded neurons.
+        - capacity: Number of samples kept.
+        - dtype: Data type of the values.
+        - shared: Allocate the buffer in shared memory.
+        - name: Name of an existing shared buffer to attach to; the other parameters are then read from it.
+        """
+        self._shm = None
+        if name is not None:
+            self._shm = shared_memory.SharedMemory(name=name)
+            header = np.ndarray(HEADER_FIELDS, dtype=np.int64, buffer=self._shm.buf)
+            capacity, n_channels, dtype = int(header[1]), int(header[2]), np.dtype(chr(header[3]))
+        dtype = np.dtype(dtype)
+        self.capacity = int(capacity)
+        self.n_channels = int(n_channels)
+        self.dtype = dtype
+        sizes = (HEADER_FIELDS * 8, self.capacity * 8, self.capacity * self.n_channels * dtype.itemsize)
+        if shared and name is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=sum(sizes))
+        if self._shm is not None:
+            buf = self._shm.buf
+            self._header = np.ndarray(HEADER_FIELDS, dtype=np.int64, buffer=buf)
+            self.times = np.ndarray(self.capacity, dtype=np.float64, buffer=buf, offset=sizes[0])
+            self.values = np.ndarray((self.capacity, self.n_channels), dtype=dtype, buffer=buf,
+                                     offset=sizes[0] + sizes[1])
+        else:
+            self._header = np.zeros(HEADER_FIELDS, dtype=np.int64)
+            self.times = np.zeros(self.capacity)
+            self.values = np.zeros((self.capacity, self.n_channels), dtype=dtype)
+        if name is None:
+            self._header[:] = (0, self.capacity, self.n_channels, ord(dtype.char), 0)
+        self._count = int(self._header[0])
+
+    @property
+    def name(self):
+        """Name of the shared memory block, or None for an in-process buffer."""
+        return None if self._shm is None else self._shm.name
+
+    def __len__(self):
+        """Total number of samples written so far."""
+        return int(self._header[0])
+
+    def write(self, time, values):
+        """Append one sample (writer only)."""
+        i = self._count % self.capacity
+        self._header[4] = self._count + 1
+        self.times[i] = time
+        self.values[i] = values
+        self._count += 1
+        self._header[0] = self._count
+
+    def write_many(self, times, values):
+        """Append a block of samples of shape (k,) and (k, n_channels) (writer only).
+
+        All k samples are counted, but only the last capacity of them are stored when k > capacity.
+        """
+        times = np.asarray(times)
+        values = np.asarray(values).reshape(-1, self.n_channels)
+        end = self._count + len(times)
+        self._header[4] = end
+        times, values = times[-self.capacity:], values[-self.capacity:]
+        positions = (end - len(times) + np.arange(len(times))) % self.capacity
+        self.times[positions] = times
+        self.values[positions] = values
+        self._count = end
+        self._header[0] = self._count
+
+    def read_latest(self, n):
+        """
+        Copy the newest samples.
+
+        Parameters:
+        - n: Largest number of samples returned; at most capacity - 1, as the oldest slot is the one the
+          writer fills next.
+
+        Returns:
+        - times: Array of shape (k,), k <= n, oldest first.
+        - values: Array of shape (k, n_channels).
+        """
+        count = int(self._header[0])
+        n = min(int(n), count, self.capacity - 1)
+        start = count - n
+        i = start % self.capacity
+        if i + n <= self.capacity:
+            times, values = self.times[i:i + n].copy(), self.values[i:i + n].copy()
+        else:
+            times = np.concatenate((self.times[i:], self.times[:i + n - self.capacity]))
+            values = np.concatenate((self.values[i:], self.values[:i + n - self.capacity]))
+        # Sample k may be overwritten once the writer has reserved sample k + capacity
+        dropped = min(max(0, int(self._header[4]) - self.capacity - start), n)
+        return times[dropped:], values[dropped:]
+
+    def close(self):
+        """Detach from the shared memory block."""
+        if self._shm is not None:
+            self._header = self.times = self.values = None
+            self._shm.close()
+
+    def unlink(self):
+        """Free the shared memory block; call once, from the process that created it, after close."""
+        if self._shm is not None:
+            self._shm.unlink()
+
+def live_membrane_potential(buffer, window=1000.0, fps=30, ylim=(-100.0, 60.0), channels=None,
+                            title="Live Membrane Potential"):
+    """
+    Animate the newest samples of a SharedRingBuffer while the simulation writes to it.
+
+    Every frame, at a fixed rate, the latest window is copied from the buffer, M4-decimated to the width
+    of the axes and drawn with blitting; the time axis is relative to the newest sample, so the axes
+    never need a full redraw.
+
+    Parameters:
+    - buffer: SharedRingBuffer of membrane potentials (one channel per neuron).
+    - window: Length of the displayed window (ms).
+    - fps: Frame rate of the animation.
+    - ylim: Fixed limits of the membrane potential axis (mV).
+    - channels: Optional indices of the channels drawn; all by default.
+    - title: Title of the plot.
+
+    Returns:
+    - animation: The FuncAnimation; keep a reference to it while it runs.
+    """
+    channels = np.arange(buffer.n_channels) if channels is None else np.asarray(channels)
+    fig, ax = plt.subplots(figsize=(12, 6))
+    ax.set_title(title)
+    ax.set_xlabel('Time Relative to Newest Sample (ms)')
+    ax.set_ylabel('Membrane Potential (mV)')
+    ax.set_xlim(-window, 0)
+    ax.set_ylim(*ylim)
+    lines = [ax.plot([], [], lw=1)[0] for _ in channels]
+
+    def update(frame):
+        n_columns = max(int(ax.get_window_extent().width), 100)
+        # Samples of the window, assuming a fixed step; dt is estimated from the newest samples
+        times, _ = buffer.read_latest(2)
+        dt = times[-1] - times[0] if len(times) == 2 and times[-1] > times[0] else 1.0
+        times, values = buffer.read_latest(int(window / dt) + 2)
+        if len(times):
+            for line, channel in zip(lines, channels):
+                indices = m4_indices(values[:, channel], n_columns)
+                line.set_data(times[indices] - times[-1], values[indices, channel])
+        return lines
+
+    return FuncAnimation(fig, update, interval=1000.0 / fps, blit=True, cache_frame_data=False)
+
+def run_live_view(name, **kwargs):
+    """Attach to a shared ring buffer by name and show live_membrane_potential until the window is closed."""
+    buffer = SharedRingBuffer(0, name=name)
+    animation = live_membrane_potential(buffer, **kwargs)
+    plt.show()
+    del animation
+    buffer.close()
+
+def start_live_view(buffer, **kwargs):
+    """
+    Show a shared ring buffer in a viewer process, so drawing never competes with the simulation for the GIL.
+
+    Parameters:
+    - buffer: SharedRingBuffer created with shared=True.
+    - kwargs: Keyword arguments of live_membrane_potential.
+
+    Returns:
+    - process: The started viewer process.
+    """
+    if buffer.name is None:
+        raise ValueError("The live view of another process needs a shared buffer.")
+    process = multiprocessing.Process(target=run_live_view, args=(buffer.name,), kwargs=kwargs, daemon=True)
+    process.start()
+    return process
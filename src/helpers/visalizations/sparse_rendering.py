@@ -0,0 +1,200 @@
+# src/helpers/visualization/sparse_rendering.py
+
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.colors import LogNorm
+
+# Largest number of spikes drawn as individual ticks; larger rasters are drawn as images
+RASTER_SEGMENTS = 100_000
+
+# Approximate number of connections binned at a time
+CONNECTIVITY_CHUNK = 1 << 22
+
+def spike_events(spikes):
+    """
+    Flatten spike trains into (neuron, time) events sorted by neuron.
+
+    Parameters:
+    - spikes: SpikeTrains (or any object with CSR indptr and data), a list of arrays of spike times per
+      neuron, or a dictionary mapping neuron ids to arrays of spike times.
+
+    Returns:
+    - neurons: Neuron id of every spike, in non-decreasing order.
+    - times: Spike times.
+    - n_neurons: Number of rows of the raster.
+    """
+    if hasattr(spikes, 'indptr') and hasattr(spikes, 'data'):
+        indptr = np.asarray(spikes.indptr)
+        n_neurons = len(indptr) - 1
+        neurons = np.repeat(np.arange(n_neurons), np.diff(indptr))
+        return neurons, np.asarray(spikes.data[indptr[0]:indptr[-1]], dtype=np.float64), n_neurons
+    if isinstance(spikes, dict):
+        ids = sorted(spikes)
+        trains = [np.asarray(spikes[i], dtype=np.float64).ravel() for i in ids]
+        n_neurons = int(ids[-1]) + 1 if ids else 0
+    else:
+        trains = [np.asarray(train, dtype=np.float64).ravel() for train in spikes]
+        ids = range(len(trains))
+        n_neurons = len(trains)
+    counts = [len(train) for train in trains]
+    neurons = np.repeat(np.asarray(ids, dtype=np.int64), counts)
+    times = np.concatenate(trains) if trains else np.zeros(0)
+    return neurons, times, n_neurons
+
+def raster_segments(neurons, times, height=0.8):
+    """Vertical tick of every spike as an array of shape (S, 2, 2) of segments, for a LineCollection."""
+    segments = np.empty((len(times), 2, 2))
+    segments[:, :, 0] = times[:, None]
+    segments[:, 0, 1] = neurons - height / 2
+    segments[:, 1, 1] = neurons + height / 2
+    return segments
+
+def raster_image(neurons, times, t_range, n_range, shape):
+    """
+    Count the spikes falling into every pixel of a raster image.
+
+    Parameters:
+    - neurons, times: Spike events sorted by neuron, as returned by spike_events.
+    - t_range: (t0, t1) time range of the image; spikes at t1 fall in the last column.
+    - n_range: (first, stop) neuron rows of the image.
+    - shape: (rows, columns) of the image in pixels.
+
+    Returns:
+    - counts: Array of the given shape, row 0 holding the first neurons.
+    """
+    rows, columns = shape
+    (t0, t1), (n0, n1) = t_range, n_range
+    a, b = np.searchsorted(neurons, [n0, n1], side='left')
+    neurons, times = neurons[a:b], times[a:b]
+    keep = (times >= t0) & (times <= t1)
+    row = ((neurons[keep] - n0) * rows // max(n1 - n0, 1)).astype(np.int64)
+    column = ((times[keep] - t0) * (columns / (t1 - t0))).astype(np.int64)
+    np.clip(column, 0, columns - 1, out=column)
+    return np.bincount(row * columns + column, minlength=rows * columns).reshape(rows, columns)
+
+class RasterImage:
+    """Raster of many spikes drawn as one image of spike counts per pixel, recomputed when the view changes.
+
+    Pixels without spikes are transparent and counts are shown on a logarithmic scale, so isolated
+    spikes stay visible next to dense bursts. Zooming in bins the visible spikes again at screen
+    resolution, down to single spikes.
+    """
+
+    def __init__(self, ax, neurons, times, n_neurons, cmap='Greys'):
+        """
+        Parameters:
+        - ax: Matplotlib axes to draw on.
+        - neurons, times, n_neurons: Spike events, as returned by spike_events.
+        - cmap: Colormap of the spike counts.
+        """
+        self.ax = ax
+        self.neurons = neurons
+        self.times = times
+        self.n_neurons = n_neurons
+        self._view = None
+        t0, t1 = (times.min(), times.max()) if len(times) else (0.0, 1.0)
+        self.image = ax.imshow(np.zeros((1, 1)), cmap=cmap, origin='lower', aspect='auto',
+                               interpolation='nearest', norm=LogNorm(vmin=1, vmax=2))
+        ax.set_xlim(t0, t1 if t1 > t0 else t0 + 1)
+        ax.set_ylim(-0.5, n_neurons - 0.5)
+        self.update()
+        # As for DecimatedTrace, the image keeps the raster alive and the callbacks hold it weakly
+        self.image.raster = self
+        self._callbacks = [ax.callbacks.connect('xlim_changed', self._view_changed),
+                           ax.callbacks.connect('ylim_changed', self._view_changed),
+                           ax.figure.canvas.mpl_connect('resize_event', self._view_changed)]
+
+    def _view_changed(self, *args):
+        self.update()
+
+    def update(self):
+        """Bin the visible spikes again if the view or the size of the axes changed."""
+        extent = self.ax.get_window_extent()
+        t0, t1 = sorted(self.ax.get_xlim())
+        y0, y1 = sorted(self.ax.get_ylim())
+        n0, n1 = max(int(np.floor(y0 + 0.5)), 0), min(int(np.ceil(y1 + 0.5)), self.n_neurons)
+        shape = (max(min(int(extent.height), n1 - n0), 1), max(int(extent.width), 1))
+        view = (t0, t1, n0, n1, shape)
+        if view == self._view:
+            return
+        self._view = view
+        counts = raster_image(self.neurons, self.times, (t0, t1), (n0, max(n1, n0 + 1)), shape)
+        self.image.set_data(np.ma.masked_equal(counts, 0))
+        self.image.set_extent((t0, t1, n0 - 0.5, max(n1, n0 + 1) - 0.5))
+        self.image.norm.vmax = max(counts.max(), 2)
+        self.ax.figure.canvas.draw_idle()
+
+def draw_raster(ax, spikes, max_segments=RASTER_SEGMENTS, color='black'):
+    """
+    Draw a raster of spike trains with a single artist.
+
+    Up to max_segments spikes are drawn as one LineCollection of ticks; more spikes are drawn as a
+    RasterImage.
+
+    Parameters:
+    - ax: Matplotlib axes to draw on.
+    - spikes: Spike trains in any form accepted by spike_events.
+    - max_segments: Largest number of spikes drawn as ticks.
+    - color: Color of the ticks.
+
+    Returns:
+    - artist: The LineCollection, or the RasterImage.
+    """
+    neurons, times, n_neurons = spike_events(spikes)
+    if len(times) > max_segments:
+        return RasterImage(ax, neurons, times, n_neurons)
+    collection = LineCollection(raster_segments(neurons, times), colors=color, linewidths=1)
+    ax.add_collection(collection)
+    if len(times):
+        ax.set_xlim(times.min(), times.max() if times.max() > times.min() else times.min() + 1)
+    ax.set_ylim(-0.5, max(n_neurons, 1) - 0.5)
+    return collection
+
+def _csr_parts(connectivity):
+    """(indptr, indices, weights, shape) of a CSR matrix, SynapseGroup or dense adjacency matrix."""
+    if hasattr(connectivity, 'tocsr'):
+        connectivity = connectivity.tocsr()
+        return connectivity.indptr, connectivity.indices, connectivity.data, connectivity.shape
+    if hasattr(connectivity, 'indptr') and hasattr(connectivity, 'post'):
+        return connectivity.indptr, connectivity.post, connectivity.efficacy, (connectivity.n_pre, connectivity.n_post)
+    matrix = np.asarray(connectivity)
+    rows, indices = np.nonzero(matrix)
+    indptr = np.searchsorted(rows, np.arange(matrix.shape[0] + 1))
+    return indptr, indices, matrix[rows, indices], matrix.shape
+
+def connectivity_density(connectivity, shape=(1024, 1024), weighted=False):
+    """
+    Aggregate a connectivity matrix into blocks without densifying it.
+
+    The rows and columns are split into at most shape blocks of (nearly) equal size, and the connections
+    of every block are counted with np.bincount, reading the CSR arrays a chunk of rows at a time.
+
+    Parameters:
+    - connectivity: scipy.sparse matrix, SynapseGroup (pre to post), or dense adjacency matrix.
+    - shape: Largest (rows, columns) of the image; smaller matrices get one pixel per neuron.
+    - weighted: Sum the connection weights (matrix values or synaptic efficacies) instead of counting.
+
+    Returns:
+    - density: Array of shape (rows, columns) with the number (or total weight) of connections of every
+      block divided by the number of neuron pairs in it.
+    - row_edges, column_edges: Neuron indices at which the blocks start, and the number of neurons last.
+    """
+    indptr, indices, weights, (n_pre, n_post) = _csr_parts(connectivity)
+    rows, columns = min(shape[0], max(n_pre, 1)), min(shape[1], max(n_post, 1))
+    # Neuron j belongs to block j * blocks // n, so block k starts at ceil(k * n / blocks)
+    row_edges = (np.arange(rows + 1) * n_pre + rows - 1) // rows
+    column_edges = (np.arange(columns + 1) * n_post + columns - 1) // columns
+    row_starts = np.asarray(indptr)[row_edges]
+
+    total = np.zeros(rows * columns)
+    block_rows = max(1, int(CONNECTIVITY_CHUNK // max(1, row_starts[-1] // rows)))
+    for k0 in range(0, rows, block_rows):
+        k1 = min(k0 + block_rows, rows)
+        s, e = row_starts[k0], row_starts[k1]
+        row = np.repeat(np.arange(k0, k1), np.diff(row_starts[k0:k1 + 1]))
+        column = np.asarray(indices[s:e], dtype=np.int64) * columns // max(n_post, 1)
+        total += np.bincount(row * columns + column, weights=np.asarray(weights[s:e]) if weighted else None,
+                             minlength=rows * columns)
+    pairs = np.outer(np.diff(row_edges), np.diff(column_edges))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return total.reshape(rows, columns) / pairs, row_edges, column_edges
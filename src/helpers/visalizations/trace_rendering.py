@@ -0,0 +1,191 @@
+# src/helpers/visualization/trace_rendering.py
+
+import numpy as np
+from matplotlib.lines import Line2D
+
+# Number of samples read at a time from the source of a trace
+M4_CHUNK = 1 << 22
+
+def _reduce(imin, vmin, imax, vmax, size):
+    """Combine runs of size consecutive buckets into one, keeping the position and value of the extremes.
+
+    The last run is padded with its last bucket, so it may be shorter.
+    """
+    pad = -len(vmin) % size
+    if pad:
+        imin, vmin, imax, vmax = (np.concatenate((a, np.repeat(a[-1:], pad))) for a in (imin, vmin, imax, vmax))
+    rows = np.arange(len(vmin) // size)
+    low = vmin.reshape(-1, size).argmin(axis=1)
+    high = vmax.reshape(-1, size).argmax(axis=1)
+    return (imin.reshape(-1, size)[rows, low], vmin.reshape(-1, size)[rows, low],
+            imax.reshape(-1, size)[rows, high], vmax.reshape(-1, size)[rows, high])
+
+def _raw_extrema(y, start, stop, size):
+    """Positions and values of the minimum and maximum of y in buckets of size samples, read in chunks."""
+    step = max(size, M4_CHUNK // size * size)
+    parts = []
+    for a in range(start, stop, step):
+        block = np.asarray(y[a:min(a + step, stop)])
+        positions = np.arange(a, a + len(block))
+        parts.append(_reduce(positions, block, positions, block, size))
+    if not parts:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, np.zeros(0), empty, np.zeros(0)
+    return tuple(np.concatenate(column) for column in zip(*parts))
+
+def _m4(first, last, imin, imax):
+    """Sorted sample indices of the first, minimum, maximum and last sample of every column."""
+    indices = np.sort(np.stack((first, imin, imax, last), axis=1), axis=1).ravel()
+    return indices[np.r_[True, indices[1:] != indices[:-1]]]
+
+def m4_indices(y, n_columns, start=0, stop=None):
+    """Indices of the samples to draw for a trace to look the same as the full trace at a given width.
+
+    The samples start:stop are split into at most n_columns columns of equal length; for each column the
+    first, last, smallest and largest samples are kept (M4 decimation), so a line through the kept samples
+    covers exactly the pixels of the line through all of them, and every spike stays visible.
+
+    Parameters:
+    - y: Array or memmap of shape (T,).
+    - n_columns: Number of pixel columns the samples are drawn on.
+    - start, stop: Range of samples to draw; the whole trace by default.
+
+    Returns:
+    - indices: Sorted indices of at most 4 * n_columns samples.
+    """
+    stop = len(y) if stop is None else min(stop, len(y))
+    n_columns = max(int(n_columns), 1)
+    if stop - start <= 4 * n_columns:
+        return np.arange(start, max(start, stop))
+    size = -(-(stop - start) // n_columns)
+    imin, _, imax, _ = _raw_extrema(y, start, stop, size)
+    first = np.arange(start, stop, size)
+    return _m4(first, np.minimum(first + size, stop) - 1, imin, imax)
+
+class TracePyramid:
+    """Multi-resolution cache of the minima and maxima of a long trace, for fast M4 decimation.
+
+    Level 0 holds the position and value of the minimum and maximum of every bucket of base samples;
+    every further level merges factor buckets of the level below, until a level fits on any screen. A view
+    of the trace is decimated from the coarsest level whose buckets are still narrower than a pixel
+    column, so drawing or zooming into any part of a trace of 10 M samples reads a few thousand buckets
+    and a few samples of the source. Views narrow enough to need less than a bucket per column are read
+    from the source directly. The levels are built on first use, reading the source once in chunks, so a
+    memory-mapped recording (see open_recording) is never loaded as a whole.
+    """
+
+    def __init__(self, y, base=64, factor=4):
+        """
+        Parameters:
+        - y: Array or memmap of shape (T,), e.g. V_m of one neuron.
+        - base: Number of samples per bucket of the finest level.
+        - factor: Number of buckets of a level merged into one bucket of the next.
+        """
+        if np.ndim(y) != 1:
+            raise ValueError("TracePyramid expects a one-dimensional trace.")
+        self.y = y if isinstance(y, np.ndarray) else np.asarray(y)
+        self.base = int(base)
+        self.factor = int(factor)
+        self._levels = None
+
+    def __len__(self):
+        return len(self.y)
+
+    @property
+    def levels(self):
+        """List of (bucket_size, (imin, vmin, imax, vmax)) from the finest level to the coarsest."""
+        if self._levels is None:
+            size = self.base
+            level = _raw_extrema(self.y, 0, len(self.y), size)
+            self._levels = [(size, level)]
+            while len(level[0]) > 4096:
+                size *= self.factor
+                level = _reduce(*level, self.factor)
+                self._levels.append((size, level))
+        return self._levels
+
+    def indices(self, start, stop, n_columns):
+        """
+        Indices of the samples to draw for samples start:stop on n_columns pixel columns; see m4_indices.
+
+        The columns are aligned on the buckets of the level used, so the first and last column may cover
+        a few samples outside start:stop.
+        """
+        start, stop = max(int(start), 0), min(int(stop), len(self.y))
+        n_columns = max(int(n_columns), 1)
+        if stop - start <= self.base * n_columns:
+            return m4_indices(self.y, n_columns, start, stop)
+        per_column = (stop - start) / n_columns
+        size, level = [(size, level) for size, level in self.levels if size <= per_column][-1]
+        q0, q1 = start // size, -(-stop // size)
+        buckets = -(-(q1 - q0) // n_columns)
+        imin, _, imax, _ = _reduce(*(column[q0:q1] for column in level), buckets)
+        first = np.arange(q0, q1, buckets) * size
+        return _m4(first, np.minimum(first + buckets * size, min(q1 * size, len(self.y))) - 1, imin, imax)
+
+class DecimatedTrace:
+    """Line of a long trace on matplotlib axes, redrawn from an M4 decimation whenever the view changes.
+
+    Only about four samples per pixel column of the axes are handed to matplotlib. When the x limits
+    change (zoom, pan) or the figure is resized, the visible samples are decimated again from the
+    trace's TracePyramid, so zooming in reveals the full detail of a memory-mapped recording.
+    """
+
+    def __init__(self, ax, x, y, **line_kwargs):
+        """
+        Parameters:
+        - ax: Matplotlib axes to draw on.
+        - x: Sorted sample times (array or memmap of shape (T,)), or None to use sample indices.
+        - y: Trace of shape (T,) (array or memmap), or a TracePyramid to share its cache between plots.
+        - line_kwargs: Keyword arguments of the Line2D, e.g. label or color.
+        """
+        self.ax = ax
+        self.pyramid = y if isinstance(y, TracePyramid) else TracePyramid(y)
+        self.x = x if x is None or isinstance(x, np.ndarray) else np.asarray(x)
+        self.line = Line2D([], [], **line_kwargs)
+        self._view = None
+        # The decimated full trace has the same extent as the trace, so it sets the data limits
+        self.update(full=True)
+        ax.add_line(self.line)
+        ax.autoscale_view()
+        # Callbacks hold bound methods weakly, so the trace lives as long as its line and is
+        # disconnected once the line is gone (e.g. after ax.cla())
+        self.line.decimated_trace = self
+        self._callbacks = [ax.callbacks.connect('xlim_changed', self._view_changed),
+                           ax.figure.canvas.mpl_connect('resize_event', self._view_changed)]
+
+    def _view_changed(self, *args):
+        self.update()
+
+    def _x_of(self, indices):
+        return np.asarray(indices, dtype=np.float64) if self.x is None else np.asarray(self.x[indices])
+
+    def _index_of(self, x0, x1):
+        if self.x is None:
+            return int(np.floor(x0)), int(np.ceil(x1)) + 1
+        return np.searchsorted(self.x, x0, side='right') - 1, np.searchsorted(self.x, x1, side='left') + 1
+
+    def update(self, full=False):
+        """Decimate the visible samples again if the view or the width of the axes changed."""
+        n = len(self.pyramid)
+        n_columns = max(int(self.ax.get_window_extent().width), 100)
+        if full:
+            start, stop = 0, n
+        else:
+            x0, x1 = sorted(self.ax.get_xlim())
+            start, stop = self._index_of(x0, x1)
+            # Keep one sample on either side, so the line runs to the edges of the view
+            start, stop = max(start - 1, 0), min(stop + 1, n)
+        if self._view == (start, stop, n_columns):
+            return
+        self._view = (start, stop, n_columns)
+        indices = self.pyramid.indices(start, stop, n_columns)
+        self.line.set_data(self._x_of(indices), np.asarray(self.pyramid.y[indices]))
+        if not full:
+            self.ax.figure.canvas.draw_idle()
+
+    def remove(self):
+        """Remove the line and stop following the view."""
+        self.ax.callbacks.disconnect(self._callbacks[0])
+        self.ax.figure.canvas.mpl_disconnect(self._callbacks[1])
+        self.line.remove()
@@ -4,18 +4,61 @@ import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib.animation import FuncAnimation
 from matplotlib.gridspec import GridSpec
+from scipy.signal import welch
+from sparse_rendering import connectivity_density, draw_raster
+from trace_rendering import DecimatedTrace, TracePyramid, m4_indices
 
-def plot_membrane_potential(time, V_m, title="Membrane Potential Over Time"):
-    plt.figure(figsize=(12, 6))
-    plt.plot(time, V_m, label='Membrane Potential (mV)')
-    plt.title(title)
-    plt.xlabel('Time (ms)')
-    plt.ylabel('Membrane Potential (mV)')
-    plt.legend()
-    plt.grid(True)
-    plt.show()
+def _traces(V_m):
+    """Split V_m of shape (T,) or (T, N), or a TracePyramid, into one-dimensional traces."""
+    if isinstance(V_m, TracePyramid) or np.ndim(V_m) == 1:
+        return [V_m]
+    V_m = V_m if isinstance(V_m, np.ndarray) else np.asarray(V_m)
+    return [V_m[:, i] for i in range(V_m.shape[1])]
+
+def _axes(ax, figsize):
+    """Return the figure of ax and ax, or a new figure of the given size and its axes."""
+    if ax is None:
+        return plt.subplots(figsize=figsize)
+    return ax.figure, ax
+
+def _finish(fig, show):
+    """Show the figure if requested, and return it."""
+    if show:
+        plt.show()
+    return fig
 
-def dynamic_membrane_potential(time, V_m, interval=50, title="Dynamic Membrane Potential"):
+def plot_membrane_potential(time, V_m, title="Membrane Potential Over Time", ax=None, show=True):
+    """Plot membrane potential traces, decimated to the width of the figure.
+
+    Parameters:
+    - time: Sorted sample times (ms), an array or memmap of shape (T,).
+    - V_m: Membrane potential of shape (T,) or (T, N), an array or memmap (e.g. from open_recording), or a
+      TracePyramid to reuse its cache.
+    - title: Title of the plot.
+    - ax: Optional axes to draw on; a new figure by default.
+    - show: Show the figure; pass False to only return it (e.g. to save it).
+
+    Returns:
+    - fig: The figure drawn on.
+    """
+    fig, ax = _axes(ax, (12, 6))
+    for i, trace in enumerate(_traces(V_m)):
+        DecimatedTrace(ax, time, trace, color=f'C{i % 10}', label='Membrane Potential (mV)' if i == 0 else None)
+    ax.set_title(title)
+    ax.set_xlabel('Time (ms)')
+    ax.set_ylabel('Membrane Potential (mV)')
+    ax.legend()
+    ax.grid(True)
+    return _finish(fig, show)
+
+def dynamic_membrane_potential(time, V_m, interval=50, title="Dynamic Membrane Potential", max_frames=200):
+    """Animate the membrane potential of a finished simulation.
+
+    The trace is revealed in at most max_frames frames, each drawing the M4 decimation of the samples
+    so far; to watch a simulation while it runs, see live_view.py.
+    """
+    time = time if isinstance(time, np.ndarray) else np.asarray(time)
+    V_m = V_m if isinstance(V_m, np.ndarray) else np.asarray(V_m)
     fig, ax = plt.subplots(figsize=(12, 6))
     ax.set_title(title)
     ax.set_xlabel('Time (ms)')
@@ -28,46 +71,97 @@ def dynamic_membrane_potential(time, V_m, interval=50, title="Dynamic Membrane P
         return line,
 
     def update(frame):
-        line.set_data(time[:frame], V_m[:frame])
+        indices = m4_indices(V_m, max(int(ax.get_window_extent().width), 100), 0, frame)
+        line.set_data(time[indices], V_m[indices])
         return line,
 
-    ani = FuncAnimation(fig, update, frames=len(time), init_func=init, blit=True, interval=interval)
+    frames = np.unique(np.linspace(1, len(time), min(len(time), max_frames)).astype(int))
+    ani = FuncAnimation(fig, update, frames=frames, init_func=init, blit=True, interval=interval)
     plt.show()
+    return ani
 
-def phase_space_plot(V_m, gating_var, gating_var_label="n", title="Phase Space Plot"):
-    plt.figure(figsize=(8, 8))
-    plt.plot(V_m, gating_var, label=gating_var_label)
-    plt.title(title)
-    plt.xlabel('Membrane Potential (mV)')
-    plt.ylabel(f'Gating Variable ({gating_var_label})')
-    plt.legend()
-    plt.grid(True)
-    plt.show()
+def phase_space_plot(V_m, gating_var, gating_var_label="n", title="Phase Space Plot", ax=None, show=True):
+    """Plot the trajectory of a neuron in the (V_m, gating variable) plane.
+
+    Long trajectories are decimated to the samples that are extreme in either variable within each of a
+    few thousand consecutive segments, which keeps the outline of every spike. ax and show are as for
+    plot_membrane_potential; the figure is returned.
+    """
+    fig, ax = _axes(ax, (8, 8))
+    V_m = V_m if isinstance(V_m, np.ndarray) else np.asarray(V_m)
+    gating_var = gating_var if isinstance(gating_var, np.ndarray) else np.asarray(gating_var)
+    n_columns = 4 * int(ax.get_window_extent().width)
+    indices = np.union1d(m4_indices(V_m, n_columns), m4_indices(gating_var, n_columns))
+    ax.plot(V_m[indices], gating_var[indices], label=gating_var_label)
+    ax.set_title(title)
+    ax.set_xlabel('Membrane Potential (mV)')
+    ax.set_ylabel(f'Gating Variable ({gating_var_label})')
+    ax.legend()
+    ax.grid(True)
+    return _finish(fig, show)
+
+def network_connectivity_diagram(adjacency_matrix, title="Network Connectivity", resolution=1024, weighted=False,
+                                 ax=None, show=True):
+    """Plot the connectivity of a network.
+
+    Small dense matrices are drawn entry by entry. Sparse matrices and networks of more than resolution
+    neurons are drawn as the density of connections in blocks of neurons, computed from the CSR arrays
+    without building the dense matrix.
+
+    Parameters:
+    - adjacency_matrix: Dense adjacency matrix, scipy.sparse matrix, or SynapseGroup.
+    - title: Title of the plot.
+    - resolution: Largest number of rows and columns drawn.
+    - weighted: For block densities, sum the connection weights instead of counting connections.
+    - ax, show: As for plot_membrane_potential.
 
-def network_connectivity_diagram(adjacency_matrix, title="Network Connectivity"):
-    fig, ax = plt.subplots(figsize=(8, 8))
-    cmap = plt.get_cmap('viridis', np.max(adjacency_matrix) - np.min(adjacency_matrix) + 1)
-    mat = ax.matshow(adjacency_matrix, cmap=cmap)
-    plt.colorbar(mat, ticks=np.arange(np.min(adjacency_matrix), np.max(adjacency_matrix) + 1))
+    Returns:
+    - fig: The figure drawn on.
+    """
+    fig, ax = _axes(ax, (8, 8))
+    if isinstance(adjacency_matrix, np.ndarray) and max(adjacency_matrix.shape) <= resolution:
+        low, high = np.min(adjacency_matrix), np.max(adjacency_matrix)
+        if np.issubdtype(adjacency_matrix.dtype, np.integer) and high - low < 16:
+            # A few integer levels (e.g. 0/1 or synapse counts) get one color each
+            cmap = plt.get_cmap('viridis', int(high - low) + 1)
+            mat = ax.matshow(adjacency_matrix, cmap=cmap, vmin=low - 0.5, vmax=high + 0.5)
+            fig.colorbar(mat, ax=ax, ticks=np.arange(low, high + 1))
+        else:
+            mat = ax.matshow(adjacency_matrix, cmap='viridis')
+            fig.colorbar(mat, ax=ax)
+    else:
+        density, row_edges, column_edges = connectivity_density(adjacency_matrix, (resolution, resolution), weighted)
+        mat = ax.imshow(density, cmap='viridis', interpolation='nearest', aspect='auto',
+                        extent=(0, column_edges[-1], row_edges[-1], 0))
+        fig.colorbar(mat, ax=ax, label='Mean Weight' if weighted else 'Connection Density')
     ax.set_title(title)
     ax.set_xlabel('Neuron Index')
     ax.set_ylabel('Neuron Index')
-    plt.show()
+    return _finish(fig, show)
+
+def combined_view(time, V_m, spikes, activity_matrix, title="Combined Simulation View", fig=None, show=True):
+    """Plot the membrane potential, spike raster and activity matrix of a simulation one above the other.
 
-def combined_view(time, V_m, spikes, activity_matrix, title="Combined Simulation View"):
-    fig = plt.figure(constrained_layout=True, figsize=(15, 10))
+    fig is an optional figure to draw on, cleared first (use constrained layout); show is as for
+    plot_membrane_potential. The figure is returned.
+    """
+    if fig is None:
+        fig = plt.figure(constrained_layout=True, figsize=(15, 10))
+    else:
+        fig.clear()
     fig.suptitle(title)
     gs = GridSpec(3, 1, figure=fig)
 
     ax1 = fig.add_subplot(gs[0, 0])
-    ax1.plot(time, V_m, label='Membrane Potential')
+    for i, trace in enumerate(_traces(V_m)):
+        DecimatedTrace(ax1, time, trace, color=f'C{i % 10}', label='Membrane Potential' if i == 0 else None)
     ax1.set_ylabel('Membrane Potential (mV)')
     ax1.legend()
 
     ax2 = fig.add_subplot(gs[1, 0])
-    ax2.eventplot(spikes, color='black')
+    draw_raster(ax2, spikes)
     ax2.set_ylabel('Spike Train')
-    ax2.set_xlim(np.min(time), np.max(time))
+    ax2.set_xlim(time[0], time[-1])
 
     ax3 = fig.add_subplot(gs[2, 0])
     im = ax3.imshow(activity_matrix, aspect='auto', origin='lower', cmap='viridis', interpolation='none')
@@ -75,56 +169,79 @@ def combined_view(time, V_m, spikes, activity_matrix, title="Combined Simulation
     ax3.set_xlabel('Time (ms)')
     ax3.set_ylabel('Neuron Index')
 
-    plt.show()
+    return _finish(fig, show)
 
-def plot_raster(spikes, title="Raster Plot of Neuronal Spikes"):
+def plot_raster(spikes, title="Raster Plot of Neuronal Spikes", ax=None, show=True):
     """Generate a raster plot for neuronal spikes.
     
+    All spikes are drawn by a single artist: ticks in one LineCollection, or for large rasters an image of
+    spike counts per pixel (see draw_raster).
+
     Parameters:
-    - spikes: Dictionary or list containing spike times for each neuron.
+    - spikes: SpikeTrains, or dictionary or list containing spike times for each neuron.
     - title: Title of the plot.
+    - ax, show: As for plot_membrane_potential.
+
+    Returns:
+    - fig: The figure drawn on.
     """
-    plt.figure(figsize=(12, 6))
-    for neuron_id, spike_times in enumerate(spikes):
-        plt.scatter(spike_times, [neuron_id] * len(spike_times), s=10, marker='|')
-    plt.title(title)
-    plt.xlabel('Time (ms)')
-    plt.ylabel('Neuron ID')
-    plt.show()
+    fig, ax = _axes(ax, (12, 6))
+    draw_raster(ax, spikes)
+    ax.set_title(title)
+    ax.set_xlabel('Time (ms)')
+    ax.set_ylabel('Neuron ID')
+    return _finish(fig, show)
 
-def plot_frequency_spectrum(signal, sampling_rate, title="Frequency Spectrum"):
+def plot_frequency_spectrum(signal, sampling_rate, title="Frequency Spectrum", estimator=None, ax=None, show=True):
     """Plot the frequency spectrum of a signal.
     
     Parameters:
-    - signal: The neural signal (e.g., membrane potential) array.
+    - signal: The neural signal (e.g., membrane potential) array, or an (N, T) array of signals.
     - sampling_rate: Sampling rate of the signal in Hz.
     - title: Title of the plot.
+    - estimator: Function estimator(signal, sampling_rate) returning (freqs, psd), e.g. the chunked
+      welch_psd of data_processing/spectral.py for memory-mapped recordings; scipy.signal.welch by default.
+    - ax, show: As for plot_membrane_potential.
+
+    Returns:
+    - fig: The figure drawn on.
     """
-    plt.figure(figsize=(12, 6))
-    freqs, psd = signal.welch(signal, sampling_rate)
-    plt.semilogy(freqs, psd)
-    plt.title(title)
-    plt.xlabel('Frequency (Hz)')
-    plt.ylabel('Power Spectral Density')
-    plt.xlim([0, freqs.max()])
-    plt.show()
+    fig, ax = _axes(ax, (12, 6))
+    freqs, psd = (estimator or welch)(signal, sampling_rate)
+    ax.semilogy(freqs, np.asarray(psd).T)
+    ax.set_title(title)
+    ax.set_xlabel('Frequency (Hz)')
+    ax.set_ylabel('Power Spectral Density')
+    ax.set_xlim([0, freqs.max()])
+    return _finish(fig, show)
 
-def plot_synaptic_weights_over_time(weights, title="Synaptic Weight Changes"):
+def plot_synaptic_weights_over_time(weights, title="Synaptic Weight Changes", times=None, ax=None, show=True):
     """Visualize changes in synaptic weights over time.
     
     Parameters:
-    - weights: A 2D numpy array or list of lists where each row represents weight changes over time for a synapse.
+    - weights: A 2D numpy array or list of lists where each row represents weight changes over time for a synapse,
+      e.g. WeightSnapshots.weights.
     - title: Title of the plot.
+    - times: Optional times of the samples, e.g. WeightSnapshots.times; a shorter row uses the first times.
+    - ax, show: As for plot_membrane_potential.
+
+    Returns:
+    - fig: The figure drawn on.
     """
-    plt.figure(figsize=(12, 6))
+    fig, ax = _axes(ax, (12, 6))
+    # Rows may differ in length, so each synapse is drawn on its own
     for synapse_weights in weights:
-        plt.plot(synapse_weights)
-    plt.title(title)
-    plt.xlabel('Time (Arbitrary Units)')
-    plt.ylabel('Synaptic Weight')
-    plt.show()
+        if times is None:
+            ax.plot(synapse_weights)
+        else:
+            ax.plot(times[:len(synapse_weights)], synapse_weights)
+    ax.set_xlabel('Time (Arbitrary Units)' if times is None else 'Time (ms)')
+    ax.set_title(title)
+    ax.set_ylabel('Synaptic Weight')
+    return _finish(fig, show)
 
-def heatmap_neuronal_feature_encoding(feature_responses, feature_labels, neuron_labels, title="Neuronal Feature Encoding"):
+def heatmap_neuronal_feature_encoding(feature_responses, feature_labels, neuron_labels, title="Neuronal Feature Encoding",
+                                      ax=None, show=True):
     """Generate a heatmap showing how neurons respond to different features.
     
     Parameters:
@@ -132,16 +249,20 @@ def heatmap_neuronal_feature_encoding(feature_responses, feature_labels, neuron_
     - feature_labels: List of names/labels for each feature.
     - neuron_labels: List of neuron identifiers.
     - title: Title of the heatmap.
+    - ax, show: As for plot_membrane_potential.
+
+    Returns:
+    - fig: The figure drawn on.
     """
-    fig, ax = plt.subplots(figsize=(12, 8))
+    fig, ax = _axes(ax, (12, 8))
     cax = ax.matshow(feature_responses, interpolation='nearest', cmap='viridis')
-    fig.colorbar(cax)
+    fig.colorbar(cax, ax=ax)
     
     ax.set_xticklabels([''] + feature_labels, rotation=90)
     ax.set_yticklabels([''] + neuron_labels)
     
-    plt.title(title)
-    plt.xlabel('Feature')
-    plt.ylabel('Neuron')
-    plt.show()
+    ax.set_title(title)
+    ax.set_xlabel('Feature')
+    ax.set_ylabel('Neuron')
+    return _finish(fig, show)
 
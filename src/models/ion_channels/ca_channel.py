@@ -1,29 +1,38 @@
 # src/models/ion_channels/ca_channel.py
 
-import numpy as np
+import rate_tables
 
 class CalciumChannel:
     """Model of the calcium ion channel."""
-    def __init__(self):
+    def __init__(self, rate_table=None, gating='euler'):
+        """
+        Parameters:
+        - rate_table: Optional RateTable with alpha_c and beta_c entries,
+          e.g. rate_tables.get_rate_table('calcium'). When given, rates are interpolated from it.
+        - gating: Gating update scheme, 'euler' or 'exponential' (Rush-Larsen, see rate_tables.gate_step).
+        """
         # Calcium channel gating variables are often more complex and can involve multiple domains
         # For simplicity, we'll use a basic representation with a single gating variable
         self.c = 0.01  # Placeholder for calcium channel gating variable
+        self.rate_table = rate_table
+        self.gating = gating
 
     def alpha_c(self, V):
         """Rate constant for activation gating variable c."""
-        # Placeholder for actual dynamics, assuming a simple linear relationship for demonstration
-        return 0.01 * (V + 50) / (1 - np.exp(-(V + 50) / 10))
+        return rate_tables.alpha_c(V)
 
     def beta_c(self, V):
         """Rate constant for deactivation gating variable c."""
-        # Placeholder for actual dynamics, assuming a simple linear relationship for demonstration
-        return 0.01 * np.exp(-(V + 65) / 18)
+        return rate_tables.beta_c(V)
 
     def update_gating_variables(self, V, dt):
         """Update the gating variable c."""
-        c_next = self.alpha_c(V) * (1 - self.c) - self.beta_c(V) * self.c
+        if self.rate_table is not None:
+            a_c, b_c = self.rate_table.evaluate(V, ('alpha_c', 'beta_c'))
+        else:
+            a_c, b_c = self.alpha_c(V), self.beta_c(V)
         
-        self.c += c_next * dt
+        self.c = rate_tables.gate_step(self.c, a_c, b_c, dt, self.gating)
 
     def current(self, V, E_Ca):
         """Calculate the calcium current through the channel."""
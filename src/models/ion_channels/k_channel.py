@@ -1,26 +1,37 @@
 # src/models/ion_channels/k_channel.py
 
-import numpy as np
+import rate_tables
 
 class PotassiumChannel:
     """Model of the potassium ion channel."""
-    def __init__(self):
+    def __init__(self, rate_table=None, gating='euler'):
+        """
+        Parameters:
+        - rate_table: Optional RateTable with alpha_n and beta_n entries,
+          e.g. rate_tables.get_rate_table('potassium'). When given, rates are interpolated from it.
+        - gating: Gating update scheme, 'euler' or 'exponential' (Rush-Larsen, see rate_tables.gate_step).
+        """
         # Potassium channel gating variable
         self.n = 0.32
+        self.rate_table = rate_table
+        self.gating = gating
 
     def alpha_n(self, V):
         """Rate constant for activation gating variable n."""
-        return 0.01 * (V + 55) / (1 - np.exp(-(V + 55) / 10))
+        return rate_tables.alpha_n(V)
 
     def beta_n(self, V):
         """Rate constant for deactivation gating variable n."""
-        return 0.125 * np.exp(-(V + 65) / 80)
+        return rate_tables.beta_n(V)
 
     def update_gating_variables(self, V, dt):
         """Update the gating variable n."""
-        n_next = self.alpha_n(V) * (1 - self.n) - self.beta_n(V) * self.n
+        if self.rate_table is not None:
+            a_n, b_n = self.rate_table.evaluate(V, ('alpha_n', 'beta_n'))
+        else:
+            a_n, b_n = self.alpha_n(V), self.beta_n(V)
         
-        self.n += n_next * dt
+        self.n = rate_tables.gate_step(self.n, a_n, b_n, dt, self.gating)
 
     def current(self, V, E_K):
         """Calculate the potassium current through the channel."""
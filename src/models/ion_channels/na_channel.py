@@ -1,37 +1,47 @@
 # src/models/ion_channels/na_channel.py
 
-import numpy as np
+import rate_tables
 
 class SodiumChannel:
     """Model of the sodium ion channel."""
-    def __init__(self):
+    def __init__(self, rate_table=None, gating='euler'):
+        """
+        Parameters:
+        - rate_table: Optional RateTable with alpha_m, beta_m, alpha_h and beta_h entries,
+          e.g. rate_tables.get_rate_table('sodium'). When given, rates are interpolated from it.
+        - gating: Gating update scheme, 'euler' or 'exponential' (Rush-Larsen, see rate_tables.gate_step).
+        """
         # Sodium channel gating variables
         self.m = 0.05
         self.h = 0.6
+        self.rate_table = rate_table
+        self.gating = gating
 
     def alpha_m(self, V):
         """Rate constant for activation gating variable m."""
-        return 0.1 * (V + 40) / (1 - np.exp(-(V + 40) / 10))
+        return rate_tables.alpha_m(V)
 
     def beta_m(self, V):
         """Rate constant for deactivation gating variable m."""
-        return 4.0 * np.exp(-(V + 65) / 18)
+        return rate_tables.beta_m(V)
 
     def alpha_h(self, V):
         """Rate constant for inactivation gating variable h."""
-        return 0.07 * np.exp(-(V + 65) / 20)
+        return rate_tables.alpha_h(V)
 
     def beta_h(self, V):
         """Rate constant for deactivation gating variable h."""
-        return 1 / (1 + np.exp(-(V + 35) / 10))
+        return rate_tables.beta_h(V)
 
     def update_gating_variables(self, V, dt):
         """Update the gating variables m and h."""
-        m_next = self.alpha_m(V) * (1 - self.m) - self.beta_m(V) * self.m
-        h_next = self.alpha_h(V) * (1 - self.h) - self.beta_h(V) * self.h
+        if self.rate_table is not None:
+            a_m, b_m, a_h, b_h = self.rate_table.evaluate(V, ('alpha_m', 'beta_m', 'alpha_h', 'beta_h'))
+        else:
+            a_m, b_m, a_h, b_h = self.alpha_m(V), self.beta_m(V), self.alpha_h(V), self.beta_h(V)
         
-        self.m += m_next * dt
-        self.h += h_next * dt
+        self.m = rate_tables.gate_step(self.m, a_m, b_m, dt, self.gating)
+        self.h = rate_tables.gate_step(self.h, a_h, b_h, dt, self.gating)
 
     def current(self, V, E_Na):
         """Calculate the sodium current through the channel."""
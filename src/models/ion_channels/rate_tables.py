@@ -0,0 +1,216 @@
+# src/models/ion_channels/rate_tables.py
+
+import numpy as np
+from scipy.interpolate import CubicSpline
+from scipy.special import exprel
+
+
+def _linoid(V, rate, V_half, k):
+    """Rate of the form rate * (V - V_half) / (1 - exp(-(V - V_half) / k)).
+
+    The closed form is 0/0 at V = V_half; rewriting it as rate * k / exprel(-(V - V_half) / k)
+    removes the singularity (the limit there is rate * k).
+    """
+    return rate * k / exprel(-(np.asarray(V, dtype=np.float64) - V_half) / k)
+
+
+def alpha_m(V):
+    """Sodium channel (activation) rate constant."""
+    return _linoid(V, 0.1, -40.0, 10.0)
+
+
+def beta_m(V):
+    """Sodium channel (activation) rate constant."""
+    return 4.0 * np.exp(-(V + 65) / 18)
+
+
+def alpha_h(V):
+    """Sodium channel (inactivation) rate constant."""
+    return 0.07 * np.exp(-(V + 65) / 20)
+
+
+def beta_h(V):
+    """Sodium channel (inactivation) rate constant."""
+    return 1 / (1 + np.exp(-(V + 35) / 10))
+
+
+def alpha_n(V):
+    """Potassium channel (activation) rate constant."""
+    return _linoid(V, 0.01, -55.0, 10.0)
+
+
+def beta_n(V):
+    """Potassium channel (activation) rate constant."""
+    return 0.125 * np.exp(-(V + 65) / 80)
+
+
+def alpha_c(V):
+    """Calcium channel (activation) rate constant."""
+    return _linoid(V, 0.01, -50.0, 10.0)
+
+
+def beta_c(V):
+    """Calcium channel (deactivation) rate constant."""
+    return 0.01 * np.exp(-(V + 65) / 18)
+
+
+# Gating variables of each channel type as (gate, alpha, beta) triples
+CHANNEL_GATES = {
+    'sodium': (('m', alpha_m, beta_m), ('h', alpha_h, beta_h)),
+    'potassium': (('n', alpha_n, beta_n),),
+    'calcium': (('c', alpha_c, beta_c),),
+    'hodgkin_huxley': (('m', alpha_m, beta_m), ('h', alpha_h, beta_h), ('n', alpha_n, beta_n)),
+}
+
+
+def channel_rates(channel_type, form='rates'):
+    """List the tabulated functions of a channel type.
+
+    Parameters:
+    - channel_type: Key of CHANNEL_GATES ('sodium', 'potassium', 'calcium' or 'hodgkin_huxley').
+    - form: 'rates' for alpha_x/beta_x entries, 'inf_tau' for x_inf/tau_x entries.
+
+    Returns:
+    - rates: List of (name, function) pairs.
+    """
+    if channel_type not in CHANNEL_GATES:
+        raise ValueError(f"Unknown channel type '{channel_type}'.")
+    rates = []
+    for gate, alpha, beta in CHANNEL_GATES[channel_type]:
+        if form == 'rates':
+            rates.append((f'alpha_{gate}', alpha))
+            rates.append((f'beta_{gate}', beta))
+        elif form == 'inf_tau':
+            rates.append((f'{gate}_inf', lambda V, a=alpha, b=beta: a(V) / (a(V) + b(V))))
+            rates.append((f'tau_{gate}', lambda V, a=alpha, b=beta: 1 / (a(V) + b(V))))
+        else:
+            raise ValueError("Unsupported table form specified.")
+    return rates
+
+
+def gate_step(x, alpha, beta, dt, method='euler', out=None):
+    """Advance a gating variable dx/dt = alpha * (1 - x) - beta * x by one time step.
+
+    Parameters:
+    - x: Current value of the gating variable.
+    - alpha, beta: Opening and closing rates at the current potential (1/ms).
+    - dt: Time step (ms).
+    - method: 'euler' for forward Euler, 'exponential' for the exponential-Euler (Rush-Larsen) update
+      x_inf + (x - x_inf) * exp(-dt / tau_x), which is exact for fixed V and stable for any dt.
+    - out: Optional array receiving the result, which may be x itself.
+
+    Returns:
+    - x_next: Value of the gating variable after the step.
+    """
+    if method == 'euler':
+        return np.add(x, dt * (alpha * (1 - x) - beta * x), out=out)
+    if method == 'exponential':
+        rate = alpha + beta
+        x_inf = alpha / rate
+        return np.add(x_inf, (x - x_inf) * np.exp(-dt * rate), out=out)
+    raise ValueError("Unsupported gating method specified.")
+
+
+class RateTable:
+    """Voltage-indexed lookup table for channel rate functions.
+
+    The functions are sampled once on a uniform voltage grid and interpolated at run time,
+    which replaces the transcendental calls of every step by an index computation and a gather.
+    Potentials outside the grid are clamped to its ends.
+    """
+
+    def __init__(self, rates, v_min=-100.0, v_max=100.0, dv=0.05, method='linear'):
+        """
+        Parameters:
+        - rates: Sequence of (name, function) pairs; each function maps an array of potentials (mV) to rates.
+        - v_min, v_max: Bounds of the voltage grid (mV).
+        - dv: Grid spacing (mV).
+        - method: Interpolation method, 'linear' or 'cubic'.
+        """
+        if method not in ('linear', 'cubic'):
+            raise ValueError("Unsupported interpolation method specified.")
+        self.v_min = float(v_min)
+        self.dv = float(dv)
+        self.n_points = int(round((v_max - v_min) / dv)) + 1
+        self.v_max = self.v_min + (self.n_points - 1) * self.dv
+        self.method = method
+
+        self.names = tuple(name for name, _ in rates)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.grid = self.v_min + self.dv * np.arange(self.n_points)
+        self.values = np.vstack([np.broadcast_to(fn(self.grid), self.grid.shape) for _, fn in rates])
+
+        if method == 'linear':
+            # Per-interval offsets and slopes, shape (2, n_rates, n_points - 1)
+            self.coefficients = np.stack([self.values[:, :-1], np.diff(self.values, axis=1)])
+        else:
+            # Per-interval cubic polynomial coefficients in the fractional offset, shape (4, n_rates, n_points - 1)
+            c = np.moveaxis(CubicSpline(self.grid, self.values, axis=1).c, 2, 1)
+            self.coefficients = c * (self.dv ** np.arange(3, -1, -1))[:, None, None]
+        self._subsets = {}
+
+    def _locate(self, V):
+        """Return the grid interval of each potential and the fractional offset into it."""
+        x = (np.asarray(V, dtype=np.float64) - self.v_min) * (1.0 / self.dv)
+        x = np.clip(x, 0.0, self.n_points - 1)
+        i = np.minimum(x.astype(np.intp), self.n_points - 2)
+        return i, x - i
+
+    def _coefficients_for(self, names):
+        """Return contiguous coefficients for a subset of entries, cached per name tuple."""
+        if names is None:
+            return self.coefficients
+        names = tuple(names)
+        coefficients = self._subsets.get(names)
+        if coefficients is None:
+            rows = [self.index[name] for name in names]
+            coefficients = np.ascontiguousarray(self.coefficients[:, rows])
+            self._subsets[names] = coefficients
+        return coefficients
+
+    def evaluate(self, V, names=None):
+        """Interpolate the tabulated functions.
+
+        Parameters:
+        - V: Membrane potential (mV), scalar or array.
+        - names: Optional sequence of entry names to evaluate; defaults to all entries in table order.
+
+        Returns:
+        - rates: Array of shape (n_names,) + V.shape.
+        """
+        c = self._coefficients_for(names)
+        i, frac = self._locate(V)
+        if self.method == 'linear':
+            return c[0].take(i, axis=1) + frac * c[1].take(i, axis=1)
+        return ((c[0].take(i, axis=1) * frac + c[1].take(i, axis=1)) * frac
+                + c[2].take(i, axis=1)) * frac + c[3].take(i, axis=1)
+
+    def __call__(self, name, V):
+        """Interpolate a single tabulated function by name."""
+        return self.evaluate(V, (name,))[0]
+
+
+_TABLE_CACHE = {}
+
+
+def get_rate_table(channel_type, v_min=-100.0, v_max=100.0, dv=0.05, method='linear', form='rates'):
+    """Return the shared rate table of a channel type, building it on first use.
+
+    Tables are cached per channel type, grid and interpolation method, so every channel
+    instance created with the same settings shares one table.
+
+    Parameters:
+    - channel_type: Key of CHANNEL_GATES ('sodium', 'potassium', 'calcium' or 'hodgkin_huxley').
+    - v_min, v_max, dv: Voltage grid (mV).
+    - method: Interpolation method, 'linear' or 'cubic'.
+    - form: 'rates' for alpha_x/beta_x entries, 'inf_tau' for x_inf/tau_x entries.
+
+    Returns:
+    - table: The cached RateTable.
+    """
+    key = (channel_type, form, float(v_min), float(v_max), float(dv), method)
+    table = _TABLE_CACHE.get(key)
+    if table is None:
+        table = RateTable(channel_rates(channel_type, form), v_min, v_max, dv, method)
+        _TABLE_CACHE[key] = table
+    return table
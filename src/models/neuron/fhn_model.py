@@ -1,11 +1,12 @@
 # src/models/neuron/fhn_model.py
 
 import numpy as np
+from state_history import StateHistory
 
 class FitzHughNagumoModel:
     """Implementation of the FitzHugh-Nagumo neuron model."""
     
-    def __init__(self, a=0.7, b=0.8, tau=12.5, I_ext=0.0):
+    def __init__(self, a=0.7, b=0.8, tau=12.5, I_ext=0.0, history='full', history_length=None):
         """
         Initializes the FHN neuron model with default parameters.
         
@@ -14,6 +15,8 @@ class FitzHughNagumoModel:
         - b: Recovery rate parameter.
         - tau: Timescale parameter for the recovery variable.
         - I_ext: External current applied to the neuron (stimulus).
+        - history: How the state history is kept: 'full', 'ring' (last history_length samples) or 'off'.
+        - history_length: Number of samples kept in 'ring' mode.
         """
         self.a = a
         self.b = b
@@ -21,8 +24,24 @@ class FitzHughNagumoModel:
         self.I_ext = I_ext
         
         # Initial values
-        self.v = np.array([0.0])  # Membrane potential
-        self.w = np.array([0.0])  # Recovery variable
+        self._v = 0.0  # Membrane potential
+        self._w = 0.0  # Recovery variable
+        self.history = StateHistory(('v', 'w'), mode=history, maxlen=history_length)
+        self.history.append(self._v, self._w)
+
+    @property
+    def v(self):
+        """Recorded membrane potential history (only the current value when history is off)."""
+        if self.history.mode == 'off':
+            return np.array([self._v])
+        return self.history.get('v')
+
+    @property
+    def w(self):
+        """Recorded recovery variable history (only the current value when history is off)."""
+        if self.history.mode == 'off':
+            return np.array([self._w])
+        return self.history.get('w')
 
     def update(self, dt):
         """
@@ -31,7 +50,7 @@ class FitzHughNagumoModel:
         Parameters:
         - dt: Time step for integration (in milliseconds).
         """
-        v, w = self.v[-1], self.w[-1]
+        v, w = self._v, self._w
         
         # FitzHugh-Nagumo Equations
         dv_dt = v - (v**3 / 3) - w + self.I_ext
@@ -41,9 +60,9 @@ class FitzHughNagumoModel:
         v_next = v + dv_dt * dt
         w_next = w + dw_dt * dt
         
-        # Append the next state to the history
-        self.v = np.append(self.v, v_next)
-        self.w = np.append(self.w, w_next)
+        self._v = v_next
+        self._w = w_next
+        self.history.append(v_next, w_next)
 
     def get_state(self):
         """
@@ -53,4 +72,4 @@ class FitzHughNagumoModel:
         - v: Current membrane potential.
         - w: Current recovery variable.
         """
-        return self.v[-1], self.w[-1]
+        return self._v, self._w
@@ -0,0 +1,106 @@
+# src/models/neuron/gating_benchmark.py
+
+import time
+
+import numpy as np
+from hh_model import HodgkinHuxleyPopulation
+
+# (gating, voltage) scheme pairs compared by the benchmark
+SCHEMES = (('euler', 'euler'), ('exponential', 'euler'), ('exponential', 'semi_implicit'),
+           ('exponential', 'crank_nicolson'))
+
+# Second-order scheme used for the reference solution
+REFERENCE_SCHEME = ('exponential', 'crank_nicolson')
+
+
+def spike_times(V, dt, threshold=0.0):
+    """Upward threshold crossings of each trace, linearly interpolated between samples.
+
+    Parameters:
+    - V: Array of shape (T, N) holding one membrane potential trace per column.
+    - dt: Sampling interval (ms).
+    - threshold: Crossing level (mV).
+
+    Returns:
+    - times: List of N arrays of spike times (ms).
+    """
+    before, after = V[:-1], V[1:]
+    step, neuron = np.nonzero((before < threshold) & (after >= threshold))
+    frac = (threshold - before[step, neuron]) / (after[step, neuron] - before[step, neuron])
+    times = (step + frac) * dt
+    return [times[neuron == i] for i in range(V.shape[1])]
+
+
+def run_population(I_ext, dt, t_max, gating='euler', voltage='euler'):
+    """Simulate one HH population and return its traces and the wall time of the stepping loop.
+
+    Parameters:
+    - I_ext: Array of shape (N,) with one constant input current per neuron (uA/cm^2).
+    - dt: Time step (ms).
+    - t_max: Simulated duration (ms).
+    - gating, voltage: Update schemes passed to HodgkinHuxleyPopulation.
+
+    Returns:
+    - V: Array of shape (T, N) with the membrane potentials.
+    - elapsed: Seconds spent stepping.
+    """
+    population = HodgkinHuxleyPopulation(len(I_ext), gating=gating, voltage=voltage)
+    n_steps = int(round(t_max / dt))
+    V = np.empty((n_steps + 1, len(I_ext)))
+    V[0] = population.V_m
+    start = time.perf_counter()
+    with np.errstate(all='ignore'):
+        for i in range(1, n_steps + 1):
+            population.update(I_ext, dt)
+            V[i] = population.V_m
+    return V, time.perf_counter() - start
+
+
+def spike_timing_error(reference, candidate):
+    """Mean absolute spike-time difference (ms) over neurons, or inf if spike counts differ."""
+    errors = []
+    for ref, cand in zip(reference, candidate):
+        if len(ref) != len(cand):
+            return np.inf
+        errors.append(np.abs(ref - cand))
+    errors = np.concatenate(errors) if errors else np.array([])
+    return float(errors.mean()) if errors.size else 0.0
+
+
+def benchmark_gating_schemes(dts=(0.01, 0.025, 0.05, 0.1), t_max=200.0, I_ext=(7.0, 10.0, 15.0, 20.0),
+                             reference_dt=0.001, n_repeats=25):
+    """Compare the error and cost of the HH update schemes over a range of time steps.
+
+    The reference is the second-order REFERENCE_SCHEME solution at reference_dt. Each (scheme, dt)
+    pair is run on a population of n_repeats copies of every input current, so the timings reflect
+    vectorized stepping.
+
+    Parameters:
+    - dts: Time steps (ms) to test.
+    - t_max: Simulated duration (ms).
+    - I_ext: Constant input currents (uA/cm^2), one neuron per value.
+    - reference_dt: Time step (ms) of the reference solution.
+    - n_repeats: Number of copies of each neuron in the timed populations.
+
+    Returns:
+    - results: List of dicts with 'gating', 'voltage', 'dt', 'error_ms' (mean absolute spike-time
+      error, inf if spikes were lost or gained) and 'seconds' (wall time of the run).
+    """
+    I_ext = np.asarray(I_ext, dtype=np.float64)
+    V_ref, _ = run_population(I_ext, reference_dt, t_max, *REFERENCE_SCHEME)
+    reference = spike_times(V_ref, reference_dt)
+
+    results = []
+    for gating, voltage in SCHEMES:
+        for dt in dts:
+            V, elapsed = run_population(np.tile(I_ext, n_repeats), dt, t_max, gating, voltage)
+            candidate = spike_times(V[:, :len(I_ext)], dt)
+            results.append({'gating': gating, 'voltage': voltage, 'dt': dt,
+                            'error_ms': spike_timing_error(reference, candidate), 'seconds': elapsed})
+    return results
+
+
+if __name__ == '__main__':
+    print(f"{'gating':<12}{'voltage':<15}{'dt (ms)':>9}{'error (ms)':>12}{'time (s)':>10}")
+    for row in benchmark_gating_schemes():
+        print(f"{row['gating']:<12}{row['voltage']:<15}{row['dt']:>9}{row['error_ms']:>12.4g}{row['seconds']:>10.3f}")
@@ -2,10 +2,79 @@
 # src/models/neuron/hh_model.py
 
 import numpy as np
+import rate_tables
+from state_history import StateHistory
+
+# Entry names expected in a rate table shared by the Hodgkin-Huxley classes
+HH_RATE_NAMES = ('alpha_m', 'beta_m', 'alpha_h', 'beta_h', 'alpha_n', 'beta_n')
+
+def _hh_step(model, I_ext, dt, out=None):
+    """
+    Advance the state of a Hodgkin-Huxley model by one time step with its configured schemes.
+
+    Shared by HodgkinHuxleyNeuron (scalar state) and HodgkinHuxleyPopulation (arrays of shape (N,)).
+
+    Parameters:
+    - model: The neuron or population, providing V_m, m, h, n, the parameters, rates, gating and voltage.
+    - I_ext: External current (uA/cm^2).
+    - dt: Time step (ms).
+    - out: Optional tuple of four arrays receiving the new V_m, m, h and n; they may be the state itself.
+
+    Returns:
+    - V_m, m, h, n: The state after the step.
+    """
+    V, m, h, n = model.V_m, model.m, model.h, model.n
+    V_out, m_out, h_out, n_out = (None, None, None, None) if out is None else out
+
+    if model.voltage == 'crank_nicolson':
+        # Trapezoidal step in V at the conductances of the current gates, which are taken to
+        # lag V by half a step; the gates then advance with the rates at the new potential
+        g_Na = model.g_Na * m**3 * h
+        g_K = model.g_K * n**4
+        g_total = g_Na + g_K + model.g_L
+        drive = I_ext + g_Na * model.E_Na + g_K * model.E_K + model.g_L * model.E_L
+        V = np.divide(V * (model.C_m / dt - g_total / 2) + drive, model.C_m / dt + g_total / 2, out=V_out)
+        a_m, b_m, a_h, b_h, a_n, b_n = model.rates(V)
+        return (V, rate_tables.gate_step(m, a_m, b_m, dt, model.gating, out=m_out),
+                rate_tables.gate_step(h, a_h, b_h, dt, model.gating, out=h_out),
+                rate_tables.gate_step(n, a_n, b_n, dt, model.gating, out=n_out))
+
+    # Rates are evaluated at the potential from the start of the step
+    a_m, b_m, a_h, b_h, a_n, b_n = model.rates(V)
+
+    if model.voltage == 'semi_implicit':
+        # Currents are linear in V for fixed conductances, so the implicit step has a closed form
+        m = rate_tables.gate_step(m, a_m, b_m, dt, model.gating, out=m_out)
+        h = rate_tables.gate_step(h, a_h, b_h, dt, model.gating, out=h_out)
+        n = rate_tables.gate_step(n, a_n, b_n, dt, model.gating, out=n_out)
+        g_Na = model.g_Na * m**3 * h
+        g_K = model.g_K * n**4
+        numerator = model.C_m * V + dt * (I_ext + g_Na * model.E_Na + g_K * model.E_K + model.g_L * model.E_L)
+        return np.divide(numerator, model.C_m + dt * (g_Na + g_K + model.g_L), out=V_out), m, h, n
+
+    # Calculate ionic currents with the gates from the start of the step
+    I_Na = model.g_Na * m**3 * h * (V - model.E_Na)
+    I_K = model.g_K * n**4 * (V - model.E_K)
+    I_L = model.g_L * (V - model.E_L)
+
+    # Update membrane potential and gating variables
+    dVdt = (I_ext - I_Na - I_K - I_L) / model.C_m
+    return (np.add(V, dVdt * dt, out=V_out),
+            rate_tables.gate_step(m, a_m, b_m, dt, model.gating, out=m_out),
+            rate_tables.gate_step(h, a_h, b_h, dt, model.gating, out=h_out),
+            rate_tables.gate_step(n, a_n, b_n, dt, model.gating, out=n_out))
+
+def _check_schemes(gating, voltage):
+    """Validate the gating and membrane potential update schemes."""
+    if gating not in ('euler', 'exponential'):
+        raise ValueError("Unsupported gating method specified.")
+    if voltage not in ('euler', 'semi_implicit', 'crank_nicolson'):
+        raise ValueError("Unsupported voltage method specified.")
 
 class HodgkinHuxleyNeuron:
     """Implementation of the Hodgkin-Huxley model for a neuron."""
-    def __init__(self, C_m=1.0, E_Na=50, E_K=-77, E_L=-54.387, g_Na=120, g_K=36, g_L=0.3):
+    def __init__(self, C_m=1.0, E_Na=50, E_K=-77, E_L=-54.387, g_Na=120, g_K=36, g_L=0.3, rate_table=None,
+                 gating='euler', voltage='euler', history='off', history_length=None):
         # Membrane capacitance (uF/cm^2)
         self.C_m = C_m
         
@@ -19,6 +88,16 @@ class HodgkinHuxleyNeuron:
         self.g_K = g_K
         self.g_L = g_L
 
+        # Optional RateTable with the HH_RATE_NAMES entries, e.g. get_rate_table('hodgkin_huxley')
+        self.rate_table = rate_table
+
+        # Integration schemes: gates by 'euler' or 'exponential' (Rush-Larsen); V by 'euler',
+        # 'semi_implicit' (backward Euler with the conductances of the updated gates) or
+        # 'crank_nicolson' (gates staggered half a step behind V, second order)
+        _check_schemes(gating, voltage)
+        self.gating = gating
+        self.voltage = voltage
+
         # Initial membrane potential
         self.V_m = -65
 
@@ -27,29 +106,33 @@ class HodgkinHuxleyNeuron:
         self.h = self.h_inf()
         self.n = self.n_inf()
 
+        # State history: 'full', 'ring' (last history_length samples) or 'off'
+        self.history = StateHistory(('V_m', 'm', 'h', 'n'), mode=history, maxlen=history_length)
+        self.history.append(self.V_m, self.m, self.h, self.n)
+
     def alpha_m(self, V):
         """Sodium channel (activation) rate constant."""
-        return 0.1 * (V + 40) / (1 - np.exp(-(V + 40) / 10))
+        return rate_tables.alpha_m(V)
 
     def beta_m(self, V):
         """Sodium channel (activation) rate constant."""
-        return 4.0 * np.exp(-(V + 65) / 18)
+        return rate_tables.beta_m(V)
 
     def alpha_h(self, V):
         """Sodium channel (inactivation) rate constant."""
-        return 0.07 * np.exp(-(V + 65) / 20)
+        return rate_tables.alpha_h(V)
 
     def beta_h(self, V):
         """Sodium channel (inactivation) rate constant."""
-        return 1 / (1 + np.exp(-(V + 35) / 10))
+        return rate_tables.beta_h(V)
 
     def alpha_n(self, V):
         """Potassium channel (activation) rate constant."""
-        return 0.01 * (V + 55) / (1 - np.exp(-(V + 55) / 10))
+        return rate_tables.alpha_n(V)
 
     def beta_n(self, V):
         """Potassium channel (activation) rate constant."""
-        return 0.125 * np.exp(-(V + 65) / 80)
+        return rate_tables.beta_n(V)
 
     def m_inf(self):
         """Steady-state value of activation gating variable m."""
@@ -66,23 +149,131 @@ class HodgkinHuxleyNeuron:
         V = self.V_m
         return self.alpha_n(V) / (self.alpha_n(V) + self.beta_n(V))
 
+    def rates(self, V):
+        """Return (alpha_m, beta_m, alpha_h, beta_h, alpha_n, beta_n) at potential V."""
+        if self.rate_table is not None:
+            return self.rate_table.evaluate(V, HH_RATE_NAMES)
+        return (self.alpha_m(V), self.beta_m(V), self.alpha_h(V),
+                self.beta_h(V), self.alpha_n(V), self.beta_n(V))
+
     def update(self, I_ext, dt):
         """Update the neuron's membrane potential and gating variables."""
-        V = self.V_m
-        m = self.m
-        h = self.h
-        n = self.n
-
-        # Calculate ionic currents
-        I_Na = (self.g_Na * m**3 * h * (V - self.E_Na))
-        I_K = (self.g_K * n**4 * (V - self.E_K))
-        I_L = (self.g_L * (V - self.E_L))
-
-        # Update membrane potential
-        dVdt = (I_ext - I_Na - I_K - I_L) / self.C_m
-        self.V_m += dVdt * dt
-
-        # Update gating variables
-        self.m += dt * (self.alpha_m(V) * (1 - m) - self.beta_m(V) * m)
-        self.h += dt * (self.alpha_h(V) * (1 - h) - self.beta_h(V) * h)
-        self.n += dt * (self.alpha_n(V) * (1 - n) - self.beta_n(V) * n)
+        self._step(I_ext, dt)
+        self.history.append(self.V_m, self.m, self.h, self.n)
+
+    def _step(self, I_ext, dt):
+        """Advance the state by one time step with the configured schemes."""
+        self.V_m, self.m, self.h, self.n = _hh_step(self, I_ext, dt)
+
+
+class HodgkinHuxleyPopulation:
+    """Vectorized Hodgkin-Huxley model for a population of independent neurons.
+
+    State and parameters are stored as contiguous arrays of shape (N,) so that all
+    neurons are advanced by a single vectorized step, which updates the state arrays in
+    place. Each step reproduces HodgkinHuxleyNeuron.update for every neuron, with the
+    closed-form rates of rate_tables, which have no 0/0 singularity at V = -40 and -55 mV.
+    """
+    def __init__(self, n_neurons, C_m=1.0, E_Na=50, E_K=-77, E_L=-54.387, g_Na=120, g_K=36, g_L=0.3,
+                 V_init=-65.0, rate_table=None, gating='euler', voltage='euler'):
+        """
+        Parameters:
+        - n_neurons: Number of neurons in the population.
+        - C_m, E_Na, E_K, E_L, g_Na, g_K, g_L: Scalars shared by all neurons or arrays of shape (N,)
+          holding per-neuron values, with the same units as HodgkinHuxleyNeuron.
+        - V_init: Initial membrane potential (mV), scalar or array of shape (N,).
+        - rate_table: Optional RateTable with the HH_RATE_NAMES entries, e.g. get_rate_table('hodgkin_huxley').
+          When given, rates are interpolated from it instead of evaluated in closed form.
+        - gating: Gating update scheme, 'euler' or 'exponential' (Rush-Larsen).
+        - voltage: Membrane potential update scheme, 'euler', 'semi_implicit' or 'crank_nicolson'
+          (see HodgkinHuxleyNeuron).
+        """
+        self.n_neurons = int(n_neurons)
+
+        self.C_m = self._as_array(C_m)
+        self.E_Na = self._as_array(E_Na)
+        self.E_K = self._as_array(E_K)
+        self.E_L = self._as_array(E_L)
+        self.g_Na = self._as_array(g_Na)
+        self.g_K = self._as_array(g_K)
+        self.g_L = self._as_array(g_L)
+
+        self.V_m = self._as_array(V_init)
+        self.rate_table = rate_table
+        _check_schemes(gating, voltage)
+        self.gating = gating
+        self.voltage = voltage
+
+        # Gating variables start at their steady state for the initial potential
+        self.m = self.m_inf()
+        self.h = self.h_inf()
+        self.n = self.n_inf()
+
+    def _as_array(self, value):
+        """Broadcast a scalar or per-neuron value to a contiguous float array of shape (N,)."""
+        return np.ascontiguousarray(np.broadcast_to(np.asarray(value, dtype=np.float64), (self.n_neurons,)).copy())
+
+    def alpha_m(self, V):
+        """Sodium channel (activation) rate constant."""
+        return rate_tables.alpha_m(V)
+
+    def beta_m(self, V):
+        """Sodium channel (activation) rate constant."""
+        return rate_tables.beta_m(V)
+
+    def alpha_h(self, V):
+        """Sodium channel (inactivation) rate constant."""
+        return rate_tables.alpha_h(V)
+
+    def beta_h(self, V):
+        """Sodium channel (inactivation) rate constant."""
+        return rate_tables.beta_h(V)
+
+    def alpha_n(self, V):
+        """Potassium channel (activation) rate constant."""
+        return rate_tables.alpha_n(V)
+
+    def beta_n(self, V):
+        """Potassium channel (activation) rate constant."""
+        return rate_tables.beta_n(V)
+
+    def m_inf(self):
+        """Steady-state value of activation gating variable m for every neuron."""
+        a, b = self.alpha_m(self.V_m), self.beta_m(self.V_m)
+        return a / (a + b)
+
+    def h_inf(self):
+        """Steady-state value of inactivation gating variable h for every neuron."""
+        a, b = self.alpha_h(self.V_m), self.beta_h(self.V_m)
+        return a / (a + b)
+
+    def n_inf(self):
+        """Steady-state value of activation gating variable n for every neuron."""
+        a, b = self.alpha_n(self.V_m), self.beta_n(self.V_m)
+        return a / (a + b)
+
+    def rates(self, V):
+        """Return (alpha_m, beta_m, alpha_h, beta_h, alpha_n, beta_n) at potentials V."""
+        if self.rate_table is not None:
+            return self.rate_table.evaluate(V, HH_RATE_NAMES)
+        return (self.alpha_m(V), self.beta_m(V), self.alpha_h(V),
+                self.beta_h(V), self.alpha_n(V), self.beta_n(V))
+
+    def update(self, I_ext, dt):
+        """Advance all neurons by one time step.
+
+        Parameters:
+        - I_ext: External current (uA/cm^2), scalar or array of shape (N,).
+        - dt: Time step for integration (in milliseconds).
+        """
+        _hh_step(self, I_ext, dt, out=(self.V_m, self.m, self.h, self.n))
+
+    def get_state(self):
+        """
+        Returns the current state of the population.
+
+        Returns:
+        - V_m, m, h, n: Arrays of shape (N,); they are the state itself, updated in place by update,
+          so copy them to keep a snapshot.
+        """
+        return self.V_m, self.m, self.h, self.n
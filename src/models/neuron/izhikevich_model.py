@@ -1,9 +1,24 @@
 # src/models/neuron/izhikevich_model.py
 
+import numpy as np
+from scipy import sparse
+from state_history import StateHistory
+
+# Parameters (a, b, c, d) of the cortical and thalamic cell classes in Izhikevich (2003)
+NEURON_TYPES = {
+    'RS': (0.02, 0.2, -65, 8),      # Regular spiking
+    'IB': (0.02, 0.2, -55, 4),      # Intrinsically bursting
+    'CH': (0.02, 0.2, -50, 2),      # Chattering
+    'FS': (0.1, 0.2, -65, 2),       # Fast spiking
+    'LTS': (0.02, 0.25, -65, 2),    # Low-threshold spiking
+    'TC': (0.02, 0.25, -65, 0.05),  # Thalamo-cortical
+    'RZ': (0.1, 0.26, -65, 2),      # Resonator
+}
+
 class IzhikevichModel:
     """Implementation of the Izhikevich neuron model."""
     
-    def __init__(self, a=0.02, b=0.2, c=-65, d=8, I_ext=5):
+    def __init__(self, a=0.02, b=0.2, c=-65, d=8, I_ext=5, history='off', history_length=None):
         """
         Initializes the Izhikevich neuron model with default parameters.
         
@@ -13,6 +28,8 @@ class IzhikevichModel:
         - c: The after-spike reset value of the membrane potential.
         - d: After-spike reset of the recovery variable.
         - I_ext: External current applied to the neuron (stimulus).
+        - history: How the state history is kept: 'full', 'ring' (last history_length samples) or 'off'.
+        - history_length: Number of samples kept in 'ring' mode.
         """
         self.a = a
         self.b = b
@@ -23,6 +40,8 @@ class IzhikevichModel:
         # Initial values
         self.v = c  # Membrane potential
         self.u = b * c  # Recovery variable
+        self.history = StateHistory(('v', 'u'), mode=history, maxlen=history_length)
+        self.history.append(self.v, self.u)
 
     def update(self, dt):
         """
@@ -43,6 +62,7 @@ class IzhikevichModel:
             # Euler integration
             self.v += dv_dt * dt
             self.u += du_dt * dt
+        self.history.append(self.v, self.u)
 
     def get_state(self):
         """
@@ -53,3 +73,139 @@ class IzhikevichModel:
         - u: Current recovery variable.
         """
         return self.v, self.u
+
+
+class IzhikevichPopulation:
+    """Vectorized Izhikevich model for a population of coupled neurons.
+
+    State and parameters are arrays of shape (N,). Every step first resets the neurons that reached the
+    spike peak and delivers their synaptic input, then advances the remaining neurons with the same Euler
+    update as IzhikevichModel, so an uncoupled population reproduces the scalar model.
+    """
+
+    def __init__(self, n_neurons, a=0.02, b=0.2, c=-65, d=8, I_ext=0.0, weights=None, v_peak=30):
+        """
+        Parameters:
+        - n_neurons: Number of neurons in the population.
+        - a, b, c, d: Model parameters (see IzhikevichModel), scalars or arrays of shape (N,).
+        - I_ext: External current, scalar or array of shape (N,).
+        - weights: Optional synaptic weight matrix of shape (N, N) with weights[post, pre], as a SciPy
+          sparse matrix (CSR or any other format) or a dense array.
+        - v_peak: Spike cutoff of the membrane potential (mV).
+        """
+        self.n_neurons = int(n_neurons)
+        self.a = self._as_array(a)
+        self.b = self._as_array(b)
+        self.c = self._as_array(c)
+        self.d = self._as_array(d)
+        self.I_ext = self._as_array(I_ext)
+        self.v_peak = v_peak
+
+        # Initial values
+        self.v = self.c.copy()  # Membrane potential
+        self.u = self.b * self.c  # Recovery variable
+        self.fired = np.zeros(self.n_neurons, dtype=bool)
+        self.I_syn = np.zeros(self.n_neurons)
+        self.set_weights(weights)
+
+    @classmethod
+    def from_types(cls, types, **kwargs):
+        """
+        Build a population from a cell class per neuron.
+
+        Parameters:
+        - types: Sequence of keys of NEURON_TYPES, one per neuron, e.g. ['RS'] * 800 + ['FS'] * 200.
+        - kwargs: Further arguments of IzhikevichPopulation (I_ext, weights, v_peak).
+
+        Returns:
+        - population: IzhikevichPopulation with the a, b, c, d of each neuron's class.
+        """
+        params = np.array([NEURON_TYPES[name] for name in types], dtype=np.float64)
+        return cls(len(params), a=params[:, 0], b=params[:, 1], c=params[:, 2], d=params[:, 3], **kwargs)
+
+    def _as_array(self, value):
+        """Broadcast a scalar or per-neuron value to a float array of shape (N,)."""
+        return np.broadcast_to(np.asarray(value, dtype=np.float64), (self.n_neurons,)).copy()
+
+    def set_weights(self, weights):
+        """
+        Set the synaptic weight matrix.
+
+        The matrix is stored transposed in CSR form, so the outgoing synapses of a presynaptic neuron
+        are one contiguous slice and a step only touches the synapses of neurons that fired.
+
+        Parameters:
+        - weights: Matrix of shape (N, N) with weights[post, pre], sparse or dense, or None.
+        """
+        if weights is None:
+            self._indptr = np.zeros(self.n_neurons + 1, dtype=np.int64)
+            self._targets = np.zeros(0, dtype=np.int64)
+            self._weights = np.zeros(0)
+            return
+        outgoing = sparse.csr_matrix(weights).T.tocsr()
+        if outgoing.shape != (self.n_neurons, self.n_neurons):
+            raise ValueError(f"weights must have shape ({self.n_neurons}, {self.n_neurons}).")
+        outgoing.sum_duplicates()
+        self._indptr = outgoing.indptr.astype(np.int64)
+        self._targets = outgoing.indices
+        self._weights = outgoing.data.astype(np.float64)
+
+    def synaptic_input(self, spiking):
+        """
+        Total synaptic input produced by a set of spiking neurons.
+
+        Parameters:
+        - spiking: Indices of the presynaptic neurons that fired.
+
+        Returns:
+        - I_syn: Array of shape (N,) with the summed weights onto every postsynaptic neuron.
+        """
+        starts = self._indptr[spiking]
+        counts = self._indptr[spiking + 1] - starts
+        total = counts.sum()
+        if total == 0:
+            return np.zeros(self.n_neurons)
+        # Positions of all outgoing synapses of the spiking neurons, without a Python loop
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+        positions = offsets + np.arange(total)
+        return np.bincount(self._targets[positions], weights=self._weights[positions], minlength=self.n_neurons)
+
+    def update(self, dt, I_ext=None):
+        """
+        Advance all neurons by one time step.
+
+        Parameters:
+        - dt: Time step for integration (in milliseconds).
+        - I_ext: Optional external current for this step, scalar or array of shape (N,); defaults to self.I_ext.
+
+        Returns:
+        - spiking: Indices of the neurons that fired (were reset) in this step.
+        """
+        v, u = self.v, self.u
+        self.fired = v >= self.v_peak
+        spiking = np.flatnonzero(self.fired)
+        u_spiking = u[spiking] + self.d[spiking]
+
+        # Input from the spikes of the previous step plus the external drive
+        self.I_syn = self.synaptic_input(spiking)
+        I = (self.I_ext if I_ext is None else I_ext) + self.I_syn
+
+        # Izhikevich model equations, Euler integration in place
+        du_dt = self.a * (self.b * v - u)
+        v += (0.04*v**2 + 5*v + 140 - u + I) * dt
+        u += du_dt * dt
+
+        # Spiking neurons are reset instead of integrated
+        v[spiking] = self.c[spiking]
+        u[spiking] = u_spiking
+        return spiking
+
+    def get_state(self):
+        """
+        Returns the current state of the population.
+
+        Returns:
+        - v: Membrane potentials, shape (N,).
+        - u: Recovery variables, shape (N,).
+        """
+        return self.v, self.u
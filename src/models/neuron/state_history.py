@@ -0,0 +1,89 @@
+# src/models/neuron/state_history.py
+
+import numpy as np
+
+class StateHistory:
+    """Preallocated record of a model's state variables over time.
+
+    Samples are written into a preallocated array instead of being appended to growing arrays, so
+    recording a step costs one row assignment. Three modes are supported:
+    - 'full': keep every sample; the buffer doubles in size when it fills up.
+    - 'ring': keep only the last maxlen samples in a fixed-size ring buffer.
+    - 'off': keep nothing; append is a no-op.
+    """
+
+    def __init__(self, names, mode='full', capacity=1024, maxlen=None, shape=(), dtype=np.float64):
+        """
+        Parameters:
+        - names: Names of the recorded variables, e.g. ('v', 'w').
+        - mode: 'full', 'ring' or 'off'.
+        - capacity: Initial number of samples allocated in 'full' mode.
+        - maxlen: Number of samples kept in 'ring' mode.
+        - shape: Shape of one sample of each variable, e.g. (N,) for a population.
+        - dtype: Data type of the samples.
+        """
+        if mode not in ('full', 'ring', 'off'):
+            raise ValueError("Unsupported history mode specified.")
+        if mode == 'ring' and not maxlen:
+            raise ValueError("maxlen is required in 'ring' mode.")
+        self.names = tuple(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.mode = mode
+        self.maxlen = maxlen
+        self.shape = tuple(shape)
+        self._initial_capacity = maxlen if mode == 'ring' else (0 if mode == 'off' else max(int(capacity), 1))
+        self._buffer = np.empty((self._initial_capacity, len(self.names)) + self.shape, dtype=dtype)
+        self._count = 0  # Total number of samples appended
+
+    def append(self, *values):
+        """Record one sample; values are given in the order of names."""
+        if self.mode == 'off':
+            return
+        if self.mode == 'ring':
+            self._buffer[self._count % self.maxlen] = values
+        else:
+            if self._count == len(self._buffer):
+                grown = np.empty((2 * len(self._buffer),) + self._buffer.shape[1:], dtype=self._buffer.dtype)
+                grown[:self._count] = self._buffer
+                self._buffer = grown
+            self._buffer[self._count] = values
+        self._count += 1
+
+    def __len__(self):
+        """Number of samples currently stored."""
+        if self.mode == 'ring':
+            return min(self._count, self.maxlen)
+        return 0 if self.mode == 'off' else self._count
+
+    def get(self, name):
+        """Return the stored samples of a variable in chronological order.
+
+        In 'full' mode and in 'ring' mode before wrapping, the result is a view into the buffer.
+
+        Parameters:
+        - name: Name of the variable.
+
+        Returns:
+        - samples: Array of shape (len(self),) + shape.
+        """
+        column = self.index[name]
+        if self.mode == 'ring' and self._count > self.maxlen:
+            start = self._count % self.maxlen
+            return np.concatenate((self._buffer[start:, column], self._buffer[:start, column]))
+        return self._buffer[:len(self), column]
+
+    def __getitem__(self, name):
+        return self.get(name)
+
+    def last(self, name):
+        """Return the most recent sample of a variable."""
+        if len(self) == 0:
+            raise IndexError("The history is empty.")
+        row = (self._count - 1) % self.maxlen if self.mode == 'ring' else self._count - 1
+        return self._buffer[row, self.index[name]]
+
+    def clear(self):
+        """Discard all samples and release any memory grown beyond the initial capacity."""
+        if len(self._buffer) != self._initial_capacity:
+            self._buffer = np.empty((self._initial_capacity,) + self._buffer.shape[1:], dtype=self._buffer.dtype)
+        self._count = 0
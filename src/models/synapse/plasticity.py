@@ -0,0 +1,282 @@
+# src/models/synapse/plasticity.py
+
+import numpy as np
+
+class SpikeTraces:
+    """Exponentially decaying spike traces of a set of neurons, decayed lazily.
+
+    Each neuron stores its trace values and the time they were last brought up to date, so a trace is
+    only touched when the neuron spikes or when a synapse of a spiking partner reads it.
+    """
+
+    def __init__(self, n_neurons, taus):
+        """
+        Parameters:
+        - n_neurons: Number of neurons.
+        - taus: Decay time constants (ms), one per trace.
+        """
+        self.taus = np.asarray(taus, dtype=np.float64)
+        self.values = np.zeros((len(self.taus), n_neurons))
+        self.last_update = np.full(n_neurons, -np.inf)
+
+    def at(self, neurons, t):
+        """Return the traces of the given neurons decayed to time t, shape (n_traces, len(neurons))."""
+        elapsed = t - self.last_update[neurons]
+        # Traces never set are zero; avoid inf * 0 for them
+        decay = np.exp(-np.where(np.isfinite(elapsed), elapsed, 0.0) / self.taus[:, None])
+        return self.values[:, neurons] * decay
+
+    def add_spikes(self, neurons, t):
+        """Decay the traces of the spiking neurons to time t and add one to each of them."""
+        self.values[:, neurons] = self.at(neurons, t) + 1.0
+        self.last_update[neurons] = t
+
+    def reset(self):
+        self.values[:] = 0.0
+        self.last_update[:] = -np.inf
+
+
+class STDPRule:
+    """Base class of trace-based spike-timing-dependent plasticity rules.
+
+    At every presynaptic spike the outgoing synapses of the neuron are updated by on_pre, and at every
+    postsynaptic spike the incoming synapses are updated by on_post; the other synapses are not touched.
+    Both receive the presynaptic and postsynaptic traces of the touched synapses, decayed to the spike
+    time and read before the spikes of the current step are added.
+    """
+
+    pre_taus = ()
+    post_taus = ()
+
+    def __init__(self, w_min=0.0, w_max=1.0):
+        """
+        Parameters:
+        - w_min, w_max: Bounds of the synaptic efficacy.
+        """
+        self.w_min = w_min
+        self.w_max = w_max
+        self.pre_traces = None
+        self.post_traces = None
+
+    def on_pre(self, pre, post):
+        """Weight change of the outgoing synapses of spiking presynaptic neurons."""
+        raise NotImplementedError
+
+    def on_post(self, pre, post):
+        """Weight change of the incoming synapses of spiking postsynaptic neurons."""
+        raise NotImplementedError
+
+    def apply(self, group, pre_spikes, post_spikes, t):
+        """
+        Update the efficacies of a synapse group for the spikes of one step.
+
+        Parameters:
+        - group: SynapseGroup whose efficacies are updated in place.
+        - pre_spikes: Indices of the presynaptic neurons that spiked.
+        - post_spikes: Indices of the postsynaptic neurons that spiked.
+        - t: Time of the spikes (ms).
+        """
+        if self.pre_traces is None:
+            self.pre_traces = SpikeTraces(group.n_pre, self.pre_taus)
+            self.post_traces = SpikeTraces(group.n_post, self.post_taus)
+        pre_spikes = np.asarray(pre_spikes, dtype=np.int64)
+        post_spikes = np.asarray(post_spikes, dtype=np.int64)
+
+        outgoing = group.outgoing(pre_spikes)
+        incoming = group.incoming(post_spikes)
+        depression = self.on_pre(self.pre_traces.at(group.pre[outgoing], t),
+                                 self.post_traces.at(group.post[outgoing], t))
+        potentiation = self.on_post(self.pre_traces.at(group.pre[incoming], t),
+                                    self.post_traces.at(group.post[incoming], t))
+        group.efficacy[outgoing] += depression
+        group.efficacy[incoming] += potentiation
+        touched = np.concatenate((outgoing, incoming))
+        group.efficacy[touched] = np.clip(group.efficacy[touched], self.w_min, self.w_max)
+
+        self.pre_traces.add_spikes(pre_spikes, t)
+        self.post_traces.add_spikes(post_spikes, t)
+
+    def reset(self):
+        """Clear the spike traces."""
+        self.pre_traces = None
+        self.post_traces = None
+
+
+class PairSTDP(STDPRule):
+    """Pair-based STDP with all-to-all spike interactions.
+
+    A presynaptic spike depresses the synapse by a_minus times the postsynaptic trace, and a postsynaptic
+    spike potentiates it by a_plus times the presynaptic trace.
+    """
+
+    def __init__(self, a_plus=0.01, a_minus=0.012, tau_plus=20.0, tau_minus=20.0, w_min=0.0, w_max=1.0):
+        """
+        Parameters:
+        - a_plus, a_minus: Potentiation and depression amplitudes.
+        - tau_plus, tau_minus: Time constants (ms) of the presynaptic and postsynaptic traces.
+        - w_min, w_max: Bounds of the synaptic efficacy.
+        """
+        super().__init__(w_min, w_max)
+        self.a_plus = a_plus
+        self.a_minus = a_minus
+        self.pre_taus = (tau_plus,)
+        self.post_taus = (tau_minus,)
+
+    def on_pre(self, pre, post):
+        return -self.a_minus * post[0]
+
+    def on_post(self, pre, post):
+        return self.a_plus * pre[0]
+
+
+class TripletSTDP(STDPRule):
+    """Triplet STDP rule (Pfister and Gerstner, 2006).
+
+    Each neuron carries a fast and a slow trace. Depression at a presynaptic spike is scaled by the fast
+    postsynaptic trace and grows with the slow presynaptic trace; potentiation at a postsynaptic spike
+    is scaled by the fast presynaptic trace and grows with the slow postsynaptic trace.
+    """
+
+    def __init__(self, a2_plus=5e-3, a3_plus=6.2e-3, a2_minus=7e-3, a3_minus=2.3e-4, tau_plus=16.8,
+                 tau_x=101.0, tau_minus=33.7, tau_y=125.0, w_min=0.0, w_max=1.0):
+        """
+        Parameters:
+        - a2_plus, a3_plus: Pair and triplet potentiation amplitudes.
+        - a2_minus, a3_minus: Pair and triplet depression amplitudes.
+        - tau_plus, tau_x: Time constants (ms) of the fast and slow presynaptic traces.
+        - tau_minus, tau_y: Time constants (ms) of the fast and slow postsynaptic traces.
+        - w_min, w_max: Bounds of the synaptic efficacy.
+        """
+        super().__init__(w_min, w_max)
+        self.a2_plus = a2_plus
+        self.a3_plus = a3_plus
+        self.a2_minus = a2_minus
+        self.a3_minus = a3_minus
+        self.pre_taus = (tau_plus, tau_x)
+        self.post_taus = (tau_minus, tau_y)
+
+    def on_pre(self, pre, post):
+        return -post[0] * (self.a2_minus + self.a3_minus * pre[1])
+
+    def on_post(self, pre, post):
+        return pre[0] * (self.a2_plus + self.a3_plus * post[1])
+
+
+class TsodyksMarkram:
+    """Tsodyks-Markram short-term depression and facilitation.
+
+    Every synapse holds a utilization u and a fraction of available resources x. Between spikes x
+    recovers to one with time constant tau_rec and u decays to zero with time constant tau_facil; at a
+    presynaptic spike u is first facilitated by U * (1 - u), the synapse transmits efficacy * u * x, and
+    x is depleted by u * x. The first spike, and any spike after a long silence, thus uses u = U, and
+    u_n = U + u_{n-1} * (1 - U) * exp(-dt / tau_facil) as in Markram et al. (1998). Since these
+    variables only change at presynaptic spikes, the time since the last spike of each presynaptic
+    neuron is enough to decay them lazily, and only outgoing synapses of spiking neurons are updated.
+    """
+
+    def __init__(self, U=0.5, tau_rec=800.0, tau_facil=0.0):
+        """
+        Parameters:
+        - U: Baseline utilization of synaptic resources.
+        - tau_rec: Recovery time constant (ms) of the resources (depression).
+        - tau_facil: Relaxation time constant (ms) of the utilization (facilitation); 0 disables facilitation.
+        """
+        self.U = U
+        self.tau_rec = tau_rec
+        self.tau_facil = tau_facil
+        self.u = None
+        self.x = None
+        self.last_spike = None
+
+    def release(self, group, spiking, synapses, t):
+        """
+        Advance the state of the outgoing synapses of spiking neurons and return their release scaling.
+
+        Parameters:
+        - group: SynapseGroup the synapses belong to.
+        - spiking: Indices of the presynaptic neurons that spiked.
+        - synapses: Indices of their outgoing synapses, as returned by group.outgoing(spiking).
+        - t: Time of the spikes (ms).
+
+        Returns:
+        - scale: Array of shape (len(synapses),) with u * x of each synapse.
+        """
+        if self.u is None:
+            self.u = np.zeros(len(group))
+            self.x = np.ones(len(group))
+            self.last_spike = np.full(group.n_pre, -np.inf)
+        elapsed = t - self.last_spike[group.pre[synapses]]
+        self.last_spike[spiking] = t
+
+        x = 1.0 - (1.0 - self.x[synapses]) * np.exp(-elapsed / self.tau_rec)
+        if self.tau_facil > 0:
+            u = self.u[synapses] * np.exp(-elapsed / self.tau_facil)
+            u += self.U * (1.0 - u)
+        else:
+            u = np.full(len(synapses), float(self.U))
+        scale = u * x
+        self.u[synapses] = u
+        self.x[synapses] = x - scale
+        return scale
+
+    def reset(self):
+        """Return all synapses to their resting state."""
+        self.u = None
+        self.x = None
+        self.last_spike = None
+
+
+class WeightSnapshots:
+    """Record of synaptic efficacies sampled every interval updates.
+
+    Snapshots are written into a preallocated buffer that doubles when full, so recording costs one
+    row copy every interval steps and nothing in between.
+    """
+
+    def __init__(self, interval=100, synapses=None, capacity=64):
+        """
+        Parameters:
+        - interval: Number of updates between snapshots.
+        - synapses: Optional indices of the synapses to record; all synapses by default.
+        - capacity: Initial number of snapshots allocated.
+        """
+        self.interval = int(interval)
+        self.synapses = None if synapses is None else np.asarray(synapses, dtype=np.int64)
+        self.capacity = max(int(capacity), 1)
+        self._buffer = None
+        self._times = np.empty(self.capacity)
+        self._count = 0
+        self._n_updates = 0
+
+    def record(self, t, efficacy):
+        """Take a snapshot of efficacy if this update falls on the recording interval."""
+        due = self._n_updates % self.interval == 0
+        self._n_updates += 1
+        if not due:
+            return
+        weights = efficacy if self.synapses is None else efficacy[self.synapses]
+        if self._buffer is None:
+            self._buffer = np.empty((self.capacity, len(weights)))
+        if self._count == len(self._buffer):
+            self._buffer = np.concatenate((self._buffer, np.empty_like(self._buffer)))
+            self._times = np.concatenate((self._times, np.empty_like(self._times)))
+        self._buffer[self._count] = weights
+        self._times[self._count] = t
+        self._count += 1
+
+    @property
+    def times(self):
+        """Times of the snapshots."""
+        return self._times[:self._count]
+
+    @property
+    def weights(self):
+        """Recorded efficacies, shape (n_synapses, n_snapshots), one row per synapse."""
+        if self._buffer is None:
+            return np.empty((0, 0))
+        return self._buffer[:self._count].T
+
+    def clear(self):
+        self._buffer = None
+        self._count = 0
+        self._n_updates = 0
@@ -1,8 +1,13 @@
 # src/models/synapse/synapse_model.py
 
+import numpy as np
+
+# Sign of the postsynaptic effect of each neurotransmitter
+NEUROTRANSMITTER_SIGN = {'glutamate': 1.0, 'acetylcholine': 1.0, 'gaba': -1.0, 'glycine': -1.0}
+
 class Synapse:
     """Generic model of a neural synapse."""
-    def __init__(self, pre_neuron, post_neuron, efficacy=0.05, neurotransmitter='glutamate'):
+    def __init__(self, pre_neuron, post_neuron, efficacy=0.05, neurotransmitter='glutamate', plasticity=()):
         self.pre_neuron = pre_neuron  # Neuron sending the signal
         self.post_neuron = post_neuron  # Neuron receiving the signal
         self.efficacy = efficacy  # Strength of the synaptic connection
@@ -11,6 +16,10 @@ class Synapse:
         # Synaptic dynamics parameters, placeholder values
         self.release_probability = 0.5  # Probability of neurotransmitter release upon action potential
 
+        # Long-term plasticity rules of this synapse (e.g. PairSTDP); each synapse needs its own instances
+        self.plasticity = tuple(plasticity)
+        self._group = None
+
     def transmit(self):
         """Simulate the transmission of a signal from the presynaptic to the postsynaptic neuron."""
         if self.pre_neuron.fires_action_potential():
@@ -19,8 +28,198 @@ class Synapse:
                 # Update postsynaptic neuron's potential based on the efficacy of the synapse
                 self.post_neuron.receive_signal(self.efficacy, self.neurotransmitter)
                 
-    def update_synaptic_parameters(self):
-        """Update parameters governing synaptic transmission, placeholder for dynamic synaptic changes."""
-        # This method can be expanded to include mechanisms like short-term plasticity, long-term potentiation (LTP),
-        # or long-term depression (LTD) based on activity patterns and other factors.
-        pass
+    def update_synaptic_parameters(self, pre_spiked, post_spiked, t):
+        """
+        Apply the plasticity rules of the synapse for one step.
+
+        The synapse is run as a SynapseGroup of one synapse, so it follows the same rules as whole networks;
+        networks of many synapses should use SynapseGroup.from_synapses instead of one update per synapse.
+
+        Parameters:
+        - pre_spiked, post_spiked: Whether the presynaptic and postsynaptic neurons spiked in this step.
+        - t: Time of the step (ms).
+        """
+        if self._group is None:
+            self._group = SynapseGroup([0], [0], 1, 1, plasticity=self.plasticity)
+        self._group.efficacy[0] = self.efficacy
+        self._group.update_synaptic_parameters([0] if pre_spiked else [], [0] if post_spiked else [], t)
+        self.efficacy = float(self._group.efficacy[0])
+
+
+def _csr_positions(indptr, rows):
+    """Positions of all entries of the given CSR rows, concatenated in row order."""
+    starts = indptr[rows]
+    counts = indptr[rows + 1] - starts
+    total = counts.sum()
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return offsets + np.arange(total)
+
+class SynapseGroup:
+    """Population of synapses stored as columnar arrays in CSR order.
+
+    Synapses are sorted by presynaptic neuron, so the outgoing synapses of a neuron form one contiguous
+    slice given by indptr. Spikes are delivered through a ring buffer with one row per delay step, and the
+    work done per step depends on the synapses of the neurons that spiked, not on the size of the group.
+
+    Each simulation step calls deliver() to obtain the input arriving at the postsynaptic neurons, advances
+    the neurons, passes the indices of the neurons that spiked to propagate() and, with plasticity, to
+    update_synaptic_parameters().
+    """
+
+    def __init__(self, pre, post, n_pre, n_post, efficacy=0.05, neurotransmitter='glutamate',
+                 release_probability=0.5, delay=1, seed=None, plasticity=(), short_term=None, snapshots=None):
+        """
+        Parameters:
+        - pre, post: Arrays of shape (S,) with the presynaptic and postsynaptic neuron index of each synapse.
+        - n_pre, n_post: Number of presynaptic and postsynaptic neurons.
+        - efficacy: Strength of each synapse, scalar or array of shape (S,).
+        - neurotransmitter: Name of the neurotransmitter (a key of NEUROTRANSMITTER_SIGN), or one name per synapse.
+        - release_probability: Probability of release upon a presynaptic spike, scalar or array of shape (S,).
+        - delay: Transmission delay in simulation steps (at least 1), scalar or array of shape (S,).
+        - seed: Seed of the random generator used for stochastic release.
+        - plasticity: Long-term plasticity rules (e.g. PairSTDP, TripletSTDP) applied by update_synaptic_parameters.
+        - short_term: Optional short-term plasticity rule (e.g. TsodyksMarkram) scaling the transmitted efficacies.
+        - snapshots: Optional WeightSnapshots recording the efficacies in update_synaptic_parameters.
+        """
+        pre = np.asarray(pre, dtype=np.int64)
+        post = np.asarray(post, dtype=np.int64)
+        n_synapses = len(pre)
+        self.n_pre = int(n_pre)
+        self.n_post = int(n_post)
+
+        order = np.lexsort((post, pre))
+        self.pre = pre[order]
+        self.post = post[order]
+        self.efficacy = np.broadcast_to(np.asarray(efficacy, dtype=np.float64), (n_synapses,))[order]
+        self.release_probability = np.broadcast_to(
+            np.asarray(release_probability, dtype=np.float64), (n_synapses,))[order]
+        self.delay = np.broadcast_to(np.asarray(delay, dtype=np.int64), (n_synapses,))[order]
+        if n_synapses and self.delay.min() < 1:
+            raise ValueError("Synaptic delays must be at least one step.")
+
+        names = np.broadcast_to(np.asarray(neurotransmitter), (n_synapses,))[order]
+        self.neurotransmitters, codes = np.unique(names, return_inverse=True)
+        unknown = set(self.neurotransmitters) - set(NEUROTRANSMITTER_SIGN)
+        if unknown:
+            raise ValueError(f"Unknown neurotransmitter(s): {', '.join(sorted(unknown))}.")
+        self.neurotransmitter_code = codes.astype(np.uint8)
+        self._signs = np.array([NEUROTRANSMITTER_SIGN[name] for name in self.neurotransmitters])
+
+        # Row pointers of the CSR layout: synapses of presynaptic neuron i are indptr[i]:indptr[i + 1]
+        self.indptr = np.searchsorted(self.pre, np.arange(self.n_pre + 1))
+
+        self.rng = np.random.default_rng(seed)
+        max_delay = int(self.delay.max()) if n_synapses else 1
+        self._ring = np.zeros((max_delay, self.n_post))
+        self._cursor = 0
+
+        self.plasticity = tuple(plasticity)
+        self.short_term = short_term
+        self.snapshots = snapshots
+        self._post_order = None
+        self._post_indptr = None
+
+    @classmethod
+    def from_synapses(cls, synapses, neuron_index, n_neurons=None, delay=1, seed=None):
+        """
+        Build a group from individual Synapse objects.
+
+        Parameters:
+        - synapses: Iterable of Synapse objects.
+        - neuron_index: Mapping from neuron objects to their integer index.
+        - n_neurons: Number of neurons; defaults to len(neuron_index).
+        - delay: Transmission delay in steps, scalar or one per synapse.
+        - seed: Seed of the random generator used for stochastic release.
+
+        Returns:
+        - group: SynapseGroup with the connections, efficacies, neurotransmitters and release probabilities.
+        """
+        synapses = list(synapses)
+        n_neurons = len(neuron_index) if n_neurons is None else n_neurons
+        return cls([neuron_index[s.pre_neuron] for s in synapses],
+                   [neuron_index[s.post_neuron] for s in synapses],
+                   n_neurons, n_neurons,
+                   efficacy=[s.efficacy for s in synapses],
+                   neurotransmitter=[s.neurotransmitter for s in synapses],
+                   release_probability=[s.release_probability for s in synapses],
+                   delay=delay, seed=seed)
+
+    def __len__(self):
+        return len(self.pre)
+
+    def outgoing(self, spiking):
+        """Indices of the synapses whose presynaptic neuron is in spiking."""
+        return _csr_positions(self.indptr, np.asarray(spiking, dtype=np.int64))
+
+    def incoming(self, spiking):
+        """Indices of the synapses whose postsynaptic neuron is in spiking."""
+        if self._post_order is None:
+            # Post-major view of the synapses, built on first use
+            self._post_order = np.argsort(self.post, kind='stable')
+            self._post_indptr = np.searchsorted(self.post[self._post_order], np.arange(self.n_post + 1))
+        return self._post_order[_csr_positions(self._post_indptr, np.asarray(spiking, dtype=np.int64))]
+
+    def propagate(self, spiking, t=None):
+        """
+        Schedule the transmission of the spikes emitted in the current step.
+
+        Release is drawn independently for every outgoing synapse of the spiking neurons; released
+        synapses add their signed efficacy, scaled by the short-term plasticity rule if any, to the delay slot
+        of their postsynaptic neuron.
+
+        Parameters:
+        - spiking: Indices of the presynaptic neurons that spiked.
+        - t: Time of the spikes (ms), required with short-term plasticity.
+        """
+        synapses = self.outgoing(spiking)
+        if len(synapses) == 0:
+            return
+        efficacy = self.efficacy[synapses]
+        if self.short_term is not None:
+            if t is None:
+                raise ValueError("The spike time t is required with short-term plasticity.")
+            efficacy = efficacy * self.short_term.release(self, spiking, synapses, t)
+        draw = self.rng.random(len(synapses)) < self.release_probability[synapses]
+        released = synapses[draw]
+        amplitude = efficacy[draw] * self._signs[self.neurotransmitter_code[released]]
+        # The slot under the cursor is delivered by the next call to deliver()
+        slots = (self._cursor + self.delay[released] - 1) % len(self._ring)
+        np.add.at(self._ring, (slots, self.post[released]), amplitude)
+
+    def deliver(self):
+        """
+        Return the synaptic input arriving in this step and advance the delay buffer.
+
+        Returns:
+        - I_syn: Array of shape (n_post,) with the summed signed efficacies arriving now.
+        """
+        arriving = self._ring[self._cursor].copy()
+        self._ring[self._cursor] = 0.0
+        self._cursor = (self._cursor + 1) % len(self._ring)
+        return arriving
+
+    def update_synaptic_parameters(self, pre_spikes, post_spikes, t):
+        """
+        Apply the long-term plasticity rules for the spikes of one step and record weight snapshots.
+
+        Only the outgoing synapses of spiking presynaptic neurons and the incoming synapses of spiking
+        postsynaptic neurons are updated.
+
+        Parameters:
+        - pre_spikes: Indices of the presynaptic neurons that spiked.
+        - post_spikes: Indices of the postsynaptic neurons that spiked.
+        - t: Time of the spikes (ms).
+        """
+        for rule in self.plasticity:
+            rule.apply(self, pre_spikes, post_spikes, t)
+        if self.snapshots is not None:
+            self.snapshots.record(t, self.efficacy)
+
+    def reset(self):
+        """Discard all spikes in transit and the state of the short-term plasticity rule."""
+        self._ring[:] = 0.0
+        self._cursor = 0
+        if self.short_term is not None:
+            self.short_term.reset()
@@ -1,5 +1,7 @@
 # src/stimulus/base_stimulus.py
 
+from stimulus_expression import Sampled
+
 class BaseStimulus:
     """Base class for all types of stimuli in neural simulations."""
     
@@ -13,7 +15,30 @@ class BaseStimulus:
         """
         self.duration = duration
         self.amplitude = amplitude
-        self.signal = self.generate_stimulus()
+        self._signal = None
+
+    @property
+    def signal(self):
+        """The stimulus signal, generated on first access and kept."""
+        if self._signal is None:
+            self._signal = self.generate_stimulus()
+        return self._signal
+
+    @signal.setter
+    def signal(self, value):
+        self._signal = value
+
+    def expression(self):
+        """
+        Returns the stimulus as a StimulusExpression, to be evaluated one chunk at a time.
+
+        Subclasses override this to build the stimulus lazily; by default the generated signal is
+        wrapped, one sample per millisecond.
+
+        Returns:
+        A StimulusExpression of time (in milliseconds).
+        """
+        return Sampled(self.signal, 1.0)
 
     def generate_stimulus(self):
         """
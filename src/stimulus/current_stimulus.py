@@ -1,6 +1,8 @@
 # src/stimulus/current_stimulus.py
 import numpy as np
 from base_stimulus import BaseStimulus
+from event_stimulus import PiecewiseConstantStimulus
+from stimulus_expression import Constant
 
 class CurrentStimulus(BaseStimulus):
     """A class for generating current injection stimuli for neural simulations."""
@@ -27,9 +29,25 @@ class CurrentStimulus(BaseStimulus):
         """
         end_time = self.start_time + self.duration
         # The signal is a constant value equal to the amplitude throughout the stimulus duration
-        signal = np.array([self.amplitude for _ in range(self.start_time, end_time)])
+        signal = np.full(len(range(self.start_time, end_time)), self.amplitude)
         return self.start_time, end_time, signal
 
+    def expression(self):
+        """
+        Returns the stimulus as a StimulusExpression: the amplitude during [start_time, start_time + duration).
+
+        Overrides the BaseStimulus.expression method.
+        """
+        return Constant(self.amplitude).window(self.start_time, self.start_time + self.duration)
+
+    def as_events(self):
+        """
+        Returns the stimulus as a PiecewiseConstantStimulus with two breakpoints, the start and the end.
+
+        Its cursor and breakpoints serve integrators directly, without a sampled signal.
+        """
+        return PiecewiseConstantStimulus.from_pulses([self.start_time], [self.duration], [self.amplitude])
+
     def apply_to_neuron(self, neuron):
         """
         Applies the current stimulus to a neuron.
@@ -39,6 +57,6 @@ class CurrentStimulus(BaseStimulus):
         Parameters:
         - neuron: The neuron object to which the stimulus will be applied.
         """
-        start_time, end_time, signal = self.generate_stimulus()
+        start_time, end_time, signal = self.signal
         # Assuming the neuron object has a method to receive current input
         neuron.receive_current(start_time, end_time, signal)
@@ -0,0 +1,169 @@
+# src/stimulus/event_stimulus.py
+
+import numpy as np
+from stimulus_expression import StimulusExpression
+
+class PiecewiseConstantStimulus(StimulusExpression):
+    """A stimulus that only changes at breakpoints, stored as sorted (time, new_value) events.
+
+    Between breakpoints the value is constant, so a protocol of K steps or pulses costs K events
+    whatever its duration and time step. A breakpoint at time t sets the value from t on (the value is
+    right-continuous). With neurons given, each event sets the value of one neuron only, so pulses
+    delivered to different neurons of a population at different times are stored as events as well.
+
+    Integrators query the value through a cursor (see cursor), which moves forward over the events in
+    O(1) amortized time per query, and adaptive solvers take the breakpoints as forced step boundaries
+    (the tstops parameter of dormand_prince and bdf).
+    """
+
+    def __init__(self, times, values, neurons=None, n_neurons=None, initial=0.0):
+        """
+        Parameters:
+        - times: Times of the breakpoints (in milliseconds), in any order; equal times apply in the given order.
+        - values: Value set at each breakpoint.
+        - neurons: Optional neuron index of each breakpoint, for a population stimulus.
+        - n_neurons: Number of neurons of a population stimulus.
+        - initial: Value before the first breakpoint (of every neuron).
+        """
+        times = np.asarray(times, dtype=np.float64).ravel()
+        order = np.argsort(times, kind='stable')
+        self.times = times[order]
+        self.values = np.broadcast_to(np.asarray(values, dtype=np.float64), times.shape)[order]
+        if neurons is None:
+            self.neurons = None
+            self.n_neurons = None
+        else:
+            if n_neurons is None:
+                raise ValueError("n_neurons must be given with neurons.")
+            self.neurons = np.asarray(neurons, dtype=np.int64).ravel()[order]
+            self.n_neurons = int(n_neurons)
+        self.initial = float(initial)
+
+    @classmethod
+    def from_pulses(cls, starts, durations, amplitudes, neurons=None, n_neurons=None, baseline=0.0):
+        """
+        Builds a stimulus from rectangular pulses.
+
+        Each pulse sets the value to its amplitude at its start and back to baseline at its end; a pulse
+        starting when another one ends takes over from it. Pulses of the same neuron must not overlap.
+
+        Parameters:
+        - starts, durations: Start times and durations of the pulses (in milliseconds).
+        - amplitudes: Amplitude of each pulse (or one for all).
+        - neurons, n_neurons: Optional neuron of each pulse and number of neurons, for a population.
+        - baseline: Value outside the pulses.
+
+        Returns:
+        A PiecewiseConstantStimulus with two breakpoints per pulse.
+        """
+        starts = np.asarray(starts, dtype=np.float64).ravel()
+        ends = starts + np.broadcast_to(np.asarray(durations, dtype=np.float64), starts.shape)
+        amplitudes = np.broadcast_to(np.asarray(amplitudes, dtype=np.float64), starts.shape)
+        # Ends come first, so at equal times the starting pulse wins
+        times = np.concatenate((ends, starts))
+        values = np.concatenate((np.full(len(ends), float(baseline)), amplitudes))
+        if neurons is not None:
+            neurons = np.tile(np.broadcast_to(np.asarray(neurons, dtype=np.int64), starts.shape), 2)
+        return cls(times, values, neurons, n_neurons, baseline)
+
+    def __len__(self):
+        """Number of breakpoints."""
+        return len(self.times)
+
+    def value_at(self, t):
+        """
+        Returns the value at time t, by binary search over the breakpoints.
+
+        For a population stimulus, the values of all neurons are rebuilt from the events up to t; use a
+        cursor to follow a simulation.
+        """
+        stop = np.searchsorted(self.times, t, side='right')
+        if self.neurons is None:
+            return self.values[stop - 1] if stop else self.initial
+        current = np.full(self.n_neurons, self.initial)
+        _apply_events(current, self.neurons[:stop], self.values[:stop])
+        return current
+
+    def breakpoints_between(self, t0, t1):
+        """
+        Returns the distinct breakpoint times in (t0, t1), e.g. as tstops of an adaptive solver.
+        """
+        a, b = np.searchsorted(self.times, [t0, t1], side='right')
+        times = self.times[a:b]
+        times = times[times < t1]
+        return times[np.r_[True, times[1:] != times[:-1]]] if len(times) else times
+
+    def next_breakpoint(self, t):
+        """Returns the first breakpoint time after t, or inf."""
+        i = np.searchsorted(self.times, t, side='right')
+        return self.times[i] if i < len(self.times) else np.inf
+
+    def cursor(self):
+        """Returns a StimulusCursor over the breakpoints, starting before the first one."""
+        return StimulusCursor(self)
+
+    def _at(self, indices, dt):
+        if self.neurons is not None:
+            raise ValueError("Unsupported evaluation of a population stimulus; use a cursor.")
+        if not len(self.times):
+            return np.full(len(indices), self.initial)
+        stop = np.searchsorted(self.times, indices * dt, side='right')
+        return np.where(stop > 0, self.values[np.maximum(stop - 1, 0)], self.initial)
+
+def _apply_events(current, neurons, values):
+    """Set current[neurons[i]] = values[i] in order, so that the last event of each neuron wins."""
+    if len(neurons) == 1:
+        current[neurons[0]] = values[0]
+    elif len(neurons):
+        reversed_neurons = neurons[::-1]
+        unique, last = np.unique(reversed_neurons, return_index=True)
+        current[unique] = values[::-1][last]
+
+class StimulusCursor:
+    """Position in the breakpoints of a PiecewiseConstantStimulus, for queries at non-decreasing times.
+
+    A query checks the next breakpoint and only applies the events passed since the previous query, so a
+    simulation querying every step pays O(1) amortized per step whatever the number of breakpoints.
+    Queries may go back in time without cost as long as no breakpoint is crossed backwards (as when an
+    adaptive solver retries a rejected step); otherwise the cursor is rebuilt from the start.
+    """
+
+    def __init__(self, stimulus):
+        """
+        Parameters:
+        - stimulus: The PiecewiseConstantStimulus followed.
+        """
+        self.stimulus = stimulus
+        self.reset()
+
+    def reset(self):
+        """Moves the cursor back before the first breakpoint."""
+        self._index = 0
+        if self.stimulus.neurons is None:
+            self.current = self.stimulus.initial
+        else:
+            self.current = np.full(self.stimulus.n_neurons, self.stimulus.initial)
+
+    def value(self, t):
+        """
+        Returns the value at time t.
+
+        For a population stimulus this is the cursor's own (N,) array of the values of all neurons,
+        updated in place by later queries; copy it to keep it.
+        """
+        times = self.stimulus.times
+        if self._index and t < times[self._index - 1]:
+            if self.stimulus.neurons is None:
+                self._index = np.searchsorted(times, t, side='right')
+                self.current = self.stimulus.values[self._index - 1] if self._index else self.stimulus.initial
+                return self.current
+            self.reset()
+        if self._index < len(times) and times[self._index] <= t:
+            stop = self._index + np.searchsorted(times[self._index:], t, side='right')
+            if self.stimulus.neurons is None:
+                self.current = self.stimulus.values[stop - 1]
+            else:
+                _apply_events(self.current, self.stimulus.neurons[self._index:stop],
+                              self.stimulus.values[self._index:stop])
+            self._index = stop
+        return self.current
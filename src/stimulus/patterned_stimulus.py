@@ -1,6 +1,7 @@
 # src/stimulus/patterned_stimulus.py
 import numpy as np
 from base_stimulus import BaseStimulus
+from stimulus_expression import Noise, Sine, TimeFunction
 
 class PatternedStimulus(BaseStimulus):
     """A class for generating patterned stimuli for neural simulations."""
@@ -22,25 +23,36 @@ class PatternedStimulus(BaseStimulus):
     def generate_stimulus(self):
         """Generates a patterned stimulus signal based on specified parameters.
 
-        Overrides the BaseStimulus.generate_stimulus method.
+        Overrides the BaseStimulus.generate_stimulus method. The signal has one sample per millisecond; the
+        'burst' and 'oscillatory' patterns are those of expression() evaluated with dt = 1 ms.
 
         Returns:
         A numpy array representing the stimulus signal over time.
         """
-        time = np.linspace(0, self.duration / 1000, num=int(self.duration))
+        if self.pattern_type == 'random':
+            # Generate a random pattern
+            np.random.seed(42)  # For reproducibility
+            return np.random.normal(loc=0, scale=self.amplitude, size=int(self.duration))
+        return self.expression().evaluate(0, int(self.duration), 1.0)
+
+    def expression(self):
+        """
+        Returns the pattern as a StimulusExpression over [0, duration), to be evaluated one chunk at a time.
+
+        Overrides the BaseStimulus.expression method. Evaluated with dt = 1 ms, the 'burst' and 'oscillatory'
+        patterns give the samples of generate_stimulus. The 'random' pattern is block-seeded noise, so it
+        does not depend on the chunks evaluated, but its values differ from those of generate_stimulus.
+        """
         if self.pattern_type == 'burst':
-            # Generate a burst pattern
-            signal = self.amplitude * (np.sin(2 * np.pi * self.frequency * time) > 0).astype(int)
+            frequency, amplitude = self.frequency, self.amplitude
+            pattern = TimeFunction(lambda t: amplitude * (np.sin(2 * np.pi * frequency * t / 1000) > 0))
         elif self.pattern_type == 'oscillatory':
-            # Generate an oscillatory pattern
-            signal = self.amplitude * np.sin(2 * np.pi * self.frequency * time)
+            pattern = Sine(self.amplitude, self.frequency)
         elif self.pattern_type == 'random':
-            # Generate a random pattern
-            np.random.seed(42)  # For reproducibility
-            signal = np.random.normal(loc=0, scale=self.amplitude, size=time.shape)
+            pattern = Noise(0, self.amplitude, seed=42)
         else:
             raise ValueError("Unsupported pattern type specified.")
-        return signal
+        return pattern.window(0, self.duration)
 
     def apply_to_neuron(self, neuron):
         """
@@ -51,6 +63,6 @@ class PatternedStimulus(BaseStimulus):
         Parameters:
         - neuron: The neuron object to which the stimulus will be applied.
         """
-        signal = self.generate_stimulus()
+        signal = self.signal
         # Assuming the neuron object has a method to receive complex input
         neuron.receive_complex_input(signal)
@@ -0,0 +1,276 @@
+# src/stimulus/stimulus_expression.py
+
+from collections import OrderedDict
+
+import numpy as np
+
+# Number of samples of noise drawn from each seeded block
+NOISE_BLOCK = 4096
+
+def _first_sample(t, dt):
+    """Index of the first sample k * dt at or after t."""
+    return int(np.ceil(t / dt - 1e-9))
+
+def sample_indices(t0, t1, dt):
+    """Indices k of the samples k * dt in [t0, t1)."""
+    return np.arange(_first_sample(t0, dt), _first_sample(t1, dt), dtype=np.int64)
+
+class StimulusExpression:
+    """A stimulus as a lazy expression of time, evaluated one chunk of samples at a time.
+
+    Expressions are built from sources (Constant, Sine, TimeFunction, Noise, Sampled) combined with +, -,
+    * and / and transformed with window, delay and repeat; nothing is computed until evaluate is called
+    for a time chunk. Samples lie on the grid k * dt, so the values of a sample do not depend on how the
+    simulation is cut into chunks, and memory scales with the chunk rather than with the simulation.
+    """
+
+    def evaluate(self, t0, t1, dt):
+        """
+        Evaluates the stimulus for a chunk of the simulation.
+
+        Parameters:
+        - t0, t1: Start and end of the chunk (in milliseconds); the samples k * dt in [t0, t1) are returned.
+        - dt: Time step (in milliseconds).
+
+        Returns:
+        A numpy array of the stimulus values at the samples of the chunk.
+        """
+        return self._at(sample_indices(t0, t1, dt), dt)
+
+    def chunks(self, t0, t1, dt, chunk_size=65536):
+        """
+        Evaluates the stimulus over [t0, t1) in successive chunks.
+
+        Parameters:
+        - t0, t1: Start and end of the evaluated span (in milliseconds).
+        - dt: Time step (in milliseconds).
+        - chunk_size: Number of samples per chunk.
+
+        Yields:
+        The sample times and the stimulus values of each chunk.
+        """
+        first, stop = _first_sample(t0, dt), _first_sample(t1, dt)
+        for start in range(first, stop, chunk_size):
+            indices = np.arange(start, min(start + chunk_size, stop), dtype=np.int64)
+            yield indices * dt, self._at(indices, dt)
+
+    def _at(self, indices, dt):
+        """Values at the samples indices * dt; indices is a sorted integer array."""
+        raise NotImplementedError("Subclass must implement abstract method.")
+
+    def window(self, start, stop):
+        """The stimulus during [start, stop) (in milliseconds), and zero outside."""
+        return Window(self, start, stop)
+
+    def delay(self, delay):
+        """The stimulus shifted later by delay (in milliseconds, rounded to the time step)."""
+        return Delay(self, delay)
+
+    def repeat(self, period, count=None):
+        """The segment [0, period) of the stimulus repeated count times (forever if None) from time 0."""
+        return Repeat(self, period, count)
+
+    def cached(self, maxsize=16):
+        """The same stimulus, keeping the last maxsize evaluated chunks in an LRU cache."""
+        return Cached(self, maxsize)
+
+    def __add__(self, other):
+        return Combined(np.add, self, other)
+
+    def __radd__(self, other):
+        return Combined(np.add, other, self)
+
+    def __sub__(self, other):
+        return Combined(np.subtract, self, other)
+
+    def __rsub__(self, other):
+        return Combined(np.subtract, other, self)
+
+    def __mul__(self, other):
+        return Combined(np.multiply, self, other)
+
+    def __rmul__(self, other):
+        return Combined(np.multiply, other, self)
+
+    def __truediv__(self, other):
+        return Combined(np.true_divide, self, other)
+
+    def __neg__(self):
+        return Combined(np.multiply, -1.0, self)
+
+def as_expression(value):
+    """Return value as a StimulusExpression; numbers become constants."""
+    return value if isinstance(value, StimulusExpression) else Constant(value)
+
+class Constant(StimulusExpression):
+    """A constant value."""
+
+    def __init__(self, value):
+        self.value = float(value)
+
+    def _at(self, indices, dt):
+        return np.full(len(indices), self.value)
+
+class Sine(StimulusExpression):
+    """A sine wave amplitude * sin(2 pi frequency t + phase), with t in seconds."""
+
+    def __init__(self, amplitude, frequency, phase=0.0):
+        """
+        Parameters:
+        - amplitude: The amplitude of the wave.
+        - frequency: The frequency of the wave (in Hz).
+        - phase: The phase at time 0 (in radians).
+        """
+        self.amplitude = amplitude
+        self.frequency = frequency
+        self.phase = phase
+
+    def _at(self, indices, dt):
+        return self.amplitude * np.sin(2 * np.pi * self.frequency * (indices * (dt / 1000.0)) + self.phase)
+
+class TimeFunction(StimulusExpression):
+    """Any vectorized function of time, function(t) with t in milliseconds."""
+
+    def __init__(self, function):
+        self.function = function
+
+    def _at(self, indices, dt):
+        return np.broadcast_to(np.asarray(self.function(indices * dt), dtype=np.float64), (len(indices),))
+
+class Noise(StimulusExpression):
+    """Gaussian white noise with one independent value per sample.
+
+    The samples are drawn in blocks of NOISE_BLOCK, each from a generator seeded with the seed and the
+    block number, so any sample can be evaluated without drawing those before it, and evaluating a
+    simulation chunk by chunk gives the same noise as evaluating it at once.
+    """
+
+    def __init__(self, mean=0.0, std=1.0, seed=0):
+        """
+        Parameters:
+        - mean, std: Mean and standard deviation of the samples.
+        - seed: Seed of the noise.
+        """
+        self.mean = mean
+        self.std = std
+        self.seed = int(seed)
+
+    def _block(self, block):
+        # Non-negative entropy for SeedSequence: blocks 0, -1, 1, -2, ... map to 0, 1, 2, 3, ...
+        key = 2 * block if block >= 0 else -2 * block - 1
+        return np.random.default_rng([self.seed, key]).standard_normal(NOISE_BLOCK)
+
+    def _at(self, indices, dt):
+        values = np.empty(len(indices))
+        blocks = indices // NOISE_BLOCK
+        bounds = np.flatnonzero(np.r_[True, blocks[1:] != blocks[:-1], True])
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            values[a:b] = self._block(int(blocks[a]))[indices[a:b] - blocks[a] * NOISE_BLOCK]
+        return self.mean + self.std * values
+
+class Sampled(StimulusExpression):
+    """A recorded or precomputed signal, held constant over each of its samples and zero outside it."""
+
+    def __init__(self, values, sample_dt):
+        """
+        Parameters:
+        - values: Array (or memmap) of the signal samples; sample i covers [i, i + 1) * sample_dt.
+        - sample_dt: Time between the signal samples (in milliseconds).
+        """
+        self.values = values if isinstance(values, np.ndarray) else np.asarray(values, dtype=np.float64)
+        self.sample_dt = sample_dt
+
+    def _at(self, indices, dt):
+        positions = np.floor(indices * (dt / self.sample_dt) + 1e-9).astype(np.int64)
+        inside = (positions >= 0) & (positions < len(self.values))
+        out = np.zeros(len(indices))
+        out[inside] = self.values[positions[inside]]
+        return out
+
+class Combined(StimulusExpression):
+    """An element-wise operation of two expressions (or numbers)."""
+
+    def __init__(self, operation, left, right):
+        self.operation = operation
+        self.left = as_expression(left)
+        self.right = as_expression(right)
+
+    def _at(self, indices, dt):
+        return self.operation(self.left._at(indices, dt), self.right._at(indices, dt))
+
+class Window(StimulusExpression):
+    """An expression during [start, stop), and zero outside; the expression is only evaluated inside."""
+
+    def __init__(self, child, start, stop):
+        self.child = child
+        self.start = start
+        self.stop = stop
+
+    def _at(self, indices, dt):
+        a, b = np.searchsorted(indices, [_first_sample(self.start, dt), _first_sample(self.stop, dt)])
+        out = np.zeros(len(indices))
+        if b > a:
+            out[a:b] = self.child._at(indices[a:b], dt)
+        return out
+
+class Delay(StimulusExpression):
+    """An expression shifted later in time by a whole number of time steps."""
+
+    def __init__(self, child, delay):
+        self.child = child
+        self.delay_time = delay
+
+    def _at(self, indices, dt):
+        return self.child._at(indices - int(round(self.delay_time / dt)), dt)
+
+class Repeat(StimulusExpression):
+    """The segment [0, period) of an expression, repeated from time 0."""
+
+    def __init__(self, child, period, count=None):
+        self.child = child
+        self.period = period
+        self.count = count
+
+    def _at(self, indices, dt):
+        period = max(int(round(self.period / dt)), 1)
+        stop = np.inf if self.count is None else self.count * period
+        a, b = np.searchsorted(indices, [0, stop])
+        out = np.zeros(len(indices))
+        if b > a:
+            phase = indices[a:b] % period
+            # Evaluate one period at most, then gather the repetitions from it
+            first, last = phase.min(), phase.max()
+            if b - a > last - first + 1:
+                segment = self.child._at(np.arange(first, last + 1), dt)
+                out[a:b] = segment[phase - first]
+            else:
+                order = np.argsort(phase, kind='stable')
+                out[a:b][order] = self.child._at(phase[order], dt)
+        return out
+
+class Cached(StimulusExpression):
+    """An expression whose evaluated chunks are kept in an LRU cache."""
+
+    def __init__(self, child, maxsize=16):
+        self.child = child
+        self.maxsize = maxsize
+        self._cache = OrderedDict()
+
+    def _at(self, indices, dt):
+        if len(indices) == 0 or indices[-1] - indices[0] + 1 != len(indices):
+            return self.child._at(indices, dt)
+        key = (int(indices[0]), len(indices), dt)
+        values = self._cache.get(key)
+        if values is None:
+            values = self.child._at(indices, dt)
+            values.flags.writeable = False
+            self._cache[key] = values
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        return values
+
+    def clear(self):
+        """Empty the cache."""
+        self._cache.clear()
@@ -0,0 +1,14 @@
+# tests/conftest.py
+
+import os
+import sys
+
+import matplotlib
+
+# Modules import their siblings by bare name, so every source directory goes on the path
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+for root, dirs, files in sorted(os.walk(SRC)):
+    if any(name.endswith('.py') for name in files) and root not in sys.path:
+        sys.path.insert(0, root)
+
+matplotlib.use('Agg')
@@ -0,0 +1,45 @@
+# tests/test_adaptive_integration.py
+
+import numpy as np
+import pytest
+from adaptive_integration import dormand_prince, step_boundaries
+
+def test_dormand_prince_accuracy_and_dense_output():
+    t = np.linspace(0.0, 5.0, 1001)
+    y, stats = dormand_prince(lambda t, y: -y, 1.0, t, rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(y, np.exp(-t), rtol=1e-7, atol=1e-10)
+    # The steps follow the tolerance, not the output grid
+    assert stats['n_accepted'] < len(t) / 4
+
+def test_dormand_prince_batch_and_vector_states():
+    def rotation(t, y):
+        return np.stack([-y[..., 1], y[..., 0]], axis=-1)
+    t = np.linspace(0.0, 2 * np.pi, 50)
+    y0 = np.array([[1.0, 0.0], [0.0, 2.0]])
+    y, _ = dormand_prince(rotation, y0, t, rtol=1e-10, atol=1e-12)
+    assert y.shape == (50, 2, 2)
+    np.testing.assert_allclose(y[:, 0, 0], np.cos(t), atol=1e-8)
+    np.testing.assert_allclose(y[:, 1, 0], -2 * np.sin(t), atol=1e-8)
+
+def test_dormand_prince_non_uniform_grid_and_max_step():
+    t = np.array([0.0, 0.001, 0.5, 0.51, 3.0])
+    y, stats = dormand_prince(lambda t, y: np.cos(t), 0.0, t, max_step=0.05)
+    np.testing.assert_allclose(y, np.sin(t), atol=1e-7)
+    assert stats['n_accepted'] >= 60
+
+def test_dormand_prince_stops_on_blow_up():
+    # y' = y^2 with y(0) = 1 diverges at t = 1
+    with pytest.raises(RuntimeError, match="too small"):
+        dormand_prince(lambda t, y: y**2, np.array([1.0]), [0.0, 2.0])
+
+def test_dormand_prince_stops_on_nan_derivative():
+    with pytest.raises(RuntimeError, match="not finite"):
+        dormand_prince(lambda t, y: np.full_like(y, np.nan), np.array([1.0]), [0.0, 1.0])
+    # A derivative turning NaN mid-way rejects every step until the step size is exhausted
+    with pytest.raises(RuntimeError):
+        dormand_prince(lambda t, y: y * np.nan if t > 0.5 else -y, np.array([1.0]), [0.0, 1.0])
+
+def test_step_boundaries():
+    assert len(step_boundaries(None, 0.0, 1.0)) == 0
+    np.testing.assert_array_equal(step_boundaries([0.5, 0.0, 0.2, 0.5, 1.0, 3.0], 0.0, 1.0), [0.2, 0.5])
+
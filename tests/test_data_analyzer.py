@@ -0,0 +1,84 @@
+# tests/test_data_analyzer.py
+
+import numpy as np
+import pandas as pd
+import pytest
+import tracemalloc
+import data_analyzer
+from data_analyzer import (DataAnalyzer, all_pairs_cross_correlation, lagged_cross_correlation,
+                           pearson_correlation_matrix)
+
+def make_signals(n_channels=7, n_samples=1500, seed=0):
+    rng = np.random.default_rng(seed)
+    common = rng.normal(size=n_samples + 20)
+    # Each channel sees the common drive with its own delay, plus noise and an offset
+    return np.array([common[c:c + n_samples] + rng.normal(size=n_samples) + c for c in range(n_channels)])
+
+def brute_force(signals, lag_max, normalize):
+    n_channels, n_samples = signals.shape
+    if normalize:
+        signals = (signals - signals.mean(axis=1, keepdims=True)) / (np.sqrt(n_samples) * signals.std(axis=1, keepdims=True))
+    full = np.array([[np.correlate(x, y, mode='full') for y in signals] for x in signals])
+    return full[..., n_samples - 1 - lag_max:n_samples + lag_max]
+
+def test_lagged_cross_correlation_matches_numpy():
+    x, y = make_signals(2, 300)
+    np.testing.assert_allclose(lagged_cross_correlation(x, y), np.correlate(x, y, mode='full'), atol=1e-9)
+    np.testing.assert_allclose(lagged_cross_correlation(x, y[:250], 12),
+                               np.correlate(x, y[:250], mode='full')[249 - 12:249 + 13], atol=1e-9)
+
+@pytest.mark.parametrize('normalize', [True, False])
+@pytest.mark.parametrize('block_size', [None, 1, 3])
+def test_all_pairs_matches_brute_force(normalize, block_size):
+    signals = make_signals()
+    expected = brute_force(signals, 25, normalize)
+    correlation = all_pairs_cross_correlation(signals, 25, normalize=normalize, block_size=block_size)
+    np.testing.assert_allclose(correlation, expected, rtol=1e-9, atol=1e-9 * np.abs(expected).max())
+
+def test_time_chunks_match_brute_force(monkeypatch):
+    # A small budget splits the recording into many time chunks and the channels into blocks
+    monkeypatch.setattr(data_analyzer, 'CORRELATION_BUDGET', 4096)
+    signals = make_signals(n_samples=1999)
+    expected = brute_force(signals, 9, True)
+    np.testing.assert_allclose(all_pairs_cross_correlation(signals, 9), expected, atol=1e-12)
+    peak_value, peak_lag = all_pairs_cross_correlation(signals, 9, peak=True)
+    np.testing.assert_allclose(peak_value, expected.max(axis=-1), atol=1e-12)
+    np.testing.assert_array_equal(peak_lag, np.argmax(expected, axis=-1) - 9)
+    assert peak_lag[0, 3] == 3 and peak_lag[3, 0] == -3
+
+def test_each_block_spectra_are_computed_once_per_chunk(monkeypatch):
+    calls = []
+    original = data_analyzer._segment_spectra
+    def counting(padded, lag_max, n_fft):
+        calls.append(padded.shape)
+        return original(padded, lag_max, n_fft)
+    monkeypatch.setattr(data_analyzer, '_segment_spectra', counting)
+    all_pairs_cross_correlation(make_signals(n_channels=9, n_samples=20000), 10, block_size=2)
+    assert len(calls) == 5
+    assert sum(shape[0] for shape in calls) == 9
+
+def test_peak_memory_does_not_grow_with_lag_max(monkeypatch):
+    monkeypatch.setattr(data_analyzer, 'CORRELATION_BUDGET', 1 << 14)
+    signals = np.random.default_rng(0).normal(size=(64, 2000))
+    peak_bytes = {}
+    for lag_max in (8, 128):
+        tracemalloc.start()
+        try:
+            all_pairs_cross_correlation(signals, lag_max, peak=True)
+            peak_bytes[lag_max] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    # The cross-spectra of all pairs would take 64^2 / 2 * (lag_max + 32) complex values, over 5 MB at lag 128
+    assert peak_bytes[128] <= 1.2 * peak_bytes[8]
+    assert peak_bytes[128] < 10 * 8 * (1 << 14)
+
+def test_pearson_matrix_and_analyzer():
+    signals = make_signals()
+    np.testing.assert_allclose(pearson_correlation_matrix(signals, block=100), np.corrcoef(signals))
+    np.testing.assert_allclose(pearson_correlation_matrix(signals[:3], signals[3:]), np.corrcoef(signals)[:3, 3:])
+    data = pd.DataFrame({'time': np.arange(1500) * 0.1, **{f'V_m[{c}]': row for c, row in enumerate(signals)}})
+    analyzer = DataAnalyzer(data)
+    np.testing.assert_allclose(analyzer.population_cross_correlation(4), brute_force(signals, 4, True), atol=1e-12)
+    np.testing.assert_allclose(analyzer.pearson_correlation_matrix(), np.corrcoef(signals))
+    with pytest.raises(ValueError):
+        DataAnalyzer(data[['time']]).pearson_correlation_matrix()
@@ -0,0 +1,58 @@
+# tests/test_data_recorder.py
+
+import numpy as np
+import pytest
+from data_recorder import DataRecorder
+
+def record_steps(recorder, n_steps, n_neurons=None):
+    rng = np.random.default_rng(0)
+    expected = {'time': [], 'V_m': [], 'm': []}
+    for step in range(n_steps):
+        V = rng.normal(size=n_neurons) if n_neurons else rng.normal()
+        m = rng.random(size=n_neurons) if n_neurons else rng.random()
+        recorder.record(step * 0.1, V, {'m': m})
+        expected['time'].append(step * 0.1)
+        expected['V_m'].append(V)
+        expected['m'].append(m)
+    return {name: np.array(values) for name, values in expected.items()}
+
+def test_scalar_recording_across_chunks():
+    recorder = DataRecorder(chunk_size=7)
+    expected = record_steps(recorder, 50)
+    assert len(recorder) == 50
+    for name in ('time', 'V_m', 'm'):
+        np.testing.assert_array_equal(recorder.get(name), expected[name])
+    assert recorder.names == ['time', 'V_m', 'm']
+
+def test_population_neuron_selection_and_decimation():
+    recorder = DataRecorder(neurons=[1, 3], decimation=4, chunk_size=5)
+    expected = record_steps(recorder, 41, n_neurons=6)
+    np.testing.assert_array_equal(recorder['V_m'], expected['V_m'][::4][:, [1, 3]])
+    np.testing.assert_array_equal(recorder['time'], expected['time'][::4])
+
+def test_variable_filter_and_legacy_layout():
+    recorder = DataRecorder(variables=('V_m',))
+    expected = record_steps(recorder, 10)
+    assert recorder.names == ['time', 'V_m']
+    data = recorder.data
+    np.testing.assert_array_equal(data['V_m'], expected['V_m'])
+    assert data['gating_variables'] == {}
+    with pytest.raises(KeyError):
+        recorder.get('m')
+
+def test_dataframe_and_csv_export(tmp_path):
+    recorder = DataRecorder(neurons=[0, 2])
+    expected = record_steps(recorder, 5, n_neurons=3)
+    frame = recorder.to_dataframe()
+    assert list(frame.columns) == ['time', 'V_m[0]', 'V_m[2]', 'm[0]', 'm[2]']
+    np.testing.assert_array_equal(frame['V_m[2]'], expected['V_m'][:, 2])
+    recorder.export_to_csv(tmp_path / 'recording.csv')
+    assert (tmp_path / 'recording.csv').read_text().splitlines()[0] == 'time,V_m[0],V_m[2],m[0],m[2]'
+
+def test_reset_and_invalid_decimation():
+    recorder = DataRecorder()
+    record_steps(recorder, 3)
+    recorder.reset()
+    assert len(recorder) == 0
+    with pytest.raises(ValueError):
+        DataRecorder(decimation=0)
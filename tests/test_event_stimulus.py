@@ -0,0 +1,96 @@
+# tests/test_event_stimulus.py
+
+import numpy as np
+import pytest
+from adaptive_integration import dormand_prince, step_boundaries
+from current_stimulus import CurrentStimulus
+from event_stimulus import PiecewiseConstantStimulus
+from implicit_integration import backward_euler, bdf
+
+PULSES = PiecewiseConstantStimulus.from_pulses([5.3, 15.7, 19.0, 25.1], [3.3, 3.3, 2.0, 4.9], [1.0, -2.0, 0.5, 1.5])
+
+def integral(stimulus, t):
+    """Exact integral of a scalar stimulus from 0 to every time of t."""
+    edges = np.concatenate(([0.0], stimulus.times))
+    values = np.concatenate(([stimulus.initial], stimulus.values))
+    return np.array([np.sum(values * np.clip(np.append(edges[1:], np.inf), None, time)
+                            - values * np.clip(edges, None, time)) for time in t])
+
+def test_pulses_are_right_continuous_and_take_over():
+    assert len(PULSES) == 8
+    assert PULSES.value_at(5.3) == 1.0 and PULSES.value_at(np.nextafter(5.3, 0)) == 0.0
+    assert PULSES.value_at(8.6) == 0.0
+    # The second pulse ends when the third starts
+    assert PULSES.value_at(19.0) == 0.5 and PULSES.value_at(21.0) == 0.0
+    np.testing.assert_array_equal(PULSES.breakpoints_between(5.3, 19.0), [8.6, 15.7])
+    assert PULSES.next_breakpoint(19.0) == 21.0 and PULSES.next_breakpoint(30.0) == np.inf
+    np.testing.assert_array_equal(PULSES.evaluate(0, 40, 0.1), [PULSES.value_at(k * 0.1) for k in range(400)])
+    np.testing.assert_array_equal(step_boundaries(PULSES, 8.6, 21.0), [15.7, 19.0])
+
+def test_cursor_matches_value_at_with_retries():
+    rng = np.random.default_rng(0)
+    times = np.cumsum(rng.exponential(0.4, size=300))
+    # Retried steps go back in time, sometimes across a breakpoint
+    times[::7] -= rng.uniform(0, 1.5, size=len(times[::7]))
+    cursor = PULSES.cursor()
+    assert [cursor.value(time) for time in times] == [PULSES.value_at(time) for time in times]
+
+def test_population_cursor_matches_value_at():
+    rng = np.random.default_rng(1)
+    stimulus = PiecewiseConstantStimulus.from_pulses(rng.uniform(0, 90, size=200), 0.5, rng.normal(size=200),
+                                                     neurons=rng.integers(0, 50, size=200), n_neurons=50,
+                                                     baseline=-0.1)
+    cursor = stimulus.cursor()
+    for time in [0.0, 3.0, 3.0, 10.5, 8.0, 60.0, 59.9, 100.0]:
+        np.testing.assert_array_equal(cursor.value(time), stimulus.value_at(time))
+    with pytest.raises(ValueError):
+        stimulus.evaluate(0, 10, 1.0)
+    with pytest.raises(ValueError):
+        PiecewiseConstantStimulus([1.0], [1.0], neurons=[0])
+    events = CurrentStimulus(10, 2.0, start_time=3).as_events()
+    assert [events.value_at(time) for time in (2.9, 3.0, 12.9, 13.0)] == [0.0, 2.0, 2.0, 0.0]
+
+def test_dormand_prince_steps_end_at_stops_with_the_left_limit():
+    calls = []
+    def f(time, y):
+        calls.append(time)
+        return np.full_like(y, PULSES.value_at(time))
+    t = np.linspace(0.0, 40.0, 81)
+    y, stats = dormand_prince(f, 0.0, t, tstops=PULSES)
+    # y' = I(t) is integrated exactly when no step spans a jump
+    np.testing.assert_allclose(y, integral(PULSES, t), atol=1e-12)
+    assert stats['n_rejected'] == 0
+    for stop in PULSES.breakpoints_between(0.0, 40.0):
+        # The last stage of the step ending at the stop sees the value before the jump, and the next
+        # step starts from a new evaluation at the stop instead of reusing it
+        assert np.nextafter(stop, -np.inf) in calls
+        assert stop in calls
+
+    plain, plain_stats = dormand_prince(lambda time, y: np.full_like(y, PULSES.value_at(time)), 0.0, t)
+    assert plain_stats['n_rejected'] > 10
+    assert np.abs(plain - integral(PULSES, t)).max() > 1e-8
+
+def test_dormand_prince_stops_on_a_stiff_problem():
+    f = lambda time, y: -y + PULSES.value_at(time)
+    t = np.linspace(0.0, 40.0, 81)
+    y, stats = dormand_prince(f, 0.0, t, rtol=1e-8, atol=1e-10, tstops=PULSES.times)
+    _, plain_stats = dormand_prince(f, 0.0, t, rtol=1e-8, atol=1e-10)
+    assert stats['n_rejected'] < plain_stats['n_rejected']
+    assert np.abs(y[np.searchsorted(t, 8.5)] - (1 - np.exp(-3.2))) < 1e-7
+
+@pytest.mark.parametrize('solver', [bdf, backward_euler])
+def test_implicit_solvers_restart_at_stops(solver):
+    calls = []
+    def f(time, y):
+        calls.append(time)
+        return np.full_like(y, PULSES.value_at(time))
+    t = np.linspace(0.0, 40.0, 81)
+    y, stats = solver(f, np.zeros(2), t, tstops=PULSES)
+    np.testing.assert_allclose(y[:, 0], integral(PULSES, t), atol=1e-9)
+    # One step per interval of t, plus one for every stop falling inside an interval
+    off_grid = np.setdiff1d(PULSES.breakpoints_between(0.0, 40.0), t)
+    assert len(off_grid) == 4 and stats['n_steps'] == len(t) - 1 + len(off_grid)
+    for stop in PULSES.breakpoints_between(0.0, 40.0):
+        assert np.nextafter(stop, -np.inf) in calls
+    plain, _ = solver(lambda time, y: np.full_like(y, PULSES.value_at(time)), np.zeros(2), t)
+    assert np.abs(plain[:, 0] - integral(PULSES, t)).max() > 0.1
@@ -0,0 +1,82 @@
+# tests/test_export.py
+
+import os
+
+import matplotlib.image
+import numpy as np
+import pytest
+import export
+from export import PlotJob, export_figures, save_figure
+from visualization import phase_space_plot, plot_membrane_potential
+
+def make_trace(n_samples=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.arange(n_samples) * 0.1, -65.0 + np.cumsum(rng.normal(size=n_samples))
+
+def test_content_hash_follows_the_figure_contents(tmp_path):
+    time, V_m = make_trace()
+    job = PlotJob(str(tmp_path / 'a.png'), plot_membrane_potential, time, V_m, title='A')
+    same = PlotJob(str(tmp_path / 'b.png'), plot_membrane_potential, time.copy(), V_m.copy(), title='A')
+    assert job.content_hash(100) == same.content_hash(100)
+    changed = V_m.copy()
+    changed[-1] += 1e-9
+    others = [PlotJob(str(tmp_path / 'a.png'), plot_membrane_potential, time, changed, title='A'),
+              PlotJob(str(tmp_path / 'a.png'), plot_membrane_potential, time, V_m, title='B'),
+              PlotJob(str(tmp_path / 'a.svg'), plot_membrane_potential, time, V_m, title='A'),
+              PlotJob(str(tmp_path / 'a.png'), plot_membrane_potential, time, V_m.astype(np.float32), title='A'),
+              PlotJob(str(tmp_path / 'a.png'), phase_space_plot, time, V_m, title='A')]
+    hashes = {job.content_hash(100)} | {other.content_hash(100) for other in others}
+    assert len(hashes) == 6
+    assert job.content_hash(150) != job.content_hash(100)
+    with pytest.raises(ValueError):
+        PlotJob(str(tmp_path / 'a.jpg'), plot_membrane_potential, time, V_m)
+
+def test_export_renders_each_figure_once_and_reuses_the_cache(tmp_path, monkeypatch):
+    rendered = []
+    original = export._save_job
+    def counting(job, dpi):
+        rendered.append(job.path)
+        return original(job, dpi)
+    monkeypatch.setattr(export, '_save_job', counting)
+    time, V_m = make_trace()
+    cache = tmp_path / 'cache'
+
+    def jobs(folder):
+        folder.mkdir()
+        return [PlotJob(str(folder / 'trace.png'), plot_membrane_potential, time, V_m),
+                PlotJob(str(folder / 'copy.png'), plot_membrane_potential, time, V_m),
+                PlotJob(str(folder / 'phase.png'), phase_space_plot, V_m, np.tanh(V_m / 50.0)),
+                PlotJob(str(folder / 'shifted.png'), plot_membrane_potential, time, V_m + 10.0)]
+
+    first = jobs(tmp_path / 'first')
+    hashes = export_figures(first, n_workers=0, dpi=50, cache_dir=str(cache))
+    assert len(rendered) == 3 and hashes[0] == hashes[1] and len(set(hashes)) == 3
+    assert (tmp_path / 'first' / 'trace.png').read_bytes() == (tmp_path / 'first' / 'copy.png').read_bytes()
+    assert sorted(path.name for path in cache.iterdir()) == sorted(f'{key}.png' for key in set(hashes))
+
+    second = jobs(tmp_path / 'second')
+    assert export_figures(second, n_workers=0, dpi=50, cache_dir=str(cache)) == hashes
+    assert len(rendered) == 3
+    for name in ('trace.png', 'copy.png', 'phase.png', 'shifted.png'):
+        assert (tmp_path / 'second' / name).read_bytes() == (tmp_path / 'first' / name).read_bytes()
+
+def test_template_figures_match_new_figures(tmp_path):
+    time, V_m = make_trace()
+    export._templates.clear()
+    save_figure(str(tmp_path / 'new.png'), plot_membrane_potential, time, V_m, dpi=40)
+    assert plot_membrane_potential in export._templates
+    save_figure(str(tmp_path / 'other.png'), plot_membrane_potential, time, V_m + 5.0, dpi=40)
+    save_figure(str(tmp_path / 'template.png'), plot_membrane_potential, time, V_m, dpi=40)
+    new = matplotlib.image.imread(str(tmp_path / 'new.png'))
+    template = matplotlib.image.imread(str(tmp_path / 'template.png'))
+    assert new.shape == template.shape
+    assert np.mean(np.any(new != template, axis=-1)) < 0.01
+
+def test_export_in_worker_processes(tmp_path):
+    time, V_m = make_trace(n_samples=500)
+    jobs = [PlotJob(str(tmp_path / f'trace{k}.png'), plot_membrane_potential, time, V_m + k) for k in range(3)]
+    jobs.append(PlotJob(str(tmp_path / 'trace.svg'), plot_membrane_potential, time, V_m))
+    export_figures(jobs, n_workers=2, dpi=30)
+    for job in jobs:
+        assert os.path.getsize(job.path) > 0
+    assert (tmp_path / 'trace.svg').read_text().lstrip().startswith('<?xml')
@@ -0,0 +1,55 @@
+# tests/test_gating_schemes.py
+
+import numpy as np
+import pytest
+from hh_model import HodgkinHuxleyNeuron, HodgkinHuxleyPopulation
+from rate_tables import gate_step
+
+def _final_potential(dt, gating, voltage, duration=20.0):
+    population = HodgkinHuxleyPopulation(1, gating=gating, voltage=voltage)
+    for _ in range(int(round(duration / dt))):
+        population.update(3.0, dt)
+    return population.V_m[0]
+
+@pytest.fixture(scope='module')
+def reference_potential():
+    return _final_potential(0.001, 'exponential', 'crank_nicolson')
+
+def test_exponential_gate_step_is_exact_for_fixed_rates():
+    alpha, beta, x0, t = 0.3, 0.7, 0.9, 5.0
+    expected = 0.3 + (x0 - 0.3) * np.exp(-t)
+    assert gate_step(x0, alpha, beta, t, 'exponential') == pytest.approx(expected)
+    x = x0
+    for _ in range(50):
+        x = gate_step(x, alpha, beta, t / 50, 'exponential')
+    assert x == pytest.approx(expected)
+
+def test_gate_step_writes_into_out():
+    x = np.array([0.1, 0.5, 0.9])
+    expected = gate_step(x.copy(), 0.2, 0.4, 0.1, 'euler')
+    result = gate_step(x, 0.2, 0.4, 0.1, 'euler', out=x)
+    assert result is x
+    np.testing.assert_array_equal(x, expected)
+
+def test_invalid_schemes():
+    with pytest.raises(ValueError):
+        gate_step(0.5, 0.1, 0.1, 0.01, 'midpoint')
+    with pytest.raises(ValueError):
+        HodgkinHuxleyNeuron(gating='midpoint')
+    with pytest.raises(ValueError):
+        HodgkinHuxleyPopulation(2, voltage='leapfrog')
+
+@pytest.mark.parametrize('gating, voltage, order', [('euler', 'euler', 1),
+                                                    ('exponential', 'semi_implicit', 1),
+                                                    ('exponential', 'crank_nicolson', 2)])
+def test_convergence_order(gating, voltage, order, reference_potential):
+    errors = [abs(_final_potential(dt, gating, voltage) - reference_potential) for dt in (0.04, 0.02)]
+    assert np.log2(errors[0] / errors[1]) == pytest.approx(order, abs=0.2)
+
+def test_exponential_gating_stays_bounded_at_large_steps():
+    neuron = HodgkinHuxleyNeuron(gating='exponential', voltage='semi_implicit')
+    for _ in range(200):
+        neuron.update(10.0, 0.5)
+    for x in (neuron.m, neuron.h, neuron.n):
+        assert 0.0 <= x <= 1.0
+    assert np.isfinite(neuron.V_m)
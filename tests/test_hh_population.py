@@ -0,0 +1,51 @@
+# tests/test_hh_population.py
+
+import numpy as np
+import pytest
+from hh_model import HodgkinHuxleyNeuron, HodgkinHuxleyPopulation
+from rate_tables import get_rate_table
+
+SCHEMES = [('euler', 'euler'), ('exponential', 'euler'), ('exponential', 'semi_implicit'),
+           ('exponential', 'crank_nicolson')]
+
+@pytest.mark.parametrize('gating, voltage', SCHEMES)
+def test_population_matches_single_neurons(gating, voltage):
+    currents = np.array([0.0, 5.0, 10.0, 20.0])
+    population = HodgkinHuxleyPopulation(len(currents), gating=gating, voltage=voltage)
+    neurons = [HodgkinHuxleyNeuron(gating=gating, voltage=voltage) for _ in currents]
+    for _ in range(2000):
+        population.update(currents, 0.01)
+        for neuron, current in zip(neurons, currents):
+            neuron.update(current, 0.01)
+    expected = np.array([[neuron.V_m, neuron.m, neuron.h, neuron.n] for neuron in neurons]).T
+    np.testing.assert_allclose(np.array(population.get_state()), expected, rtol=1e-9, atol=1e-9)
+
+def test_rates_are_finite_at_the_removable_singularities():
+    population = HodgkinHuxleyPopulation(2, V_init=[-40.0, -55.0])
+    rates = np.array(population.rates(population.V_m))
+    assert np.all(np.isfinite(rates))
+    np.testing.assert_allclose(rates[0, 0], 1.0)
+    np.testing.assert_allclose(rates[4, 1], 0.1)
+    assert np.all(np.isfinite(population.get_state()))
+
+def test_neuron_rates_are_finite_at_the_removable_singularities():
+    population = HodgkinHuxleyPopulation(2, V_init=[-40.0, -55.0])
+    neuron = HodgkinHuxleyNeuron()
+    with np.errstate(all='raise'):
+        rates = np.array([neuron.rates(V) for V in (-40.0, -55.0)]).T
+    np.testing.assert_allclose(rates, np.array(population.rates(population.V_m)))
+
+def test_update_is_in_place():
+    population = HodgkinHuxleyPopulation(3, gating='exponential')
+    state = population.get_state()
+    population.update(10.0, 0.01)
+    assert all(a is b for a, b in zip(state, population.get_state()))
+
+def test_rate_table_population_tracks_closed_form():
+    exact = HodgkinHuxleyPopulation(5)
+    tabulated = HodgkinHuxleyPopulation(5, rate_table=get_rate_table('hodgkin_huxley', dv=0.01))
+    currents = np.linspace(0.0, 15.0, 5)
+    for _ in range(1000):
+        exact.update(currents, 0.01)
+        tabulated.update(currents, 0.01)
+    np.testing.assert_allclose(tabulated.V_m, exact.V_m, atol=0.5)
@@ -0,0 +1,67 @@
+# tests/test_implicit_integration.py
+
+import numpy as np
+import pytest
+from implicit_integration import _bdf_coefficients, backward_euler, bdf
+
+def stiff_cosine(t, y):
+    # Solution cos(t) from y(0) = 1, with a fast mode of rate 1000
+    return -1000.0 * (y - np.cos(t)) - np.sin(t)
+
+def van_der_pol(t, y):
+    return np.stack([y[..., 1], 1000.0 * (1 - y[..., 0]**2) * y[..., 1] - y[..., 0]], axis=-1)
+
+def test_bdf_coefficients_differentiate_polynomials_exactly():
+    times = np.array([1.0, 0.7, 0.5, 0.1])
+    a = _bdf_coefficients(times)
+    assert np.dot(a, times**3) == pytest.approx(3 * times[0]**2)
+    batch = _bdf_coefficients(np.stack([times, times + 1.0]))
+    np.testing.assert_allclose(batch[0], a)
+    np.testing.assert_allclose(batch[1], a)
+
+@pytest.mark.parametrize('max_order', [1, 2, 5])
+def test_bdf_stiff_accuracy(max_order):
+    t = np.linspace(0.0, 2.0, 201)
+    y, stats = bdf(stiff_cosine, 1.0, t, max_order=max_order)
+    np.testing.assert_allclose(y, np.cos(t), atol=1e-5)
+    assert stats['n_steps'] == len(t) - 1
+
+def test_higher_order_needs_fewer_newton_iterations():
+    t = np.linspace(0.0, 2.0, 201)
+    _, first = bdf(stiff_cosine, 1.0, t, max_order=1)
+    _, fifth = bdf(stiff_cosine, 1.0, t, max_order=5)
+    assert fifth['n_newton'] < first['n_newton']
+
+def test_backward_euler_is_first_order_bdf():
+    t = np.linspace(0.0, 1.0, 51)
+    np.testing.assert_array_equal(backward_euler(stiff_cosine, 1.0, t)[0], bdf(stiff_cosine, 1.0, t, max_order=1)[0])
+
+def test_analytic_jacobian():
+    def jac(t, y):
+        x, v = y[..., 0], y[..., 1]
+        return np.stack([np.stack([np.zeros_like(x), np.ones_like(x)], axis=-1),
+                         np.stack([-2000.0 * x * v - 1, 1000.0 * (1 - x**2)], axis=-1)], axis=-2)
+    t = np.linspace(0.0, 50.0, 51)
+    numeric, _ = bdf(van_der_pol, np.array([2.0, 0.0]), t)
+    analytic, _ = bdf(van_der_pol, np.array([2.0, 0.0]), t, jac=jac)
+    np.testing.assert_allclose(analytic, numeric, rtol=1e-4, atol=1e-6)
+
+def test_batch_rows_are_independent():
+    t = np.linspace(0.0, 300.0, 301)
+    with np.errstate(all='ignore'):
+        single, _ = bdf(van_der_pol, np.array([[2.0, 0.0]]), t)
+        batch, _ = bdf(van_der_pol, np.array([[2.0, 0.0], [1.0, 0.0], [2.0, 0.0], [-0.5, 3.0]]), t)
+    np.testing.assert_array_equal(batch[:, 0], single[:, 0])
+    np.testing.assert_array_equal(batch[:, 2], single[:, 0])
+
+def test_failing_newton_splits_the_step():
+    y, stats = bdf(lambda t, y: -y**3, np.array([10.0, 1.0]), [0.0, 100.0, 200.0])
+    assert stats['n_steps'] > 2
+    assert np.all(np.isfinite(y))
+    np.testing.assert_allclose(y[-1], 1 / np.sqrt(400.0 + 1 / np.array([100.0, 1.0])), rtol=0.2)
+    with pytest.raises(RuntimeError):
+        bdf(lambda t, y: -y**3, 10.0, [0.0, 100.0], max_substeps=0)
+
+def test_invalid_order():
+    with pytest.raises(ValueError):
+        bdf(stiff_cosine, 1.0, [0.0, 1.0], max_order=6)
@@ -0,0 +1,51 @@
+# tests/test_integration_methods.py
+
+import numpy as np
+import pytest
+from integration_methods import euler_method, runge_kutta_4
+
+def rotation(t, y):
+    return np.stack([-y[..., 1], y[..., 0]], axis=-1)
+
+@pytest.mark.parametrize('method, order', [(euler_method, 1), (runge_kutta_4, 4)])
+def test_scalar_convergence_order(method, order):
+    errors = [abs(method(lambda t, y: -y, 1.0, np.linspace(0.0, 1.0, n + 1))[-1] - np.exp(-1.0))
+              for n in (20, 40)]
+    assert np.log2(errors[0] / errors[1]) == pytest.approx(order, abs=0.15)
+
+@pytest.mark.parametrize('method', [euler_method, runge_kutta_4])
+def test_batch_matches_individual_systems(method):
+    t = np.linspace(0.0, 2.0, 201)
+    y0 = np.array([[1.0, 0.0], [0.0, 2.0], [0.5, -0.5]])
+    batch = method(rotation, y0, t)
+    assert batch.shape == (len(t), 3, 2)
+    for row in range(3):
+        np.testing.assert_array_equal(batch[:, row], method(rotation, y0[row], t))
+
+def test_rk4_vector_state_accuracy():
+    t = np.linspace(0.0, 2 * np.pi, 401)
+    y = runge_kutta_4(rotation, np.array([1.0, 0.0]), t)
+    np.testing.assert_allclose(y[-1], [1.0, 0.0], atol=1e-8)
+
+@pytest.mark.parametrize('method', [euler_method, runge_kutta_4])
+def test_save_every_and_final_only(method):
+    t = np.linspace(0.0, 1.0, 101)
+    y0 = np.array([1.0, 0.0])
+    full = method(rotation, y0, t)
+    np.testing.assert_array_equal(method(rotation, y0, t, save_every=10), full[::10])
+    np.testing.assert_array_equal(method(rotation, y0, t, save_every=7), full[::7])
+    np.testing.assert_array_equal(method(rotation, y0, t, final_only=True), full[-1])
+
+def test_preallocated_output_buffer():
+    t = np.linspace(0.0, 1.0, 11)
+    out = np.empty((11, 2))
+    assert euler_method(rotation, np.array([1.0, 0.0]), t, out=out) is out
+    with pytest.raises(ValueError):
+        euler_method(rotation, np.array([1.0, 0.0]), t, out=np.empty((10, 2)))
+    with pytest.raises(ValueError):
+        runge_kutta_4(rotation, np.array([1.0, 0.0]), t, save_every=0)
+
+def test_initial_state_is_not_modified():
+    y0 = np.array([1.0, 0.0])
+    runge_kutta_4(rotation, y0, np.linspace(0.0, 1.0, 11))
+    np.testing.assert_array_equal(y0, [1.0, 0.0])
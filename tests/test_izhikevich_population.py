@@ -0,0 +1,43 @@
+# tests/test_izhikevich_population.py
+
+import numpy as np
+import pytest
+from izhikevich_model import NEURON_TYPES, IzhikevichModel, IzhikevichPopulation
+from scipy import sparse
+
+def test_uncoupled_population_reproduces_scalar_models():
+    types = ['RS', 'FS', 'IB', 'LTS']
+    currents = np.array([5.0, 10.0, 8.0, 3.0])
+    population = IzhikevichPopulation.from_types(types, I_ext=currents)
+    models = [IzhikevichModel(*NEURON_TYPES[name], I_ext=current) for name, current in zip(types, currents)]
+    for _ in range(2000):
+        population.update(0.1)
+        for model in models:
+            model.update(0.1)
+    np.testing.assert_allclose(population.v, [model.v for model in models], rtol=1e-12)
+    np.testing.assert_allclose(population.u, [model.u for model in models], rtol=1e-12)
+
+def test_synaptic_input_sums_outgoing_weights_of_spiking_neurons():
+    rng = np.random.default_rng(0)
+    dense = rng.normal(size=(30, 30)) * (rng.random((30, 30)) < 0.2)
+    population = IzhikevichPopulation(30, weights=sparse.csr_matrix(dense))
+    spiking = np.array([0, 4, 5, 17, 29])
+    np.testing.assert_allclose(population.synaptic_input(spiking), dense[:, spiking].sum(axis=1))
+    np.testing.assert_array_equal(population.synaptic_input(np.array([], dtype=np.int64)), np.zeros(30))
+    assert np.allclose(IzhikevichPopulation(30, weights=dense).synaptic_input(spiking),
+                       dense[:, spiking].sum(axis=1))
+
+def test_spikes_are_reset_and_delivered_next_step():
+    weights = np.zeros((2, 2))
+    weights[1, 0] = 7.0
+    population = IzhikevichPopulation(2, weights=weights, I_ext=0.0)
+    population.v[0] = 35.0
+    spiking = population.update(0.1)
+    np.testing.assert_array_equal(spiking, [0])
+    assert population.v[0] == -65.0
+    assert population.u[0] == pytest.approx(0.2 * -65.0 + 8.0)
+    np.testing.assert_array_equal(population.I_syn, [0.0, 7.0])
+
+def test_invalid_weight_shape():
+    with pytest.raises(ValueError):
+        IzhikevichPopulation(3, weights=np.zeros((3, 4)))
@@ -0,0 +1,81 @@
+# tests/test_live_view.py
+
+import threading
+
+import numpy as np
+import pytest
+from live_view import SharedRingBuffer, start_live_view
+
+def test_write_and_read_across_the_wrap():
+    buffer = SharedRingBuffer(2, capacity=8)
+    for k in range(5):
+        buffer.write(k * 0.5, [k, -k])
+    buffer.write_many(np.arange(5, 11) * 0.5, np.stack((np.arange(5, 11), -np.arange(5, 11)), axis=1))
+    assert len(buffer) == 11
+    times, values = buffer.read_latest(100)
+    np.testing.assert_array_equal(times, np.arange(4, 11) * 0.5)
+    np.testing.assert_array_equal(values[:, 0], np.arange(4, 11))
+    times, _ = buffer.read_latest(3)
+    np.testing.assert_array_equal(times, [4.0, 4.5, 5.0])
+
+def test_write_many_longer_than_the_buffer_counts_every_sample():
+    buffer = SharedRingBuffer(1, capacity=10)
+    buffer.write(0.0, [0.0])
+    buffer.write_many(np.arange(1, 26), np.arange(1, 26))
+    assert len(buffer) == 26
+    times, values = buffer.read_latest(9)
+    np.testing.assert_array_equal(times, np.arange(17, 26))
+    buffer.write(26.0, [26.0])
+    times, values = buffer.read_latest(9)
+    np.testing.assert_array_equal(times, np.arange(18, 27))
+    np.testing.assert_array_equal(values[:, 0], times)
+
+def test_rows_reserved_by_the_writer_are_dropped():
+    buffer = SharedRingBuffer(1, capacity=10)
+    buffer.write_many(np.arange(9), np.arange(9))
+    # As if the writer had reserved five more samples and was copying them while the reader copies
+    buffer._header[4] = 14
+    times, _ = buffer.read_latest(9)
+    np.testing.assert_array_equal(times, np.arange(4, 9))
+    buffer._header[4] = 40
+    assert len(buffer.read_latest(9)[0]) == 0
+
+def test_concurrent_reads_are_never_torn():
+    buffer = SharedRingBuffer(4, capacity=64)
+    done = threading.Event()
+
+    def write():
+        start = 0
+        for size in [1, 3, 50, 63, 64, 100, 7] * 300:
+            times = np.arange(start, start + size, dtype=np.float64)
+            buffer.write_many(times, np.repeat(times[:, None], 4, axis=1))
+            start += size
+        done.set()
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    reads = 0
+    while not done.is_set() or reads == 0:
+        times, values = buffer.read_latest(63)
+        if len(times):
+            np.testing.assert_array_equal(np.diff(times), 1.0)
+            np.testing.assert_array_equal(values, np.repeat(times[:, None], 4, axis=1))
+        reads += 1
+    writer.join()
+
+def test_shared_buffer_is_attached_by_name():
+    buffer = SharedRingBuffer(3, capacity=16, dtype=np.float32, shared=True)
+    try:
+        buffer.write_many([0.0, 1.0], np.ones((2, 3)))
+        viewer = SharedRingBuffer(0, name=buffer.name)
+        assert (viewer.capacity, viewer.n_channels, viewer.dtype) == (16, 3, np.dtype(np.float32))
+        buffer.write(2.0, [2.0, 2.0, 2.0])
+        times, values = viewer.read_latest(10)
+        np.testing.assert_array_equal(times, [0.0, 1.0, 2.0])
+        assert values.dtype == np.float32
+        viewer.close()
+    finally:
+        buffer.close()
+        buffer.unlink()
+    with pytest.raises(ValueError):
+        start_live_view(SharedRingBuffer(1))
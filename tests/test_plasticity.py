@@ -0,0 +1,90 @@
+# tests/test_plasticity.py
+
+import numpy as np
+import pytest
+from plasticity import PairSTDP, TripletSTDP, TsodyksMarkram, WeightSnapshots
+from synapse_model import Synapse, SynapseGroup
+from visualization import plot_synaptic_weights_over_time
+
+def spike_raster(n, n_steps, rate, seed):
+    rng = np.random.default_rng(seed)
+    return rng.random((n_steps, n)) < rate
+
+def test_pair_stdp_matches_all_to_all_sum():
+    n_pre, n_post, dt = 5, 4, 1.0
+    pre, post = np.repeat(np.arange(n_pre), n_post), np.tile(np.arange(n_post), n_pre)
+    rule = PairSTDP(a_plus=0.01, a_minus=0.012, tau_plus=15.0, tau_minus=25.0, w_min=-np.inf, w_max=np.inf)
+    group = SynapseGroup(pre, post, n_pre, n_post, efficacy=0.5, plasticity=[rule])
+    pre_raster, post_raster = spike_raster(n_pre, 300, 0.05, 1), spike_raster(n_post, 300, 0.05, 2)
+    for step in range(300):
+        group.update_synaptic_parameters(np.flatnonzero(pre_raster[step]), np.flatnonzero(post_raster[step]),
+                                         step * dt)
+    expected = np.full(len(group), 0.5)
+    for s in range(len(group)):
+        t_pre = np.flatnonzero(pre_raster[:, group.pre[s]]) * dt
+        t_post = np.flatnonzero(post_raster[:, group.post[s]]) * dt
+        lag = t_post[None, :] - t_pre[:, None]
+        expected[s] += 0.01 * np.exp(-lag[lag > 0] / 15.0).sum() - 0.012 * np.exp(lag[lag < 0] / 25.0).sum()
+    np.testing.assert_allclose(group.efficacy, expected, rtol=1e-10)
+
+def test_stdp_only_touches_synapses_of_spiking_neurons_and_clips():
+    group = SynapseGroup([0, 1], [0, 1], 2, 2, efficacy=0.5, plasticity=[TripletSTDP(w_max=0.5)])
+    group.update_synaptic_parameters([0], [], 0.0)
+    group.update_synaptic_parameters([], [0], 5.0)
+    assert group.efficacy[0] == 0.5
+    assert group.efficacy[1] == 0.5
+    group.update_synaptic_parameters([], [1], 6.0)
+    group.update_synaptic_parameters([1], [], 10.0)
+    assert group.efficacy[1] < 0.5
+
+def test_tsodyks_markram_depression():
+    rule = TsodyksMarkram(U=0.5, tau_rec=100.0)
+    group = SynapseGroup([0], [0], 1, 1, release_probability=1.0, short_term=rule)
+    first = rule.release(group, np.array([0]), group.outgoing([0]), 0.0)
+    second = rule.release(group, np.array([0]), group.outgoing([0]), 20.0)
+    np.testing.assert_allclose(first, 0.5)
+    np.testing.assert_allclose(second, 0.5 * (1 - 0.5 * np.exp(-20.0 / 100.0)))
+
+def test_tsodyks_markram_facilitation_uses_U_at_the_first_spike():
+    U, tau_rec, tau_facil = 0.2, 50.0, 300.0
+    rule = TsodyksMarkram(U=U, tau_rec=tau_rec, tau_facil=tau_facil)
+    group = SynapseGroup([0], [0], 1, 1, short_term=rule)
+    times = [0.0, 10.0, 30.0, 5000.0]
+    scales = [rule.release(group, np.array([0]), group.outgoing([0]), t)[0] for t in times]
+    # Markram et al. (1998): u_n = U + u_{n-1} (1 - U) e^{-dt/tau_F}, x_n = 1 + (x_{n-1} - u_{n-1} x_{n-1} - 1) e^{-dt/tau_rec}
+    u, x, expected = U, 1.0, [U]
+    for previous, t in zip(times[:-1], times[1:]):
+        elapsed = t - previous
+        x = 1 + (x - u * x - 1) * np.exp(-elapsed / tau_rec)
+        u = U + u * (1 - U) * np.exp(-elapsed / tau_facil)
+        expected.append(u * x)
+    np.testing.assert_allclose(scales, expected, rtol=1e-12)
+    assert scales[0] == pytest.approx(U)
+    assert scales[-1] == pytest.approx(U, rel=1e-6)
+    assert scales[1] / scales[0] > 1.0
+
+def test_weight_snapshots_interval_and_growth():
+    snapshots = WeightSnapshots(interval=3, synapses=[0, 2], capacity=1)
+    efficacy = np.zeros(4)
+    for step in range(10):
+        efficacy[:] = step
+        snapshots.record(float(step), efficacy)
+    np.testing.assert_array_equal(snapshots.times, [0, 3, 6, 9])
+    np.testing.assert_array_equal(snapshots.weights, [[0, 3, 6, 9], [0, 3, 6, 9]])
+    snapshots.clear()
+    assert snapshots.weights.shape == (0, 0)
+
+def test_single_synapse_follows_the_group_rules():
+    class Cell:
+        pass
+    synapse = Synapse(Cell(), Cell(), efficacy=0.5, plasticity=[PairSTDP()])
+    group = SynapseGroup([0], [0], 1, 1, efficacy=0.5, plasticity=[PairSTDP()])
+    for step, (pre_spiked, post_spiked) in enumerate([(True, False), (False, True), (False, False), (True, False)]):
+        synapse.update_synaptic_parameters(pre_spiked, post_spiked, float(step))
+        group.update_synaptic_parameters([0] if pre_spiked else [], [0] if post_spiked else [], float(step))
+    assert synapse.efficacy == pytest.approx(group.efficacy[0])
+    assert synapse.efficacy != 0.5
+
+def test_plot_weights_accepts_ragged_rows():
+    fig = plot_synaptic_weights_over_time([[0.1, 0.2, 0.3], [0.5, 0.4]], times=np.array([0.0, 1.0, 2.0]), show=False)
+    assert len(fig.axes[0].lines) == 2
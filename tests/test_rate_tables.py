@@ -0,0 +1,66 @@
+# tests/test_rate_tables.py
+
+import numpy as np
+import pytest
+import rate_tables
+from k_channel import PotassiumChannel
+from na_channel import SodiumChannel
+from rate_tables import RateTable, channel_rates, get_rate_table
+
+def test_linoid_rates_match_closed_form_away_from_singularity():
+    V = np.linspace(-99.0, 99.0, 397) + 0.013
+    np.testing.assert_allclose(rate_tables.alpha_m(V), 0.1 * (V + 40) / (1 - np.exp(-(V + 40) / 10)), rtol=1e-12)
+    np.testing.assert_allclose(rate_tables.alpha_n(V), 0.01 * (V + 55) / (1 - np.exp(-(V + 55) / 10)), rtol=1e-12)
+
+def test_linoid_rates_take_their_limit_at_the_singularity():
+    assert rate_tables.alpha_m(-40.0) == pytest.approx(1.0)
+    assert rate_tables.alpha_n(-55.0) == pytest.approx(0.1)
+    assert rate_tables.alpha_c(-50.0) == pytest.approx(0.1)
+
+@pytest.mark.parametrize('method, tolerance', [('linear', 1e-4), ('cubic', 1e-8)])
+def test_table_interpolates_the_rates(method, tolerance):
+    table = RateTable(channel_rates('hodgkin_huxley'), dv=0.05, method=method)
+    V = np.random.default_rng(0).uniform(-90.0, 60.0, 1000)
+    for name, function in channel_rates('hodgkin_huxley'):
+        np.testing.assert_allclose(table(name, V), function(V), rtol=tolerance, atol=tolerance)
+
+def test_table_reproduces_grid_points_and_clamps_outside():
+    table = RateTable(channel_rates('potassium'), v_min=-80.0, v_max=40.0, dv=0.5)
+    np.testing.assert_allclose(table.evaluate(table.grid), table.values, rtol=1e-12)
+    np.testing.assert_allclose(table.evaluate([-200.0, 200.0]), table.values[:, [0, -1]])
+
+def test_evaluate_subset_keeps_requested_order():
+    table = get_rate_table('sodium')
+    V = np.array([-70.0, -20.0])
+    np.testing.assert_array_equal(table.evaluate(V, ('beta_h', 'alpha_m')),
+                                  table.evaluate(V)[[table.index['beta_h'], table.index['alpha_m']]])
+
+def test_inf_tau_form():
+    table = get_rate_table('potassium', form='inf_tau', method='cubic')
+    V = np.array([-65.0, -30.0])
+    a, b = rate_tables.alpha_n(V), rate_tables.beta_n(V)
+    np.testing.assert_allclose(table.evaluate(V, ('n_inf', 'tau_n')), [a / (a + b), 1 / (a + b)], rtol=1e-7)
+
+def test_tables_are_shared():
+    assert get_rate_table('sodium') is get_rate_table('sodium')
+    assert get_rate_table('sodium') is not get_rate_table('sodium', method='cubic')
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        channel_rates('chloride')
+    with pytest.raises(ValueError):
+        channel_rates('sodium', form='tau')
+    with pytest.raises(ValueError):
+        RateTable(channel_rates('sodium'), method='quadratic')
+
+def test_channels_with_a_table_follow_the_closed_form():
+    exact, tabulated = SodiumChannel(), SodiumChannel(rate_table=get_rate_table('sodium', dv=0.01))
+    for V in np.linspace(-80.0, 30.0, 200):
+        exact.update_gating_variables(V, 0.01)
+        tabulated.update_gating_variables(V, 0.01)
+    assert tabulated.m == pytest.approx(exact.m, abs=1e-5)
+    assert tabulated.h == pytest.approx(exact.h, abs=1e-5)
+    channel = PotassiumChannel(gating='exponential')
+    channel.update_gating_variables(-65.0, 1e6)
+    a, b = rate_tables.alpha_n(-65.0), rate_tables.beta_n(-65.0)
+    assert channel.n == pytest.approx(a / (a + b))
@@ -0,0 +1,53 @@
+# tests/test_signal_processing.py
+
+import numpy as np
+import pytest
+from scipy.signal import butter, sosfilt, sosfiltfilt
+from signal_processing import SignalProcessing, StreamingFilter, _butter_sos, design_filter, filter_signal
+
+def make_signals(n_channels=3, n_samples=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(size=(n_channels, n_samples))
+
+def test_design_is_cached_and_copied():
+    _butter_sos.cache_clear()
+    sos = design_filter('band', [300, 3000], 20000, order=4)
+    np.testing.assert_array_equal(sos, butter(4, (300, 3000), btype='band', fs=20000, output='sos'))
+    sos[:] = 0.0
+    again = design_filter('band', (300.0, 3000.0), 20000.0, order=4)
+    assert _butter_sos.cache_info().hits == 1
+    assert np.any(again != 0.0)
+    design_filter('low', np.float64(100.0), 1000)
+    design_filter('low', [100], 1000)
+    assert _butter_sos.cache_info().hits == 2
+
+@pytest.mark.parametrize('zero_phase', [False, True])
+def test_filter_signal_filters_each_row(zero_phase):
+    data = make_signals()
+    sos = design_filter('low', 200.0, 2000.0)
+    filtered = filter_signal(data, sos, zero_phase)
+    reference = sosfiltfilt if zero_phase else sosfilt
+    for row, expected in zip(filtered, data):
+        np.testing.assert_allclose(row, reference(sos, expected), rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(filter_signal(data.T, sos, zero_phase, axis=0), filtered.T, rtol=1e-12, atol=1e-12)
+
+@pytest.mark.parametrize('shape', [(5000,), (3, 5000)])
+def test_streaming_filter_matches_one_call(shape):
+    data = make_signals()[0] if len(shape) == 1 else make_signals(n_channels=shape[0])
+    streaming = StreamingFilter('band', (30.0, 300.0), 2000.0, order=3)
+    edges = [0, 1, 17, 1000, 1001, 4096, 5000]
+    chunks = [streaming.process(data[..., a:b]) for a, b in zip(edges[:-1], edges[1:])]
+    np.testing.assert_allclose(np.concatenate(chunks, axis=-1), sosfilt(streaming.sos, data, axis=-1),
+                               rtol=1e-10, atol=1e-12)
+    streaming.reset()
+    np.testing.assert_array_equal(streaming.process(data), sosfilt(streaming.sos, data, axis=-1))
+
+def test_signal_processing_filters_batched_data():
+    data = make_signals()
+    processing = SignalProcessing(data)
+    lowpass = processing.butter_lowpass_filter(100.0, 1000.0, order=4)
+    bandpass = processing.bandpass_filter(10.0, 100.0, 1000.0, zero_phase=True)
+    assert lowpass.shape == bandpass.shape == data.shape
+    np.testing.assert_allclose(lowpass[1], SignalProcessing(data[1]).butter_lowpass_filter(100.0, 1000.0, order=4))
+    np.testing.assert_allclose(bandpass[2], sosfiltfilt(butter(5, (10.0, 100.0), btype='band', fs=1000.0,
+                                                                output='sos'), data[2]))
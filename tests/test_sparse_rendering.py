@@ -0,0 +1,91 @@
+# tests/test_sparse_rendering.py
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+import scipy.sparse
+import sparse_rendering
+from matplotlib.collections import LineCollection
+from sparse_rendering import RasterImage, connectivity_density, draw_raster, raster_image, spike_events
+from spike_analysis import SpikeTrains
+from synapse_model import SynapseGroup
+
+def make_trains(n_neurons=50, seed=0):
+    rng = np.random.default_rng(seed)
+    return [np.sort(rng.uniform(0, 1000, size=rng.integers(0, 60))) for _ in range(n_neurons)]
+
+def dense_density(matrix, rows, columns):
+    n_pre, n_post = matrix.shape
+    row_block = np.arange(n_pre) * rows // n_pre
+    column_block = np.arange(n_post) * columns // n_post
+    total = np.zeros((rows, columns))
+    np.add.at(total, (row_block[:, None], column_block[None, :]), matrix)
+    pairs = np.outer(np.bincount(row_block, minlength=rows), np.bincount(column_block, minlength=columns))
+    return total / pairs
+
+def test_spike_events_accepts_every_layout():
+    trains = make_trains(5)
+    neurons, times, n_neurons = spike_events(trains)
+    assert n_neurons == 5 and np.all(np.diff(neurons) >= 0)
+    np.testing.assert_array_equal(times, np.concatenate(trains))
+    csr = SpikeTrains.from_pairs(neurons, times, 5)
+    for other in (spike_events(csr), spike_events(dict(enumerate(trains)))):
+        np.testing.assert_array_equal(other[0], neurons)
+        np.testing.assert_array_equal(other[1], times)
+    neurons, times, n_neurons = spike_events({3: [1.0, 2.0], 1: [5.0]})
+    assert neurons.tolist() == [1, 3, 3] and n_neurons == 4
+
+@pytest.mark.parametrize('n_range, t_range, shape', [((0, 50), (0.0, 1000.0), (50, 200)),
+                                                      ((7, 31), (120.0, 480.0), (10, 33)),
+                                                      ((0, 50), (0.0, 1000.0), (1, 1))])
+def test_raster_image_matches_dense_binning(n_range, t_range, shape):
+    neurons, times, _ = spike_events(make_trains())
+    counts = raster_image(neurons, times, t_range, n_range, shape)
+    expected = np.zeros(shape, dtype=np.int64)
+    (t0, t1), (n0, n1) = t_range, n_range
+    for neuron, time in zip(neurons, times):
+        if n0 <= neuron < n1 and t0 <= time <= t1:
+            expected[(neuron - n0) * shape[0] // (n1 - n0), min(int((time - t0) * shape[1] / (t1 - t0)), shape[1] - 1)] += 1
+    np.testing.assert_array_equal(counts, expected)
+
+def test_draw_raster_switches_to_an_image():
+    trains = make_trains()
+    figure, ax = plt.subplots(figsize=(4, 3), dpi=100)
+    collection = draw_raster(ax, trains)
+    assert isinstance(collection, LineCollection)
+    assert len(collection.get_segments()) == sum(len(train) for train in trains)
+    ax.cla()
+    raster = draw_raster(ax, trains, max_segments=10)
+    assert isinstance(raster, RasterImage)
+    assert raster.image.get_array().count() > 0
+    assert raster.image.get_array().sum() == sum(len(train) for train in trains)
+    ax.set_xlim(100.0, 200.0)
+    ax.set_ylim(9.5, 19.5)
+    neurons, times, _ = spike_events(trains)
+    visible = (neurons >= 10) & (neurons < 20) & (times >= 100.0) & (times <= 200.0)
+    assert raster.image.get_array().sum() == np.count_nonzero(visible)
+    plt.close(figure)
+
+@pytest.mark.parametrize('chunk', [1 << 22, 16])
+@pytest.mark.parametrize('shape', [(1024, 1024), (7, 9), (1, 1)])
+def test_connectivity_density_matches_dense(monkeypatch, chunk, shape):
+    monkeypatch.setattr(sparse_rendering, 'CONNECTIVITY_CHUNK', chunk)
+    matrix = scipy.sparse.random(60, 45, density=0.1, random_state=3, format='csr')
+    dense = matrix.toarray()
+    rows, columns = min(shape[0], 60), min(shape[1], 45)
+    for connectivity in (matrix, dense):
+        density, row_edges, column_edges = connectivity_density(connectivity, shape, weighted=True)
+        np.testing.assert_allclose(density, dense_density(dense, rows, columns), rtol=1e-12)
+        assert row_edges[0] == 0 and row_edges[-1] == 60 and len(column_edges) == columns + 1
+    counts, _, _ = connectivity_density(matrix, shape)
+    np.testing.assert_allclose(counts, dense_density((dense != 0).astype(float), rows, columns), rtol=1e-12)
+
+def test_connectivity_density_of_a_synapse_group():
+    rng = np.random.default_rng(4)
+    pre, post = rng.integers(0, 30, size=200), rng.integers(0, 20, size=200)
+    efficacy = rng.random(200)
+    group = SynapseGroup(pre, post, 30, 20, efficacy=efficacy)
+    dense = np.zeros((30, 20))
+    np.add.at(dense, (pre, post), efficacy)
+    density, _, _ = connectivity_density(group, (6, 4), weighted=True)
+    np.testing.assert_allclose(density, dense_density(dense, 6, 4), rtol=1e-12)
@@ -0,0 +1,60 @@
+# tests/test_spectral.py
+
+import numpy as np
+import pytest
+from scipy import signal
+from spectral import SpectrogramAccumulator, WelchAccumulator, spectrogram, welch_psd
+
+def make_signals(n_channels=5, n_samples=10007, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n_samples) / 1000.0
+    return np.sin(2 * np.pi * (10 + 5 * np.arange(n_channels))[:, None] * t) + rng.normal(size=(n_channels, n_samples))
+
+@pytest.mark.parametrize('settings', [{}, {'nperseg': 300, 'noverlap': 100, 'window': 'hamming'},
+                                      {'nperseg': 129, 'detrend': False, 'scaling': 'spectrum'}])
+@pytest.mark.parametrize('chunk_size', [50, 1 << 20])
+def test_welch_matches_scipy(settings, chunk_size):
+    data = make_signals()
+    f, psd = welch_psd(data, 1000.0, n_workers=3, chunk_size=chunk_size, **settings)
+    f_ref, psd_ref = signal.welch(data, 1000.0, **settings)
+    np.testing.assert_allclose(f, f_ref)
+    np.testing.assert_allclose(psd, psd_ref, rtol=1e-10, atol=1e-16)
+
+def test_welch_time_axis_and_single_signal():
+    data = make_signals()
+    _, psd = welch_psd(data, 1000.0)
+    np.testing.assert_allclose(welch_psd(np.ascontiguousarray(data.T), 1000.0, axis=0)[1], psd, rtol=1e-12)
+    np.testing.assert_allclose(welch_psd(data[2], 1000.0)[1], psd[2], rtol=1e-12)
+
+@pytest.mark.parametrize('chunk_size', [70, 1 << 20])
+def test_spectrogram_matches_scipy(chunk_size):
+    data = make_signals()
+    f, t, columns = spectrogram(data, 1000.0, nperseg=200, n_workers=2, chunk_size=chunk_size)
+    f_ref, t_ref, columns_ref = signal.spectrogram(data, 1000.0, nperseg=200)
+    np.testing.assert_allclose(f, f_ref)
+    np.testing.assert_allclose(t, t_ref)
+    np.testing.assert_allclose(columns, columns_ref, rtol=1e-10, atol=1e-16)
+
+def test_averaged_spectrogram_columns():
+    data = make_signals(n_channels=2)
+    _, t_ref, columns_ref = signal.spectrogram(data, 1000.0, nperseg=128)
+    _, t, columns = spectrogram(data, 1000.0, nperseg=128, average=3)
+    n = columns_ref.shape[-1] // 3
+    np.testing.assert_allclose(columns, columns_ref[..., :3 * n].reshape(2, -1, n, 3).mean(axis=-1), rtol=1e-10)
+    np.testing.assert_allclose(t, t_ref[:3 * n].reshape(n, 3).mean(axis=-1))
+
+def test_accumulators_stream_columns():
+    data = make_signals(n_channels=2, n_samples=3000)
+    accumulator = SpectrogramAccumulator(1000.0, nperseg=256, average=2)
+    times = np.concatenate([accumulator.update(data[:, start:start + 333])[0] for start in range(0, 3000, 333)])
+    _, all_times, columns = accumulator.result()
+    np.testing.assert_allclose(times, all_times)
+    assert columns.shape[-1] == len(times)
+    welch = WelchAccumulator(1000.0, nperseg=256)
+    with pytest.raises(ValueError):
+        welch.result()
+    welch.update(data[:, :100])
+    with pytest.raises(ValueError):
+        welch.result()
+    with pytest.raises(ValueError):
+        WelchAccumulator(1000.0, scaling='power')
@@ -0,0 +1,90 @@
+# tests/test_spike_analysis.py
+
+import numpy as np
+import pytest
+from spike_analysis import SpikeAnalysis, SpikeTrains, detect_threshold_crossings
+
+def reference_spikes(trace, threshold, refractory=0, align='crossing'):
+    """Spikes of one channel, found sample by sample."""
+    spikes, last = [], None
+    for t in range(1, len(trace)):
+        if not (trace[t - 1] < threshold <= trace[t]):
+            continue
+        if last is not None and t - last < refractory:
+            continue
+        last = t
+        if align == 'crossing':
+            spikes.append(t)
+        else:
+            end = t
+            while end < len(trace) and trace[end] >= threshold:
+                end += 1
+            spikes.append(t + int(np.argmax(trace[t:end])))
+    return spikes
+
+def make_traces(n_channels=6, n_samples=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    # Smoothed noise crosses the threshold in runs of several samples; rounding creates tied peaks
+    noise = rng.normal(size=(n_channels, n_samples + 8))
+    kernel = np.ones(8) / 8
+    return np.round(np.array([np.convolve(row, kernel, mode='valid')[:n_samples] for row in noise]) * 20) / 20
+
+@pytest.mark.parametrize('align', ['crossing', 'peak'])
+@pytest.mark.parametrize('refractory', [0, 25])
+@pytest.mark.parametrize('block_size', [60, 1 << 22])
+def test_batched_detection_matches_reference(align, refractory, block_size):
+    data = make_traces()
+    thresholds = np.linspace(0.1, 0.6, len(data))
+    spikes = detect_threshold_crossings(data, thresholds, refractory, align, block_size=block_size)
+    assert len(spikes) == len(data)
+    for channel, trace in enumerate(data):
+        assert spikes[channel].tolist() == reference_spikes(trace, thresholds[channel], refractory, align)
+
+def test_excursion_open_at_the_end_reports_its_peak():
+    data = np.array([[0.0, 2.0, 3.0, 1.0, 0.0, 5.0, 7.0], [0.0] * 7])
+    assert detect_threshold_crossings(data, 0.5, align='peak', block_size=6)[0].tolist() == [2, 6]
+    assert detect_threshold_crossings(data, 0.5)[1].tolist() == []
+
+def test_spike_trains_csr_operations():
+    trains = SpikeTrains.from_pairs([2, 0, 2, 0, 2], [9, 4, 1, 2, 5], n_channels=4)
+    assert trains.indptr.tolist() == [0, 2, 2, 5, 5]
+    assert [train.tolist() for train in trains] == [[2, 4], [], [1, 5, 9], []]
+    assert trains.counts.tolist() == [2, 0, 3, 0]
+    assert trains.channels.tolist() == [0, 0, 2, 2, 2]
+    assert [isi.tolist() for isi in trains.diff().to_list()] == [[2], [], [4, 4], []]
+    times = np.arange(10) * 0.5
+    assert trains.lookup(times)[2].tolist() == [0.5, 2.5, 4.5]
+
+def test_spike_analysis_batched_results():
+    data = make_traces(n_channels=3, n_samples=1000)
+    time = np.arange(1000) * 0.1
+    analysis = SpikeAnalysis(data, threshold=0.3)
+    spikes = analysis.detect_spikes()
+    assert analysis.detect_spikes() is spikes
+    np.testing.assert_array_equal(analysis.spike_rate(100.0), spikes.counts / 0.1)
+    isis = analysis.calculate_isis(time)
+    for channel in range(3):
+        np.testing.assert_allclose(isis[channel], np.diff(time[spikes[channel]]))
+    hist, _ = analysis.isi_histogram(bins=10)
+    assert hist.sum() == len(spikes.diff().data)
+    analysis.threshold = 0.5
+    assert analysis.detect_spikes().counts.sum() < spikes.counts.sum()
+
+def test_spike_analysis_single_trace():
+    trace = np.array([-70.0, -40.0, -70.0, -60.0, -30.0, -65.0])
+    analysis = SpikeAnalysis(trace, threshold=-55)
+    assert analysis.detect_spikes().tolist() == [1, 4]
+    np.testing.assert_array_equal(analysis.calculate_isis(np.arange(6) * 2.0), [6.0])
+    assert analysis.spike_rate(1000.0) == 2.0
+
+@pytest.mark.parametrize('align, refractory', [('crossing', 0), ('peak', 0), ('crossing', 25), ('peak', 25)])
+def test_single_trace_matches_its_batched_row(align, refractory):
+    trace = make_traces(n_channels=1, n_samples=1000)[0]
+    time = np.arange(1000) * 0.1
+    single = SpikeAnalysis(trace, threshold=0.3, refractory=refractory, align=align)
+    batched = SpikeAnalysis(trace[np.newaxis, :], threshold=0.3, refractory=refractory, align=align)
+    assert single.detect_spikes().tolist() == reference_spikes(trace, 0.3, refractory, align)
+    np.testing.assert_array_equal(single.detect_spikes(), batched.detect_spikes()[0])
+    np.testing.assert_allclose(single.calculate_isis(time), batched.calculate_isis(time)[0])
+    assert single.spike_rate(100.0) == batched.spike_rate(100.0)[0]
+    np.testing.assert_array_equal(single.isi_histogram(bins=10)[0], batched.isi_histogram(bins=10)[0])
@@ -0,0 +1,93 @@
+# tests/test_spike_store.py
+
+import numpy as np
+import pytest
+from spike_store import SpikeStore, UINT_DTYPES
+
+def make_events(n_steps=400, n_neurons=300, rate=0.05, seed=0):
+    rng = np.random.default_rng(seed)
+    steps = []
+    for step in range(n_steps):
+        ids = np.flatnonzero(rng.random(n_neurons) < rate)
+        steps.append((rng.permutation(ids), np.full(len(ids), step * 0.1)))
+    return steps
+
+def brute_force(steps, neurons=None, t0=None, t1=None, resolution=1e-3):
+    ids = np.concatenate([s[0] for s in steps])
+    ticks = np.rint(np.concatenate([s[1] for s in steps]) / resolution).astype(np.int64)
+    keep = np.ones(len(ids), dtype=bool)
+    if neurons is not None:
+        keep &= (ids >= neurons[0]) & (ids < neurons[1])
+    if t0 is not None:
+        keep &= ticks >= np.ceil(t0 / resolution - 1e-9)
+    if t1 is not None:
+        keep &= ticks < np.ceil(t1 / resolution - 1e-9)
+    ids, ticks = ids[keep], ticks[keep]
+    order = np.lexsort((ids, ticks))
+    return ids[order], ticks[order] * resolution
+
+QUERIES = [{}, {'neurons': (10, 60)}, {'t0': 5.0, 't1': 12.35}, {'neurons': (250, 1000), 't0': 20.0},
+           {'neurons': (0, 1), 't1': 3.0}, {'t0': 100.0}, {'neurons': (400, 500)}]
+
+@pytest.mark.parametrize('query', QUERIES)
+def test_query_matches_brute_force(tmp_path, query):
+    steps = make_events()
+    with SpikeStore(tmp_path, mode='w', block_size=500) as store:
+        for ids, times in steps:
+            store.append(ids, times)
+    store = SpikeStore(tmp_path)
+    assert len(store) == sum(len(ids) for ids, _ in steps)
+    assert store._n_blocks > 1
+    ids, times = store.query(**query)
+    expected_ids, expected_times = brute_force(steps, **query)
+    np.testing.assert_array_equal(ids, expected_ids)
+    np.testing.assert_array_equal(times, expected_times)
+
+def test_pending_events_are_queried_and_readable_while_writing(tmp_path):
+    steps = make_events(n_steps=200)
+    store = SpikeStore(tmp_path, mode='w', block_size=300)
+    for ids, times in steps:
+        store.append(ids, times)
+    assert store._n_pending > 0
+    np.testing.assert_array_equal(store.query(neurons=(5, 80))[0], brute_force(steps, neurons=(5, 80))[0])
+    reader = SpikeStore(tmp_path)
+    assert len(reader) == store._n_events == store._n_blocks * 300
+    store.close()
+    assert len(SpikeStore(tmp_path)) == len(store)
+
+def test_append_mode_continues_and_drops_partial_blocks(tmp_path):
+    steps = make_events(n_steps=300)
+    with SpikeStore(tmp_path, mode='w', block_size=256) as store:
+        for ids, times in steps[:150]:
+            store.append(ids, times)
+    # Bytes of an interrupted block write are discarded when the store is reopened
+    with open(tmp_path / 'spikes.bin', 'ab') as f:
+        f.write(b'\x00' * 37)
+    with SpikeStore(tmp_path, mode='a') as store:
+        for ids, times in steps[150:]:
+            store.append(ids, times)
+    ids, times = SpikeStore(tmp_path).query()
+    expected_ids, expected_times = brute_force(steps)
+    np.testing.assert_array_equal(ids, expected_ids)
+    np.testing.assert_array_equal(times, expected_times)
+
+def test_columns_use_the_smallest_type(tmp_path):
+    with SpikeStore(tmp_path, mode='w', resolution=0.1, block_size=4) as store:
+        store.append([3, 1, 2, 0], [0.0, 0.1, 0.2, 25.0])
+        store.append([70000, 0], [30.0, 30.0])
+    index = SpikeStore(tmp_path)._index
+    assert [UINT_DTYPES[code] for code in index['time_code']] == [np.dtype('<u1'), np.dtype('<u1')]
+    assert [UINT_DTYPES[code] for code in index['neuron_code']] == [np.dtype('<u1'), np.dtype('<u4')]
+    assert (tmp_path / 'spikes.bin').stat().st_size == 4 * 2 + 2 * 5
+
+def test_invalid_use_raises(tmp_path):
+    with pytest.raises(ValueError):
+        SpikeStore(tmp_path, mode='x')
+    with SpikeStore(tmp_path, mode='w', block_size=2) as store:
+        store.append([0, 1], [1.0, 2.0])
+        with pytest.raises(ValueError):
+            store.append([0], [0.5])
+    with pytest.raises(ValueError):
+        SpikeStore(tmp_path).append([0], [3.0])
+    ids, times = SpikeStore(tmp_path).query(t0=10.0)
+    assert len(ids) == 0 and len(times) == 0
@@ -0,0 +1,76 @@
+# tests/test_spike_trains.py
+
+import numpy as np
+import pytest
+import spike_trains
+from spike_analysis import SpikeTrains
+from spike_trains import as_spike_trains, cross_correlogram, cross_correlograms, psth, spike_triggered_average
+
+def make_trains(n_trains=6, duration=2000.0, seed=0):
+    rng = np.random.default_rng(seed)
+    return [np.sort(rng.uniform(0, duration, size=rng.integers(0, 300))) for _ in range(n_trains)]
+
+def brute_force_ccg(reference, target, window, bin_width, same):
+    n_bins = int(round(2 * window / bin_width))
+    counts = np.zeros(n_bins, dtype=np.int64)
+    for r, t_ref in enumerate(reference):
+        for t, t_target in enumerate(target):
+            b = int(np.floor((t_target - t_ref + window) / bin_width))
+            if 0 <= b < n_bins and not (same and r == t):
+                counts[b] += 1
+    return counts
+
+@pytest.mark.parametrize('batch', [1 << 22, 50])
+def test_cross_correlograms_match_brute_force(monkeypatch, batch):
+    monkeypatch.setattr(spike_trains, 'SPIKE_BATCH', batch)
+    trains = make_trains()
+    trains[4] = np.array([])
+    pairs = [(0, 1), (1, 0), (2, 2), (3, 5), (4, 0), (0, 4), (5, 5)]
+    bin_edges, counts = cross_correlograms(trains, pairs, 50.0, 2.5)
+    np.testing.assert_allclose(bin_edges, np.arange(-50.0, 50.1, 2.5))
+    for (i, j), row in zip(pairs, counts):
+        np.testing.assert_array_equal(row, brute_force_ccg(trains[i], trains[j], 50.0, 2.5, i == j))
+
+def test_single_correlogram_and_empty_trains():
+    reference, target = np.array([10.0, 20.0]), np.array([9.0, 12.0, 30.0])
+    bin_edges, counts = cross_correlogram(reference, target, 10.0, 5.0)
+    assert bin_edges.tolist() == [-10.0, -5.0, 0.0, 5.0, 10.0]
+    assert counts.tolist() == [1, 1, 1, 0]
+    _, counts = cross_correlograms([[], []], [(0, 1)], 10.0, 1.0)
+    assert counts.shape == (1, 20) and not counts.any()
+
+@pytest.mark.parametrize('batch', [1 << 22, 7])
+def test_psth_matches_brute_force(monkeypatch, batch):
+    monkeypatch.setattr(spike_trains, 'SPIKE_BATCH', batch)
+    trains = make_trains()
+    events = np.random.default_rng(1).uniform(0, 2000, size=15)
+    bin_edges, rates = psth(trains, events, 20.0, 80.0, 4.0)
+    assert len(bin_edges) == 26
+    for train, row in zip(trains, rates):
+        counts = np.zeros(25)
+        for event in events:
+            relative = train - event
+            bins = np.floor((relative[(relative >= -20.0) & (relative < 80.0)] + 20.0) / 4.0).astype(int)
+            np.add.at(counts, bins[bins < 25], 1)
+        np.testing.assert_allclose(row, counts / (len(events) * 4.0 / 1000.0))
+
+def test_spike_triggered_average_layouts(monkeypatch):
+    monkeypatch.setattr(spike_trains, 'SPIKE_BATCH', 64)
+    rng = np.random.default_rng(2)
+    signal = rng.normal(size=(4, 500))
+    triggers = [np.array([2, 50, 100, 495]), np.array([], dtype=np.int64), np.array([10, 11, 300]),
+                np.array([5])]
+
+    offsets, sta = spike_triggered_average(signal[0], [3, 50, 100, 497, 498], 5, 3)
+    assert offsets.tolist() == list(range(-5, 3))
+    np.testing.assert_allclose(sta, np.mean([signal[0, t - 5:t + 3] for t in (50, 100, 497)], axis=0))
+
+    _, sta = spike_triggered_average(signal, np.array([50, 100]), 5, 3)
+    np.testing.assert_allclose(sta, np.mean([signal[:, t - 5:t + 3] for t in (50, 100)], axis=0))
+
+    _, sta = spike_triggered_average(signal, as_spike_trains(triggers), 5, 3)
+    assert isinstance(as_spike_trains(triggers), SpikeTrains)
+    np.testing.assert_allclose(sta[0], np.mean([signal[0, t - 5:t + 3] for t in (50, 100, 495)], axis=0))
+    assert np.isnan(sta[1]).all()
+    np.testing.assert_allclose(sta[2], np.mean([signal[2, t - 5:t + 3] for t in (10, 11, 300)], axis=0))
+    np.testing.assert_allclose(sta[3], signal[3, 0:8])
@@ -0,0 +1,65 @@
+# tests/test_state_history.py
+
+import numpy as np
+import pytest
+from fhn_model import FitzHughNagumoModel
+from hh_model import HodgkinHuxleyNeuron
+from state_history import StateHistory
+
+def test_full_mode_grows_and_keeps_every_sample():
+    history = StateHistory(('v', 'w'), capacity=2)
+    for i in range(10):
+        history.append(i, -i)
+    assert len(history) == 10
+    np.testing.assert_array_equal(history.get('v'), np.arange(10))
+    np.testing.assert_array_equal(history['w'], -np.arange(10))
+    assert history.last('v') == 9
+
+def test_ring_mode_keeps_the_last_samples_in_order():
+    history = StateHistory(('v',), mode='ring', maxlen=4)
+    for i in range(3):
+        history.append(i)
+    np.testing.assert_array_equal(history.get('v'), [0, 1, 2])
+    for i in range(3, 11):
+        history.append(i)
+    assert len(history) == 4
+    np.testing.assert_array_equal(history.get('v'), [7, 8, 9, 10])
+    assert history.last('v') == 10
+
+def test_off_mode_records_nothing():
+    history = StateHistory(('v',), mode='off')
+    history.append(1.0)
+    assert len(history) == 0
+    with pytest.raises(IndexError):
+        history.last('v')
+
+def test_population_samples_and_clear():
+    history = StateHistory(('v',), capacity=1, shape=(3,))
+    for i in range(5):
+        history.append(np.full(3, i))
+    assert history.get('v').shape == (5, 3)
+    history.clear()
+    assert len(history) == 0
+    assert history._buffer.shape == (1, 1, 3)
+
+def test_invalid_modes():
+    with pytest.raises(ValueError):
+        StateHistory(('v',), mode='sparse')
+    with pytest.raises(ValueError):
+        StateHistory(('v',), mode='ring')
+
+def test_models_record_their_state():
+    model = FitzHughNagumoModel(I_ext=0.5)
+    for _ in range(20):
+        model.update(0.1)
+    assert len(model.v) == 21
+    assert model.v[-1] == model.get_state()[0]
+    ring = FitzHughNagumoModel(I_ext=0.5, history='ring', history_length=5)
+    for _ in range(20):
+        ring.update(0.1)
+    np.testing.assert_array_equal(ring.v, model.v[-5:])
+    neuron = HodgkinHuxleyNeuron(history='full')
+    for _ in range(10):
+        neuron.update(10.0, 0.01)
+    assert neuron.history.last('V_m') == neuron.V_m
+    assert len(neuron.history) == 11
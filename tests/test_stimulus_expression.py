@@ -0,0 +1,88 @@
+# tests/test_stimulus_expression.py
+
+import numpy as np
+import pytest
+import stimulus_expression
+from current_stimulus import CurrentStimulus
+from patterned_stimulus import PatternedStimulus
+from stimulus_expression import Constant, Noise, Sampled, Sine, TimeFunction, sample_indices
+
+def expressions():
+    ramp = TimeFunction(lambda t: t / 100.0)
+    return {
+        'sine': Sine(2.0, 40.0, phase=0.3),
+        'noise': Noise(1.0, 0.5, seed=7),
+        'windowed': (Constant(3.0) + Noise(seed=1)).window(12.5, 180.0),
+        'delayed': ramp.delay(25.0) * Sine(1.0, 5.0),
+        'repeated': (ramp.window(0, 10.0) - 1).repeat(30.0, count=4),
+        'sampled': Sampled(np.arange(20.0), 7.5) / 2,
+        'cached': (Noise(seed=3) + 1).cached(maxsize=2),
+    }
+
+@pytest.mark.parametrize('name', sorted(expressions()))
+@pytest.mark.parametrize('chunk_size', [1, 17, 4096])
+def test_values_do_not_depend_on_the_chunks(monkeypatch, name, chunk_size):
+    monkeypatch.setattr(stimulus_expression, 'NOISE_BLOCK', 64)
+    expression = expressions()[name]
+    whole = expression.evaluate(0.0, 300.0, 0.25)
+    assert len(whole) == 1200
+    times, values = zip(*expression.chunks(0.0, 300.0, 0.25, chunk_size=chunk_size))
+    np.testing.assert_array_equal(np.concatenate(times), np.arange(1200) * 0.25)
+    np.testing.assert_array_equal(np.concatenate(values), whole)
+    np.testing.assert_array_equal(expression.evaluate(100.1, 200.0, 0.25), whole[401:800])
+
+def test_transformations():
+    ramp = TimeFunction(lambda t: t)
+    np.testing.assert_array_equal(ramp.window(2.0, 4.0).evaluate(0, 6, 1.0), [0, 0, 2, 3, 0, 0])
+    np.testing.assert_array_equal(ramp.delay(2.0).evaluate(0, 5, 1.0), [-2, -1, 0, 1, 2])
+    np.testing.assert_array_equal(ramp.repeat(3.0, count=2).evaluate(0, 8, 1.0), [0, 1, 2, 0, 1, 2, 0, 0])
+    np.testing.assert_array_equal(Sampled([1.0, 2.0], 2.0).evaluate(-1, 6, 1.0), [0, 1, 1, 2, 2, 0, 0])
+    np.testing.assert_allclose(Sine(1.0, 250.0).evaluate(0, 4, 1.0), [0, 1, 0, -1], atol=1e-12)
+    assert sample_indices(0.1, 0.3, 0.1).tolist() == [1, 2]
+    assert np.all(-Constant(2.0).evaluate(0, 3, 1.0) == -2.0)
+
+def test_noise_blocks_are_independent_and_seeded():
+    noise = Noise(0.0, 1.0, seed=5)
+    values = noise.evaluate(-5000.0, 10000.0, 1.0)
+    assert abs(values.mean()) < 0.05 and abs(values.std() - 1.0) < 0.05
+    np.testing.assert_array_equal(noise.evaluate(9000.0, 9100.0, 1.0), values[14000:14100])
+    assert not np.array_equal(Noise(seed=6).evaluate(0, 100, 1.0), values[5000:5100])
+
+def test_cached_chunks_are_reused():
+    calls = []
+    cached = TimeFunction(lambda t: calls.append(len(t)) or t * 2).cached(maxsize=2)
+    first = cached.evaluate(0, 10, 1.0)
+    assert cached.evaluate(0, 10, 1.0) is first
+    assert not first.flags.writeable
+    cached.evaluate(10, 20, 1.0)
+    cached.evaluate(20, 30, 1.0)
+    cached.evaluate(0, 10, 1.0)
+    assert calls == [10, 10, 10, 10]
+
+@pytest.mark.parametrize('pattern_type', ['burst', 'oscillatory'])
+@pytest.mark.parametrize('duration', [100, 1000])
+def test_patterns_match_their_expression_at_one_millisecond(pattern_type, duration):
+    stimulus = PatternedStimulus(duration, 2.5, pattern_type, frequency=13)
+    signal = stimulus.signal
+    assert len(signal) == duration
+    np.testing.assert_array_equal(signal, stimulus.expression().evaluate(0, duration, 1.0))
+    t = np.arange(duration) / 1000.0
+    expected = np.sin(2 * np.pi * 13 * t)
+    if pattern_type == 'burst':
+        assert set(np.unique(signal)) <= {0.0, 2.5}
+        clear = np.abs(expected) > 1e-9
+        np.testing.assert_array_equal(signal[clear], 2.5 * (expected[clear] > 0))
+    else:
+        np.testing.assert_allclose(signal, 2.5 * expected, atol=1e-12)
+    assert np.all(stimulus.expression().evaluate(duration, duration + 50, 1.0) == 0)
+
+def test_random_pattern_and_errors():
+    stimulus = PatternedStimulus(500, 2.0, 'random')
+    assert len(stimulus.signal) == 500
+    np.testing.assert_array_equal(PatternedStimulus(500, 2.0, 'random').signal, stimulus.signal)
+    chunked = np.concatenate([values for _, values in stimulus.expression().chunks(0, 500, 1.0, chunk_size=33)])
+    np.testing.assert_array_equal(chunked, stimulus.expression().evaluate(0, 500, 1.0))
+    with pytest.raises(ValueError):
+        PatternedStimulus(10, 1.0, 'square').signal
+    current = CurrentStimulus(20, 0.5, start_time=5).expression().evaluate(0, 30, 1.0)
+    np.testing.assert_array_equal(current, np.where((np.arange(30) >= 5) & (np.arange(30) < 25), 0.5, 0.0))
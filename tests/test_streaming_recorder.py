@@ -0,0 +1,76 @@
+# tests/test_streaming_recorder.py
+
+import threading
+import time
+
+import numpy as np
+import pytest
+from data_recorder import DataRecorder, StreamingDataRecorder, open_recording, read_manifest
+
+def record_steps(recorders, n_steps, n_neurons=4):
+    rng = np.random.default_rng(0)
+    for step in range(n_steps):
+        V, m = rng.normal(size=n_neurons), rng.random(n_neurons)
+        for recorder in recorders:
+            recorder.record(step * 0.025, V, {'m': m})
+
+def test_streaming_matches_in_memory_recording(tmp_path):
+    memory = DataRecorder(neurons=[0, 3], decimation=2, chunk_size=16, dtype=np.float32)
+    with StreamingDataRecorder(tmp_path, dt=0.025, neurons=[0, 3], decimation=2, chunk_size=16,
+                               dtype=np.float32) as streaming:
+        record_steps([memory, streaming], 1001)
+    arrays = open_recording(tmp_path)
+    for name in ('time', 'V_m', 'm'):
+        assert isinstance(arrays[name], np.memmap)
+        np.testing.assert_array_equal(arrays[name], memory.get(name))
+    manifest = read_manifest(tmp_path)
+    assert manifest['complete'] and manifest['dt'] == 0.025 and manifest['neurons'] == [0, 3]
+    assert manifest['variables']['V_m'] == {'file': 'V_m.dat', 'dtype': '<f4', 'shape': [2], 'rows': 501}
+
+def test_fresh_recording_can_be_opened(tmp_path):
+    recorder = StreamingDataRecorder(tmp_path, chunk_size=1000)
+    assert open_recording(tmp_path) == {}
+    recorder.record(0.0, np.zeros(3))
+    arrays = open_recording(tmp_path)
+    assert arrays['V_m'].shape == (0, 3)
+    assert not read_manifest(tmp_path)['complete']
+    recorder.close()
+
+def test_in_progress_recording_and_get(tmp_path):
+    recorder = StreamingDataRecorder(tmp_path, chunk_size=10)
+    record_steps([recorder], 35)
+    recorder.flush()
+    assert open_recording(tmp_path)['V_m'].shape == (35, 4)
+    np.testing.assert_array_equal(recorder.get('time'), np.arange(35) * 0.025)
+    record_steps([recorder], 5)
+    recorder.close()
+    assert len(open_recording(tmp_path)['m']) == 40
+
+def test_recording_blocks_when_the_writer_falls_behind(tmp_path):
+    recorder = StreamingDataRecorder(tmp_path, chunk_size=2, max_pending=2)
+    recorder.record(0.0, 0.0)
+    # The writer takes the lock after writing each chunk, so holding it stalls the writer
+    recorder._lock.acquire()
+    producer = threading.Thread(target=lambda: [recorder.record(0.0, 0.0) for _ in range(40)])
+    producer.start()
+    time.sleep(0.3)
+    assert producer.is_alive()
+    assert recorder._queue.qsize() == 2
+    recorder._lock.release()
+    producer.join(5.0)
+    assert not producer.is_alive()
+    recorder.close()
+    assert len(open_recording(tmp_path)['time']) == 41
+
+def test_reset_replaces_the_recording(tmp_path):
+    recorder = StreamingDataRecorder(tmp_path, chunk_size=4)
+    recorder.record(0.0, 1.0, {'extra': 2.0})
+    recorder.close()
+    assert (tmp_path / 'extra.dat').exists()
+    recorder.reset()
+    assert not (tmp_path / 'extra.dat').exists()
+    recorder.record(0.0, 1.0)
+    recorder.close()
+    assert set(open_recording(tmp_path)) == {'time', 'V_m'}
+    with pytest.raises(ValueError):
+        StreamingDataRecorder(tmp_path, max_pending=0)
@@ -0,0 +1,74 @@
+# tests/test_streaming_spike_detector.py
+
+import numpy as np
+import pytest
+from spike_analysis import StreamingSpikeDetector, detect_threshold_crossings
+
+def make_traces(n_channels=5, n_samples=4000, seed=1):
+    rng = np.random.default_rng(seed)
+    noise = rng.normal(size=(n_channels, n_samples + 6))
+    kernel = np.ones(6) / 6
+    return np.round(np.array([np.convolve(row, kernel, mode='valid')[:n_samples] for row in noise]) * 20) / 20
+
+def stream(detector, data, chunk_sizes):
+    """Feed data to the detector in chunks of the given sizes, cycling through them."""
+    channels, indices = [], []
+    start, k = 0, 0
+    while start < data.shape[1]:
+        size = chunk_sizes[k % len(chunk_sizes)]
+        channel, index = detector.process(data[:, start:start + size])
+        channels.append(channel)
+        indices.append(index)
+        start += size
+        k += 1
+    channel, index = detector.finish()
+    return np.concatenate(channels + [channel]), np.concatenate(indices + [index])
+
+@pytest.mark.parametrize('align', ['crossing', 'peak'])
+@pytest.mark.parametrize('refractory', [0, 30])
+@pytest.mark.parametrize('chunk_sizes', [[1], [7, 1, 64], [4000]])
+def test_streaming_matches_batch(align, refractory, chunk_sizes):
+    data = make_traces()
+    batch = detect_threshold_crossings(data, 0.4, refractory, align)
+    detector = StreamingSpikeDetector(len(data), 0.4, refractory, align)
+    channels, indices = stream(detector, data, chunk_sizes)
+    streamed = detector.spike_trains()
+    np.testing.assert_array_equal(streamed.indptr, batch.indptr)
+    np.testing.assert_array_equal(streamed.data, batch.data)
+    assert len(indices) == len(batch.data)
+    assert detector.n_samples == data.shape[1]
+
+def test_running_statistics_match_spike_trains():
+    data = make_traces()
+    detector = StreamingSpikeDetector(len(data), 0.3, dt=0.1)
+    stream(detector, data, [37])
+    trains = detector.spike_trains()
+    np.testing.assert_array_equal(detector.counts, trains.counts)
+    np.testing.assert_allclose(detector.spike_rate(), trains.counts / (data.shape[1] * 0.1 / 1000.0))
+    for channel, train in enumerate(trains):
+        isi = np.diff(train) * 0.1
+        assert detector.mean_isi()[channel] == pytest.approx(isi.mean())
+        assert detector.isi_cv()[channel] == pytest.approx(isi.std() / isi.mean())
+
+def test_reset_statistics_keeps_detection_state():
+    data = make_traces(n_channels=2)
+    detector = StreamingSpikeDetector(2, 0.3, keep_spikes=False)
+    detector.process(data[:, :2000])
+    detector.reset_statistics()
+    detector.process(data[:, 2000:])
+    detector.finish()
+    trains = detect_threshold_crossings(data, 0.3)
+    late = [train[train >= 2000] for train in trains]
+    np.testing.assert_array_equal(detector.counts, [len(train) for train in late])
+    # Intervals spanning the reset are not counted
+    np.testing.assert_allclose(detector.mean_isi(), [np.diff(train).mean() for train in late])
+    assert detector.spike_rate()[0] == pytest.approx(len(late[0]) / 2.0)
+    with pytest.raises(ValueError):
+        detector.spike_trains()
+
+def test_channels_without_spikes():
+    detector = StreamingSpikeDetector(2, 1.0)
+    channels, indices = detector.process(np.zeros((2, 10)))
+    assert len(channels) == len(indices) == 0
+    assert np.isnan(detector.mean_isi()).all()
+    assert [len(train) for train in detector.spike_trains()] == [0, 0]
@@ -0,0 +1,65 @@
+# tests/test_synapse_group.py
+
+import numpy as np
+import pytest
+from synapse_model import Synapse, SynapseGroup
+
+def random_group(n=40, n_synapses=300, seed=0, **kwargs):
+    rng = np.random.default_rng(seed)
+    pre = rng.integers(0, n, n_synapses)
+    post = rng.integers(0, n, n_synapses)
+    return pre, post, SynapseGroup(pre, post, n, n, **kwargs)
+
+def test_csr_layout_and_slices():
+    pre, post, group = random_group()
+    assert np.all(np.diff(group.pre) >= 0)
+    for neuron in (0, 7, 39):
+        np.testing.assert_array_equal(group.pre[group.indptr[neuron]:group.indptr[neuron + 1]], neuron)
+    spiking = np.array([3, 11, 25])
+    np.testing.assert_array_equal(np.sort(group.outgoing(spiking)), np.flatnonzero(np.isin(group.pre, spiking)))
+    np.testing.assert_array_equal(np.sort(group.incoming(spiking)), np.flatnonzero(np.isin(group.post, spiking)))
+
+def test_delivery_after_delays_with_certain_release():
+    pre, post, group = random_group(release_probability=1.0, delay=np.arange(300) % 3 + 1,
+                                    efficacy=np.linspace(0.1, 1.0, 300))
+    spiking = np.array([1, 2, 30])
+    group.propagate(spiking)
+    arrived = [group.deliver() for _ in range(4)]
+    for step in range(3):
+        synapses = np.flatnonzero(np.isin(group.pre, spiking) & (group.delay == step + 1))
+        expected = np.bincount(group.post[synapses], weights=group.efficacy[synapses], minlength=40)
+        np.testing.assert_allclose(arrived[step], expected)
+    np.testing.assert_array_equal(arrived[3], 0.0)
+
+def test_inhibitory_sign_and_release_probability():
+    group = SynapseGroup([0, 0], [1, 2], 3, 3, efficacy=1.0, neurotransmitter=['glutamate', 'gaba'],
+                         release_probability=1.0)
+    group.propagate([0])
+    np.testing.assert_array_equal(group.deliver(), [0.0, 1.0, -1.0])
+    silent = SynapseGroup([0], [1], 2, 2, release_probability=0.0)
+    silent.propagate([0])
+    np.testing.assert_array_equal(silent.deliver(), 0.0)
+    noisy = SynapseGroup(np.zeros(20000, int), np.zeros(20000, int), 1, 1, efficacy=1.0,
+                         release_probability=0.3, seed=1)
+    noisy.propagate([0])
+    assert noisy.deliver()[0] == pytest.approx(6000, rel=0.05)
+
+def test_from_synapses():
+    class Cell:
+        pass
+    cells = [Cell() for _ in range(3)]
+    synapses = [Synapse(cells[0], cells[2], efficacy=0.5), Synapse(cells[1], cells[0], neurotransmitter='gaba')]
+    group = SynapseGroup.from_synapses(synapses, {cell: i for i, cell in enumerate(cells)})
+    np.testing.assert_array_equal(group.pre, [0, 1])
+    np.testing.assert_array_equal(group.post, [2, 0])
+    np.testing.assert_array_equal(group.efficacy, [0.5, 0.05])
+
+def test_reset_and_validation():
+    _, _, group = random_group(release_probability=1.0, delay=2)
+    group.propagate([0, 1, 2])
+    group.reset()
+    assert not group.deliver().any() and not group.deliver().any()
+    with pytest.raises(ValueError):
+        SynapseGroup([0], [1], 2, 2, delay=0)
+    with pytest.raises(ValueError):
+        SynapseGroup([0], [1], 2, 2, neurotransmitter='dopamine-x')
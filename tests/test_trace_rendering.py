@@ -0,0 +1,82 @@
+# tests/test_trace_rendering.py
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+import trace_rendering
+from trace_rendering import DecimatedTrace, TracePyramid, m4_indices
+
+def make_trace(n_samples=200003, seed=0):
+    rng = np.random.default_rng(seed)
+    trace = np.cumsum(rng.normal(size=n_samples))
+    # Isolated one-sample spikes must survive decimation
+    trace[rng.integers(0, n_samples, size=20)] += 500.0
+    return trace
+
+def brute_force_m4(y, first_samples, stops):
+    indices = set()
+    for a, b in zip(first_samples, stops):
+        column = y[a:b]
+        indices.update((a, b - 1, a + int(np.argmin(column)), a + int(np.argmax(column))))
+    return np.array(sorted(indices))
+
+@pytest.mark.parametrize('chunk', [1 << 22, 1000])
+@pytest.mark.parametrize('start, stop, n_columns', [(0, None, 640), (12345, 150000, 333), (5, 90, 40)])
+def test_m4_indices_match_brute_force(monkeypatch, chunk, start, stop, n_columns):
+    monkeypatch.setattr(trace_rendering, 'M4_CHUNK', chunk)
+    y = make_trace()
+    end = len(y) if stop is None else stop
+    indices = m4_indices(y, n_columns, start, stop)
+    if end - start <= 4 * n_columns:
+        np.testing.assert_array_equal(indices, np.arange(start, end))
+        return
+    size = -(-(end - start) // n_columns)
+    first = np.arange(start, end, size)
+    np.testing.assert_array_equal(indices, brute_force_m4(y, first, np.minimum(first + size, end)))
+    assert len(indices) <= 4 * n_columns
+
+@pytest.mark.parametrize('start, stop, n_columns', [(0, 200003, 800), (1000, 61000, 97), (50000, 52000, 500),
+                                                    (70, 170003, 1)])
+def test_pyramid_matches_brute_force_on_its_columns(start, stop, n_columns):
+    y = make_trace()
+    pyramid = TracePyramid(y, base=16, factor=4)
+    indices = pyramid.indices(start, stop, n_columns)
+    if stop - start <= pyramid.base * n_columns:
+        np.testing.assert_array_equal(indices, m4_indices(y, n_columns, start, stop))
+        return
+    size = [size for size, _ in pyramid.levels if size <= (stop - start) / n_columns][-1]
+    q0, q1 = start // size, -(-stop // size)
+    width = -(-(q1 - q0) // n_columns) * size
+    first = np.arange(q0 * size, q1 * size, width)
+    np.testing.assert_array_equal(indices, brute_force_m4(y, first, np.minimum(first + width, min(q1 * size, len(y)))))
+    assert len(indices) <= 4 * n_columns
+
+def test_pyramid_levels_are_built_once_from_chunks(monkeypatch):
+    monkeypatch.setattr(trace_rendering, 'M4_CHUNK', 4096)
+    y = make_trace()
+    pyramid = TracePyramid(y, base=8, factor=4)
+    levels = pyramid.levels
+    assert pyramid.levels is levels
+    assert [size for size, _ in levels] == [8, 32, 128]
+    imin, vmin, imax, vmax = levels[2][1]
+    np.testing.assert_array_equal(vmax, [y[a:a + 128].max() for a in range(0, len(y), 128)])
+    np.testing.assert_array_equal(y[imin], vmin)
+    with pytest.raises(ValueError):
+        TracePyramid(np.zeros((2, 10)))
+
+def test_decimated_trace_follows_the_view():
+    y = make_trace()
+    x = np.arange(len(y)) * 0.1
+    figure, ax = plt.subplots(figsize=(4, 3), dpi=100)
+    trace = DecimatedTrace(ax, x, y, color='k')
+    width = int(ax.get_window_extent().width)
+    assert len(trace.line.get_xdata()) <= 4 * max(width, 100)
+    assert trace.line.get_ydata().max() == y.max()
+    ax.set_xlim(1000.0, 1010.0)
+    shown = trace.line.get_xdata()
+    assert shown[0] <= 1000.0 and shown[-1] >= 1010.0
+    np.testing.assert_array_equal(trace.line.get_ydata(), y[np.round(shown / 0.1).astype(int)])
+    assert len(shown) == np.count_nonzero((x >= 1000.0) & (x <= 1010.0)) + 2
+    trace.remove()
+    assert trace.line not in ax.lines
+    plt.close(figure)